@@ -1,51 +1,179 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Request
 
+from app.core import token_versions, user_cache
+from app.core.security import decode_access_token
+from app.core.user_cache import AuthUser
 from app.core.settings import settings
-from app.db.session import SessionLocal
+from app.db.routing import AsyncReadSessionLocal, ReadSessionLocal
+from app.db.session import AsyncSessionLocal, LazySession, SessionLocal, record_session
 from app.models.user import User
 
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+def client_key(request: Request) -> str:
+    """Identidad del cliente para read-your-writes (misma regla que el carrito)."""
+    sid = request.cookies.get("session_id")
+    if sid:
+        return sid
+    return request.client.host if request.client and request.client.host else "guest"
+
+
+def _route_name(request: Request) -> str:
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or request.url.path
+
+
+def _record_session(request: Request, created: bool, touched: bool) -> None:
+    # Una sola entrada por request aunque intervengan varias sesiones (auth + handler)
+    prev = getattr(request.state, "db_usage", None)
+    if prev is None:
+        record_session(_route_name(request), created, touched)
+        request.state.db_usage = (created, touched)
+        return
+    record_session(_route_name(request), created and not prev[0], touched and not prev[1], new_request=False)
+    request.state.db_usage = (created or prev[0], touched or prev[1])
+
+
+def _lazy_session(request: Request, factory) -> Generator[Session, None, None]:
+    # La Session (y la conexión) se crean recién si el handler la usa
+    db = LazySession(factory, info={"client": client_key(request)})
     try:
-        yield db
+        yield db  # type: ignore[misc]
     finally:
         db.close()
+        _record_session(request, db.created, db.touched)
+
+
+def get_db(request: Request) -> Generator[Session, None, None]:
+    yield from _lazy_session(request, SessionLocal)
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """Sesión de sólo lectura: rutea a réplicas (ver app.db.routing)."""
+    yield from _lazy_session(request, ReadSessionLocal)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_db_any(request: Request, sync_db: Session = Depends(get_db)) -> AsyncGenerator[Session | AsyncSession, None]:
+    """Sesión para handlers async: AsyncSession si DB_ASYNC_ENABLED, si no la Session del request.
+
+    Usar junto con `app.db.session.run_db`, que funciona con ambas. En modo sync
+    se reutiliza la misma Session que resuelven las dependencias de auth.
+    """
+    if not settings.DB_ASYNC_ENABLED:
+        yield sync_db
+        return
+    async with AsyncSessionLocal() as db:
+        db.info["client"] = client_key(request)
+        try:
+            yield db
+        finally:
+            _record_session(request, True, bool(db.sync_session.info.get("db_touched")))
+
+
+async def get_read_db_any(request: Request) -> AsyncGenerator[Session | AsyncSession, None]:
+    """Como get_db_any pero de sólo lectura (réplicas con read-your-writes)."""
+    if settings.DB_ASYNC_ENABLED:
+        async with AsyncReadSessionLocal() as db:
+            db.info["client"] = client_key(request)
+            try:
+                yield db
+            finally:
+                _record_session(request, True, bool(db.sync_session.info.get("db_touched")))
+        return
+    for db in _lazy_session(request, ReadSessionLocal):
+        yield db
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
+def _load_user(db: Session, email: str) -> AuthUser | None:
+    """Resuelve el subject del token vía caché de usuario; sólo consulta MySQL en miss."""
+    user = user_cache.get_user(email)
+    if user is None:
+        row = db.query(User).filter(User.email == email).first()
+        if not row:
+            return None
+        user = user_cache.put_user(row)
+    if not user.is_active:
+        return None
+    return user
+
+
+def _user_from_claims(db: Session, payload: dict) -> AuthUser | None:
+    """Autoriza desde los claims del token; sólo recurre a la caché/DB si no puede.
+
+    Tokens con uid/role/ver se validan contra la versión publicada en Redis
+    (revocación O(1)). Tokens legacy (sólo sub) o sin versión publicada siguen
+    el camino lento y, de paso, re-publican la versión vigente. Un token sin
+    `ver` cuenta como versión 0: deja de valer con la primera revocación.
+    """
+    email: str | None = payload.get("sub")
+    if not email:
+        return None
+    uid, role, ver = payload.get("uid"), payload.get("role"), payload.get("ver")
+    if uid is not None and role and ver is not None:
+        current = token_versions.current(int(uid))
+        if current is not None:
+            if int(ver) == current:
+                return AuthUser(id=int(uid), email=email, role=str(role), is_active=True, token_version=current)
+            if int(ver) < current:
+                return None
+    user = _load_user(db, email)
+    if not user:
+        return None
+    if int(ver or 0) != user.token_version:
+        return None
+    token_versions.publish(user.id, user.token_version)
+    return user
+
+
+def _decode_once(request: Request, token: str) -> dict:
+    """Decodifica el token a lo sumo una vez por request (memo en request.state)."""
+    memo: dict | None = getattr(request.state, "jwt_claims", None)
+    if memo is None:
+        memo = {}
+        request.state.jwt_claims = memo
+    claims = memo.get(token)
+    if claims is None:
+        claims = decode_access_token(token)
+        memo[token] = claims
+    return claims
+
+
 def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
-) -> User:
+) -> AuthUser:
     credentials_error = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        email: str | None = payload.get("sub")
-        if not email:
-            raise credentials_error
+        payload = _decode_once(request, token)
     except JWTError:
         raise credentials_error
 
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not user.is_active:
+    user = _user_from_claims(db, payload)
+    if not user:
         raise credentials_error
     return user
 
 
-def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -> User | None:
+def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -> AuthUser | None:
     """Try to read Bearer token from Authorization header and return user or None.
 
     This dependency does NOT raise on missing/invalid token — it returns None.
@@ -59,14 +187,8 @@ def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -
         return None
     token = parts[1]
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        email: str | None = payload.get("sub")
-        if not email:
-            return None
+        payload = _decode_once(request, token)
     except JWTError:
         return None
 
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not user.is_active:
-        return None
-    return user
\ No newline at end of file
+    return _user_from_claims(db, payload)
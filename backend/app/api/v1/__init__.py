@@ -10,6 +10,7 @@ from app.api.v1.payments_mp import router as payments_mp_router
 from app.api.v1.addresses import router as addresses_router
 from app.api.v1.admin_metrics import router as admin_metrics_router
 from app.api.v1.admin_snapshots import router as admin_snapshots_router
+from app.api.v1.admin_pricing import router as admin_pricing_router
 
 api_router = APIRouter()
 
@@ -22,4 +23,5 @@ api_router.include_router(checkout_addresses_router, tags=["checkout-addresses"]
 api_router.include_router(payments_mp_router, tags=["payments"])
 api_router.include_router(addresses_router, tags=["addresses"])
 api_router.include_router(admin_metrics_router, tags=["admin-metrics"])
-api_router.include_router(admin_snapshots_router, tags=["admin-snapshots"])
\ No newline at end of file
+api_router.include_router(admin_snapshots_router, tags=["admin-snapshots"])
+api_router.include_router(admin_pricing_router, tags=["admin-pricing"])
\ No newline at end of file
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_read_db, get_current_user
 from app.observability.counters import inc_counter
 
 logger = logging.getLogger(__name__)
@@ -26,7 +26,7 @@ def _ensure_admin(user) -> None:
 def metrics_daily(
     from_: str = Query(alias="from"),
     to_: str = Query(alias="to"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user=Depends(get_current_user),
 ) -> Dict[str, Any]:
     _ensure_admin(user)
@@ -124,7 +124,7 @@ def metrics_categories(
     limit: int = 5,
     from_: str = Query(alias="from"),
     to_: str = Query(alias="to"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user=Depends(get_current_user),
 ) -> List[Dict[str, Any]]:
     _ensure_admin(user)
@@ -162,7 +162,7 @@ LOW_STOCK_THRESHOLD_DEFAULT = 5
 
 @router.get("/stock")
 def metrics_stock(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user=Depends(get_current_user),
 ) -> Dict[str, Any]:
     _ensure_admin(user)
@@ -0,0 +1,117 @@
+import logging
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_user, get_db
+from app.models.price_list import PriceListItem, PriceListVersion, PricingState
+from app.schemas.pricing import PriceListCreate, PriceListItemsWrite, PriceListRead
+from app.services import price_lists
+from app.services.price_lists import PriceListError, PriceListImmutable, PriceListNotFound
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin/price-lists", tags=["admin-pricing"])
+
+
+def _ensure_admin(user: Dict[str, Any] | Any) -> None:
+    if not user or getattr(user, "role", "user") != "admin":
+        raise HTTPException(status_code=403, detail="admin_only")
+
+
+def _error(e: PriceListError) -> HTTPException:
+    if isinstance(e, PriceListNotFound):
+        return HTTPException(status_code=404, detail=str(e))
+    return HTTPException(status_code=409 if isinstance(e, PriceListImmutable) else 400, detail=str(e))
+
+
+def _read(db: Session, version: PriceListVersion) -> PriceListRead:
+    active = db.execute(select(PricingState.active_version_id).where(PricingState.id == price_lists.STATE_ID)).scalar()
+    count = db.execute(select(func.count()).where(PriceListItem.version_id == version.id)).scalar_one()
+    return PriceListRead(
+        id=version.id,
+        label=version.label,
+        status=version.status,
+        created_at=version.created_at,
+        published_at=version.published_at,
+        active=version.id == active,
+        items=count,
+    )
+
+
+@router.get("", response_model=List[PriceListRead])
+def list_price_lists(db: Session = Depends(get_db), user=Depends(get_current_user)):
+    _ensure_admin(user)
+    active = db.execute(select(PricingState.active_version_id).where(PricingState.id == price_lists.STATE_ID)).scalar()
+    counts = dict(
+        db.execute(select(PriceListItem.version_id, func.count()).group_by(PriceListItem.version_id)).all()
+    )
+    versions = db.execute(select(PriceListVersion).order_by(PriceListVersion.id.desc())).scalars()
+    return [
+        PriceListRead(
+            id=v.id,
+            label=v.label,
+            status=v.status,
+            created_at=v.created_at,
+            published_at=v.published_at,
+            active=v.id == active,
+            items=counts.get(v.id, 0),
+        )
+        for v in versions
+    ]
+
+
+@router.post("", response_model=PriceListRead, status_code=201)
+def create_price_list(payload: PriceListCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    _ensure_admin(user)
+    try:
+        version = price_lists.create_version(db, payload.label, payload.source_version_id)
+    except PriceListError as e:
+        db.rollback()
+        raise _error(e)
+    logger.info("admin_price_list_created", extra={"version_id": version.id})
+    return _read(db, version)
+
+
+@router.put("/{version_id}/items")
+def set_price_list_items(
+    version_id: int, payload: PriceListItemsWrite, db: Session = Depends(get_db), user=Depends(get_current_user)
+) -> Dict[str, Any]:
+    _ensure_admin(user)
+    try:
+        written = price_lists.set_items(db, version_id, [i.model_dump() for i in payload.items])
+    except PriceListError as e:
+        db.rollback()
+        raise _error(e)
+    return {"version_id": version_id, "written": written}
+
+
+@router.post("/{version_id}/publish", response_model=PriceListRead)
+def publish_price_list(version_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    _ensure_admin(user)
+    try:
+        version = price_lists.publish(db, version_id)
+    except PriceListError as e:
+        db.rollback()
+        raise _error(e)
+    return _read(db, version)
+
+
+@router.post("/{version_id}/activate")
+def activate_price_list(version_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)) -> Dict[str, Any]:
+    _ensure_admin(user)
+    try:
+        touched = price_lists.activate(db, version_id)
+    except PriceListError as e:
+        db.rollback()
+        raise _error(e)
+    return {"active_version_id": version_id, "products_updated": touched}
+
+
+@router.post("/deactivate")
+def deactivate_price_lists(db: Session = Depends(get_db), user=Depends(get_current_user)) -> Dict[str, Any]:
+    _ensure_admin(user)
+    price_lists.activate(db, None)
+    return {"active_version_id": None}
@@ -9,7 +9,7 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_read_db, get_current_user
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +25,7 @@ def _ensure_admin(user: Dict[str, Any] | Any) -> None:
 def get_daily_snapshots(
     from_: str = Query(alias="from"),
     to_: str = Query(alias="to"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user=Depends(get_current_user),
 ) -> Dict[str, Any]:
     _ensure_admin(user)
@@ -58,7 +58,7 @@ def get_category_snapshots(
     from_: str = Query(alias="from"),
     to_: str = Query(alias="to"),
     limit: int = 10,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user=Depends(get_current_user),
 ) -> List[Dict[str, Any]]:
     _ensure_admin(user)
@@ -84,7 +84,7 @@ def get_category_snapshots(
 def export_daily_csv(
     from_: str = Query(alias="from"),
     to_: str = Query(alias="to"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user=Depends(get_current_user),
 ):
     _ensure_admin(user)
@@ -113,7 +113,7 @@ def export_daily_csv(
 def export_categories_csv(
     from_: str = Query(alias="from"),
     to_: str = Query(alias="to"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user=Depends(get_current_user),
 ):
     _ensure_admin(user)
@@ -1,32 +1,48 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.api.deps import get_db, get_current_user
+from app.core.user_cache import AuthUser
 from app.schemas.user import UserCreate, UserLogin, UserRead
-from app.crud.user_service import create_user, authenticate_user
-from app.core.security import create_access_token
-from app.models.user import User
+from app.crud.user_service import create_user_async, authenticate_user_async, get_user_by_email, revoke_tokens
+from app.core.password_pool import PasswordPoolBusy
+from app.core.security import create_user_token
 from app.core.rate_limit import too_many_attempts
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+def _pool_busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Auth temporarily overloaded. Try again later.", headers={"Retry-After": "1"})
+
 @router.post("/register", response_model=UserRead, status_code=201)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == user_in.email).first()
+async def register(user_in: UserCreate, db: Session = Depends(get_db)):
+    existing = await run_in_threadpool(get_user_by_email, db, user_in.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return create_user(db, user_in)
+    try:
+        return await create_user_async(db, user_in)
+    except PasswordPoolBusy:
+        raise _pool_busy()
 
 @router.post("/login")
-def login(user_in: UserLogin, request: Request, db: Session = Depends(get_db)):
+async def login(user_in: UserLogin, request: Request, db: Session = Depends(get_db)):
     client_id = request.client.host or "unknown"
-    if too_many_attempts(client_id):
+    if await run_in_threadpool(too_many_attempts, client_id):
         raise HTTPException(status_code=429, detail="Too many attempts. Try again later.")
-    user = authenticate_user(db, user_in.email, user_in.password)
+    try:
+        user = await authenticate_user_async(db, user_in.email, user_in.password)
+    except PasswordPoolBusy:
+        raise _pool_busy()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    token = create_access_token({"sub": user.email})
+    token = create_user_token(user)
     return {"access_token": token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserRead)
-def me(current_user: User = Depends(get_current_user)):
-    return current_user
\ No newline at end of file
+def me(current_user: AuthUser = Depends(get_current_user)):
+    return current_user
+
+@router.post("/revoke", status_code=204)
+def revoke(db: Session = Depends(get_db), current_user: AuthUser = Depends(get_current_user)):
+    """Cierra todas las sesiones: los tokens emitidos hasta ahora dejan de ser válidos."""
+    revoke_tokens(db, current_user.id)
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.api.deps import get_db, get_current_user_optional
+from app.api.deps import get_db_any, get_current_user_optional
+from app.db.session import run_db
 from app.core.rate_limit import too_many_attempts
 from app.models.cart import Cart
 from app.models.cart_item import CartItem
@@ -24,77 +26,58 @@ def serialize_item(it: CartItem) -> dict:
         "id": it.id,
         "product_id": it.product_id,
         "qty": it.qty,
-        "unit_price": it.unit_price,
+        "unit_price": float(it.unit_price),
         "tier": it.tier,
-        "subtotal": it.subtotal,
+        "subtotal": float(it.subtotal),
+        "pricing_version": it.pricing_version,
     }
 
-@router.get("")
-def get_cart(request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user_optional)):
-    session_id = get_session_id(request)
-    user_id = getattr(current_user, "id", None) if current_user else None
-    cart = get_or_create_cart(db, user_id=user_id, session_id=session_id)
-    t = totals(db, cart)
-    items = (
+def serialize_totals(t: dict) -> dict:
+    return {"subtotal": float(t["subtotal"]), "items_count": t["items_count"]}
+
+def _cart_items(db: Session, cart: Cart) -> list[CartItem]:
+    return (
         db.query(CartItem)
         .filter(CartItem.cart_id == cart.id)
         .order_by(CartItem.id.desc())
         .all()
     )
+
+# Cuerpos sync de los handlers: corren vía run_db (AsyncSession.run_sync o threadpool)
+
+def _get_cart(db: Session, session_id: str, user_id: int | None) -> dict:
+    cart = get_or_create_cart(db, user_id=user_id, session_id=session_id)
+    t = totals(db, cart)
+    items = _cart_items(db, cart)
     return {
         "cart_id": cart.id,
         "currency": cart.currency,
         "status": cart.status,
         "items": [serialize_item(i) for i in items],
-        "totals": t,
+        "totals": serialize_totals(t),
     }
 
-@router.post("/items")
-def add_cart_item(body: dict, request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user_optional)):
-    client_id = request.client.host or "unknown"
-    if too_many_attempts(f"cart_items:{client_id}"):
-        raise HTTPException(status_code=429, detail="Too many attempts. Try again later.")
-    product_id = int(body.get("product_id"))
-    qty = int(body.get("qty", 1))
-    if qty <= 0:
-        raise HTTPException(status_code=400, detail="qty must be > 0")
-    session_id = get_session_id(request)
-    user_id = getattr(current_user, "id", None) if current_user else None
+def _add_cart_item(db: Session, session_id: str, user_id: int | None, role: str | None, product_id: int, qty: int) -> dict:
     cart = get_or_create_cart(db, user_id=user_id, session_id=session_id)
-    cart = add_item(db, cart, product_id, qty, getattr(current_user, "role", None) if current_user else None)
+    cart = add_item(db, cart, product_id, qty, role)
     t = totals(db, cart)
-    items = (
-        db.query(CartItem)
-        .filter(CartItem.cart_id == cart.id)
-        .order_by(CartItem.id.desc())
-        .all()
-    )
+    items = _cart_items(db, cart)
     # Asegurar que el ítem del producto agregado aparezca primero
     prioritized = sorted(
         items,
         key=lambda it: 0 if it.product_id == product_id else 1
     )
-    return {"cart_id": cart.id, "items": [serialize_item(i) for i in prioritized], "totals": t}
+    return {"cart_id": cart.id, "items": [serialize_item(i) for i in prioritized], "totals": serialize_totals(t)}
 
-@router.patch("/items/{item_id}")
-def update_cart_item(item_id: int, body: dict, db: Session = Depends(get_db), current_user=Depends(get_current_user_optional)):
-    qty = int(body.get("qty", 1))
+def _update_cart_item(db: Session, item_id: int, qty: int, role: str | None) -> dict:
     policy_keep = True
-    item = update_item_qty(db, item_id, qty, policy_keep_tier=policy_keep, user_role=getattr(current_user, "role", None))
+    item = update_item_qty(db, item_id, qty, policy_keep_tier=policy_keep, user_role=role)
     cart = db.query(Cart).filter(Cart.id == item.cart_id).first()
     t = totals(db, cart)
-    items = (
-        db.query(CartItem)
-        .filter(CartItem.cart_id == cart.id)
-        .order_by(CartItem.id.desc())
-        .all()
-    )
-    return {"cart_id": cart.id, "items": [serialize_item(i) for i in items], "totals": t}
+    items = _cart_items(db, cart)
+    return {"cart_id": cart.id, "items": [serialize_item(i) for i in items], "totals": serialize_totals(t)}
 
-@router.post("/lock")
-def lock_cart(request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user_optional)):
-    session_id = get_session_id(request)
-    user_id = getattr(current_user, "id", None) if current_user else None
+def _lock_cart(db: Session, session_id: str, user_id: int | None) -> dict:
     cart = get_or_create_cart(db, user_id=user_id, session_id=session_id)
     # If cart has no items in dev/test, try locking the most recently updated draft cart
     dev_mode = settings.APP_ENV != "production"
@@ -111,20 +94,49 @@ def lock_cart(request: Request, db: Session = Depends(get_db), current_user=Depe
             db.commit()
         raise HTTPException(status_code=409, detail=r["shortages"])
     t = totals(db, cart)
-    items = (
-        db.query(CartItem)
-        .filter(CartItem.cart_id == cart.id)
-        .order_by(CartItem.id.desc())
-        .all()
-    )
-    return {"cart_id": cart.id, "status": "locked", "items": [serialize_item(i) for i in items], "totals": t}
+    items = _cart_items(db, cart)
+    return {"cart_id": cart.id, "status": "locked", "items": [serialize_item(i) for i in items], "totals": serialize_totals(t)}
 
-@router.post("/unlock")
-def unlock_cart(request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user_optional)):
-    session_id = get_session_id(request)
-    user_id = getattr(current_user, "id", None) if current_user else None
+def _unlock_cart(db: Session, session_id: str, user_id: int | None) -> dict:
     cart = get_or_create_cart(db, user_id=user_id, session_id=session_id)
     r = release_cart(db, cart.id)
     t = totals(db, cart)
     items = db.query(CartItem).filter(CartItem.cart_id == cart.id).all()
-    return {"cart_id": cart.id, "status": cart.status, "items": [serialize_item(i) for i in items], "totals": t}
\ No newline at end of file
+    return {"cart_id": cart.id, "status": cart.status, "items": [serialize_item(i) for i in items], "totals": serialize_totals(t)}
+
+@router.get("")
+async def get_cart(request: Request, db=Depends(get_db_any), current_user=Depends(get_current_user_optional)):
+    session_id = get_session_id(request)
+    user_id = getattr(current_user, "id", None) if current_user else None
+    return await run_db(db, _get_cart, session_id, user_id)
+
+@router.post("/items")
+async def add_cart_item(body: dict, request: Request, db=Depends(get_db_any), current_user=Depends(get_current_user_optional)):
+    client_id = request.client.host or "unknown"
+    if await run_in_threadpool(too_many_attempts, f"cart_items:{client_id}"):
+        raise HTTPException(status_code=429, detail="Too many attempts. Try again later.")
+    product_id = int(body.get("product_id"))
+    qty = int(body.get("qty", 1))
+    if qty <= 0:
+        raise HTTPException(status_code=400, detail="qty must be > 0")
+    session_id = get_session_id(request)
+    user_id = getattr(current_user, "id", None) if current_user else None
+    role = getattr(current_user, "role", None) if current_user else None
+    return await run_db(db, _add_cart_item, session_id, user_id, role, product_id, qty)
+
+@router.patch("/items/{item_id}")
+async def update_cart_item(item_id: int, body: dict, db=Depends(get_db_any), current_user=Depends(get_current_user_optional)):
+    qty = int(body.get("qty", 1))
+    return await run_db(db, _update_cart_item, item_id, qty, getattr(current_user, "role", None))
+
+@router.post("/lock")
+async def lock_cart(request: Request, db=Depends(get_db_any), current_user=Depends(get_current_user_optional)):
+    session_id = get_session_id(request)
+    user_id = getattr(current_user, "id", None) if current_user else None
+    return await run_db(db, _lock_cart, session_id, user_id)
+
+@router.post("/unlock")
+async def unlock_cart(request: Request, db=Depends(get_db_any), current_user=Depends(get_current_user_optional)):
+    session_id = get_session_id(request)
+    user_id = getattr(current_user, "id", None) if current_user else None
+    return await run_db(db, _unlock_cart, session_id, user_id)
@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import io
+import json
+from typing import Literal
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select
 
-from app.api.deps import get_db, get_current_user
-from app.models.category import Category
+from app.api.deps import get_db, get_read_db, get_read_db_any, get_current_user
+from app.core.catalog_cache import cached_response
+from app.db.session import run_db
 from app.models.product import Product
-from app.models.product_price import ProductPrice
+from app.services import catalog as catalog_service
+from app.services import catalog_feed, catalog_import
 from app.schemas.catalog import (
     CategoryRead,
-    ProductRead,
+    ProductFacetsRead,
+    ProductListItemRead,
     ProductDetailRead,
+    ProductChangesRead,
     ProductCreate,
     ProductPriceRead,
 )
@@ -17,64 +25,118 @@ from app.schemas.catalog import (
 router = APIRouter(prefix="/catalog", tags=["catalog"])
 
 
+# Lecturas cacheadas por versión de catálogo (ETag/304): ver app/core/catalog_cache.py
+
+
 @router.get("/categories", response_model=list[CategoryRead])
-def list_categories(db: Session = Depends(get_db), tree: bool = Query(default=False)):
-    cats = db.execute(select(Category)).scalars().all()
-    if not tree:
-        return cats
-
-    # Build tree using parent_id relationships
-    by_id = {c.id: c for c in cats}
-    roots: list[Category] = []
-    for c in cats:
-        if c.parent_id and c.parent_id in by_id:
-            parent = by_id[c.parent_id]
-            # relationship children is available but may not include uncommitted; ensure append
-            if not hasattr(parent, "children"):
-                parent.children = []  # type: ignore
-            parent.children.append(c)  # type: ignore
-        else:
-            roots.append(c)
-    return roots
-
-
-@router.get("/products", response_model=list[ProductRead])
-def list_products(
-    db: Session = Depends(get_db),
+async def list_categories(request: Request, db=Depends(get_read_db_any), tree: bool = Query(default=False)):
+    async def compute():
+        return await run_db(db, catalog_service.list_categories, tree), {}
+
+    return await cached_response(request, compute)
+
+
+@router.get("/products", response_model=list[ProductListItemRead])
+async def list_products(
+    request: Request,
+    db=Depends(get_read_db_any),
     search: str | None = None,
     category_id: int | None = None,
     page: int = 1,
     size: int = 20,
+    cursor: str | None = None,
+    sort: Literal["relevance", "id", "name", "newest"] | None = None,
+    include_descendants: bool = False,
+    embed: str | None = Query(default=None, description="prices,stock"),
 ):
-    q = db.query(Product)
-    if search:
-        q = q.filter(Product.name.ilike(f"%{search}%"))
-    if category_id:
-        q = q.filter(Product.category_id == category_id)
-    page = max(page, 1)
-    size = max(min(size, 100), 1)
-    return q.offset((page - 1) * size).limit(size).all()
+    embeds = frozenset(e.strip() for e in embed.split(",") if e.strip()) if embed else frozenset()
+    if not embeds <= catalog_service.EMBEDS:
+        raise HTTPException(status_code=400, detail="Invalid embed")
+
+    async def compute():
+        try:
+            items, next_cursor = await run_db(
+                db,
+                catalog_service.list_products_page,
+                search,
+                category_id,
+                page,
+                size,
+                cursor,
+                sort,
+                include_descendants,
+                embeds,
+            )
+        except catalog_service.InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # Siguiente página en X-Next-Cursor (ausente en la última)
+        return items, {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+    # Con cantidades embebidas la respuesta también depende de cada reserva
+    return await cached_response(request, compute, ("catalog", "stock") if "stock" in embeds else ("catalog",))
+
+
+@router.get("/facets", response_model=ProductFacetsRead)
+async def product_facets(
+    request: Request,
+    db=Depends(get_read_db_any),
+    search: str | None = None,
+    category_id: int | None = None,
+    include_descendants: bool = False,
+):
+    # Mismos filtros que /products: conteos por categoría y tramos de precio en un request
+    async def compute():
+        return await run_db(db, catalog_service.product_facets, search, category_id, include_descendants), {}
+
+    return await cached_response(request, compute)
+
+
+@router.get("/changes", response_model=ProductChangesRead)
+async def list_changes(
+    db=Depends(get_read_db_any),
+    since: str | None = Query(default=None, description="next_cursor de la sincronización anterior"),
+    limit: int = Query(default=500, ge=1, le=catalog_service.CHANGES_MAX_LIMIT),
+):
+    # Sin caché: cada cursor es distinto y la ventana de lag depende del reloj
+    try:
+        return await run_db(db, catalog_service.list_changes, since, limit)
+    except catalog_service.InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/feed")
+def export_feed(
+    fmt: Literal["csv", "xml", "ndjson"] = Query(default="csv", alias="format"),
+    gzip: bool = False,
+    db: Session = Depends(get_read_db),
+):
+    """Feed completo para marketplaces, en streaming (cursor del lado del servidor, memoria constante)."""
+    filename = f"catalog-feed.{fmt}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else catalog_feed.FORMATS[fmt]
+    return StreamingResponse(
+        catalog_feed.export(db, fmt, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/products/{slug}", response_model=ProductDetailRead)
-def get_product(slug: str, db: Session = Depends(get_db)):
-    p: Product | None = db.query(Product).filter(Product.slug == slug).first()
-    if not p:
-        raise HTTPException(status_code=404, detail="Product not found")
-    prices = db.query(ProductPrice).filter(ProductPrice.product_id == p.id).all()
-    # assemble detail
-    detail = ProductDetailRead.model_validate(p)
-    detail.prices = [ProductPriceRead.model_validate(pr) for pr in prices]
-    return detail
+async def get_product(request: Request, slug: str, db=Depends(get_read_db_any)):
+    async def compute():
+        detail = await run_db(db, catalog_service.get_product_detail, slug)
+        if detail is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return detail, {}
+
+    return await cached_response(request, compute)
 
 
 @router.get("/products/{product_id}/price", response_model=list[ProductPriceRead])
-def get_product_prices(product_id: int, db: Session = Depends(get_db), tier: str | None = None):
-    q = db.query(ProductPrice).filter(ProductPrice.product_id == product_id)
-    if tier:
-        q = q.filter(ProductPrice.tier == tier)
-    prices = q.all()
-    return [ProductPriceRead.model_validate(pr) for pr in prices]
+async def get_product_prices(request: Request, product_id: int, db=Depends(get_read_db_any), tier: str | None = None):
+    async def compute():
+        return await run_db(db, catalog_service.get_product_prices, product_id, tier), {}
+
+    return await cached_response(request, compute)
 
 
 @router.post("/products", response_model=ProductDetailRead)
@@ -104,4 +166,31 @@ def create_product(
     db.refresh(p)
     detail = ProductDetailRead.model_validate(p)
     detail.prices = []
-    return detail
\ No newline at end of file
+    return detail
+
+
+@router.post("/import")
+def import_catalog(
+    file: UploadFile = File(...),
+    fmt: Literal["csv", "ndjson"] | None = Query(default=None, alias="format"),
+    batch_size: int = Query(default=catalog_import.BATCH_SIZE, ge=1, le=5000),
+    location_id: int = Query(default=catalog_import.DEFAULT_LOCATION_ID),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """Alta/actualización masiva desde CSV o NDJSON; responde NDJSON con el progreso por lote.
+
+    El upload se lee en streaming desde el archivo temporal, sin cargarlo en memoria.
+    """
+    if getattr(current_user, "role", "user") != "admin":
+        raise HTTPException(status_code=403, detail="Forbidden")
+    fmt = fmt or catalog_import.detect_format(file.filename)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Unknown import format (use format=csv|ndjson)")
+
+    def progress():
+        stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        for item in catalog_import.import_stream(db, stream, fmt, batch_size, location_id):
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
@@ -54,7 +54,8 @@ def checkout_start(body: dict, request: Request, db: Session = Depends(get_db),
     billing_address = body.get("billing_address")
     # Pasar el usuario autenticado para ownership en dev/test si el cart es de sesión
     user_override_id = getattr(current_user, "id", None) if current_user else None
-    r = start_checkout(db, cart_id=cart_id, shipping_address=shipping_address, billing_address=billing_address, user_override_id=user_override_id)
+    r = start_checkout(db, cart_id=cart_id, shipping_address=shipping_address, billing_address=billing_address, user_override_id=user_override_id,
+                       user_role=getattr(current_user, "role", None))
     if not r["ok"]:
         # Handle retry on same cart_id with existing order
         if r.get("error") == "order_already_started":
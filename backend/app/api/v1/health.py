@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_current_user_optional, get_db
+from app.core import catalog_cache, password_pool, token_versions, user_cache
+from app.core.rate_limit import limiter
+from app.core.security import token_cache_stats
+from app.core.settings import settings
+from app.db import pool as db_pool
+from app.db import routing
+from app.db.session import session_stats
+from app.services import pricing, search_index
 
 router = APIRouter()
 
@@ -15,9 +23,30 @@ def health_check():
 
 @router.get("/db")
 def health_check_db(db: Session = Depends(get_db)):
-    """Health check with database connection test."""
+    """Health check with database connection test (incluye estado del pool)."""
     try:
         db.execute(text("SELECT 1"))
-        return {"status": "healthy", "database": "connected"}
+        return {"status": "healthy", "database": "connected", "pool": db_pool.stats()}
     except Exception as e:
-        return {"status": "unhealthy", "database": f"error: {str(e)}"}
\ No newline at end of file
+        return {"status": "unhealthy", "database": f"error: {str(e)}", "pool": db_pool.stats()}
+
+
+@router.get("/stats")
+def health_stats(current_user=Depends(get_current_user_optional)):
+    """In-process cache/runtime counters for this worker (en producción, sólo admin)."""
+    if settings.APP_ENV == "production" and getattr(current_user, "role", None) != "admin":
+        raise HTTPException(status_code=403, detail="admin_only")
+    return {
+        "user_cache": user_cache.stats(),
+        "token_versions": token_versions.stats(),
+        "jwt_decode_cache": token_cache_stats(),
+        "password_pool": password_pool.stats(),
+        "rate_limit": dict(limiter.stats),
+        "db": {"async": settings.DB_ASYNC_ENABLED},
+        "db_routing": routing.stats(),
+        "db_pool": db_pool.stats(),
+        "db_sessions": session_stats(),
+        "search_index": search_index.stats(),
+        "catalog_cache": catalog_cache.stats(),
+        "pricebook": pricing.stats(),
+    }
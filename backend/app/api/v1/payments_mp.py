@@ -1,9 +1,11 @@
 import logging
 import json
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.api.deps import get_db, get_current_user
-from app.services.payments_mp import create_preference, process_webhook
+from app.api.deps import get_db, get_db_any, get_current_user
+from app.db.session import run_db
+from app.services.payments_mp import create_preference, fetch_mp_payment, process_webhook, webhook_payment_id
 from app.schemas.payments import PaymentsMPWebhookResponse
 from app.core.settings import settings
 from app.services.mp_credentials import verify_credentials
@@ -60,7 +62,7 @@ def payments_mp_preference(body: dict, db: Session = Depends(get_db)):
 
 
 @router.post("/webhook", response_model=PaymentsMPWebhookResponse)
-async def payments_mp_webhook(payload: dict, request: Request, db: Session = Depends(get_db)):
+async def payments_mp_webhook(payload: dict, request: Request, db=Depends(get_db_any)):
     # Validación de firma solo en producción
     # Soportamos esquema clásico X-Hub-Signature y el esquema de MP: X-Signature (ts, v1) + X-Request-Id
     if settings.APP_ENV == "production":
@@ -93,7 +95,9 @@ async def payments_mp_webhook(payload: dict, request: Request, db: Session = Dep
             valid = hmac.compare_digest(legacy, expected)
         if not valid:
             raise HTTPException(status_code=401, detail="invalid_signature")
-    r = process_webhook(db, payload)
+    pid = webhook_payment_id(payload)
+    mp_payment = await run_in_threadpool(fetch_mp_payment, pid) if pid else None
+    r = await run_db(db, process_webhook, payload, mp_payment)
     if not r.get("ok"):
         raise HTTPException(status_code=r.get("status_code", 400), detail=r.get("error"))
     logger.info("payments_mp_webhook", extra={"env": settings.APP_ENV})
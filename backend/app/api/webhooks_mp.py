@@ -2,16 +2,17 @@ import hmac
 import hashlib
 import time
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
-from app.api.deps import get_db
-from app.services.payments_mp import process_webhook
+from fastapi.concurrency import run_in_threadpool
+from app.api.deps import get_db_any
+from app.db.session import run_db
+from app.services.payments_mp import fetch_mp_payment, process_webhook, webhook_payment_id
 from app.core.settings import settings
 
 router = APIRouter(prefix="/webhooks/mp", tags=["webhooks"])
 
 
 @router.post("")
-async def mp_webhook(payload: dict, request: Request, db: Session = Depends(get_db)):
+async def mp_webhook(payload: dict, request: Request, db=Depends(get_db_any)):
     # Only enabled in dev/test when flag is on; hide in prod
     if not getattr(settings, "MP_WEBHOOK_TEST_ENABLED", True):
         raise HTTPException(status_code=404, detail="disabled")
@@ -49,7 +50,9 @@ async def mp_webhook(payload: dict, request: Request, db: Session = Depends(get_
     if not hmac.compare_digest(v1, expected):
         raise HTTPException(status_code=403, detail="invalid_signature")
 
-    r = process_webhook(db, body)
+    pid = webhook_payment_id(body)
+    mp_payment = await run_in_threadpool(fetch_mp_payment, pid) if pid else None
+    r = await run_db(db, process_webhook, body, mp_payment)
     if not r.get("ok"):
         raise HTTPException(status_code=r.get("status_code", 400), detail=r.get("error"))
     return {"status": "ok"}
\ No newline at end of file
@@ -1,6 +1,73 @@
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
+from functools import total_ordering
 
 
-def format_money(amount: Decimal | float | int) -> str:
+@total_ordering
+class Money:
+    """Importe en centavos (int): suma y multiplica sin Decimal ni float.
+
+    Precios, líneas de carrito, totales de orden y montos de MP viajan como
+    Money; en la base se guardan en Numeric(12, 2) vía MoneyType
+    (app/db/types.py). Se formatea sólo al serializar (`str` / `format_money`).
+    """
+
+    __slots__ = ("cents",)
+
+    def __init__(self, cents: int = 0) -> None:
+        self.cents = cents
+
+    @classmethod
+    def of(cls, amount: "Money | Decimal | int | float | str") -> "Money":
+        """Desde un importe en unidades (Decimal de la base, o int/str/float de entrada)."""
+        if isinstance(amount, Money):
+            return amount
+        if isinstance(amount, int):
+            return cls(amount * 100)
+        d = amount if isinstance(amount, Decimal) else Decimal(str(amount))
+        return cls(int((d * 100).to_integral_value(ROUND_HALF_UP)))
+
+    def __add__(self, other: "Money") -> "Money":
+        return Money(self.cents + other.cents)
+
+    def __sub__(self, other: "Money") -> "Money":
+        return Money(self.cents - other.cents)
+
+    def __mul__(self, qty: int) -> "Money":
+        return Money(self.cents * qty)
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> "Money":
+        return Money(-self.cents)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Money) and self.cents == other.cents
+
+    def __lt__(self, other: "Money") -> bool:
+        return self.cents < other.cents
+
+    def __hash__(self) -> int:
+        return hash(self.cents)
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    def __float__(self) -> float:
+        return self.cents / 100
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2)
+
+    def __str__(self) -> str:
+        units, cents = divmod(abs(self.cents), 100)
+        return f"{'-' if self.cents < 0 else ''}{units}.{cents:02d}"
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
+
+
+def format_money(amount: Money | Decimal | float | int) -> str:
+    if isinstance(amount, Money):
+        return str(amount)
     d = Decimal(str(amount))
-    return f"{d.quantize(Decimal('0.01'))}"
\ No newline at end of file
+    return f"{d.quantize(Decimal('0.01'))}"
@@ -0,0 +1,269 @@
+"""Caché de respuestas del catálogo, versionada, con ETag/304.
+
+Dos niveles como `user_cache`: LRU+TTL in-process y Redis compartido. Las
+claves llevan la versión del catálogo (`catalog:ver` en Redis): un commit que
+toca productos, categorías, precios o stock la incrementa y todo lo cacheado
+queda huérfano sin borrar nada. Las respuestas con cantidades de stock suman
+la versión "stock", que se mueve con cada reserva. Se guarda el JSON ya
+serializado con su ETag (hash del cuerpo), así un `If-None-Match` se
+responde 304 sin tocar MySQL.
+Sin Redis la versión es local al worker y el TTL local acota lo viejo.
+"""
+import hashlib
+import json
+import time
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.common.ttl_cache import TTLCache
+from app.core.redis_client import get_redis, mark_redis_down
+from app.core.settings import settings
+from app.models.category import Category
+from app.models.product import Product
+from app.models.product_price import ProductPrice
+from app.models.stock_item import StockItem
+
+# Alcances de versión: "catalog" (productos, categorías, precios, disponibilidad),
+# "stock" (cantidades; cambia en cada reserva, sólo lo usan respuestas que las embeben)
+# y "prices" (sólo product_prices: la usa el PriceBook de services/pricing.py)
+VERSION_KEYS = {"catalog": "catalog:ver", "stock": "catalog:ver:stock", "prices": "catalog:ver:prices"}
+REDIS_PREFIX = "catalog:resp:"
+_BUMP_KEY = "catalog_cache_bump"
+
+_local = TTLCache(maxsize=settings.CATALOG_CACHE_MAX_ENTRIES, ttl=settings.CATALOG_CACHE_LOCAL_TTL_SECONDS)
+_version = TTLCache(maxsize=len(VERSION_KEYS), ttl=settings.CATALOG_CACHE_VERSION_TTL_SECONDS)
+_local_version = {scope: 0 for scope in VERSION_KEYS}
+# Última versión vista por alcance y cuándo cambió alguna (ventana de lag de réplicas)
+_seen: dict = {"at": 0.0}
+_stats = {"redis_hits": 0, "redis_misses": 0, "redis_errors": 0, "not_modified": 0, "bumps": 0}
+
+# (etag, cuerpo JSON, headers extra)
+Entry = tuple[str, bytes, dict[str, str]]
+
+
+def current_version(scope: str = "catalog") -> str:
+    ver = _version.get(scope)
+    if ver is not None:
+        return ver
+    r = get_redis()
+    if r is None:
+        return f"l{_local_version[scope]}"
+    try:
+        ver = str(r.get(VERSION_KEYS[scope]) or 0)
+    except Exception as e:
+        _stats["redis_errors"] += 1
+        mark_redis_down(e)
+        return f"l{_local_version[scope]}"
+    _remember(scope, ver)
+    return ver
+
+
+def _remember(scope: str, ver: str) -> None:
+    _version.set(scope, ver)
+    if ver != _seen.get(scope):
+        _seen[scope] = ver
+        _seen["at"] = time.monotonic()
+
+
+def _ttl(default: float) -> float:
+    # Recién invalidado: una réplica atrasada puede devolver datos previos, cachearlos poco
+    if settings.DB_REPLICA_URLS and time.monotonic() - _seen["at"] < settings.DB_REPLICA_MAX_LAG_SECONDS:
+        return min(default, settings.DB_REPLICA_MAX_LAG_SECONDS)
+    return default
+
+
+def bump(*scopes: str) -> None:
+    """Invalida lo cacheado bajo esos alcances (este worker al instante, el resto vía Redis).
+
+    No hace falta borrar entradas: quedan huérfanas bajo la versión anterior.
+    """
+    r = get_redis()
+    for scope in scopes or ("catalog",):
+        _stats["bumps"] += 1
+        _local_version[scope] += 1
+        _version.pop(scope)
+        if r is None:
+            continue
+        try:
+            _remember(scope, str(r.incr(VERSION_KEYS[scope])))
+        except Exception as e:
+            _stats["redis_errors"] += 1
+            mark_redis_down(e)
+            r = None
+
+
+def cache_key(request: Request, scopes: tuple[str, ...] = ("catalog",)) -> str:
+    query = sorted(request.query_params.multi_items())
+    raw = f"{request.url.path}?{json.dumps(query, separators=(',', ':'))}"
+    versions = "-".join(current_version(s) for s in scopes)
+    return f"{versions}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def get(key: str) -> Entry | None:
+    entry = _local.get(key)
+    return entry if entry is not None else _get_shared(key)
+
+
+def _get_shared(key: str) -> Entry | None:
+    r = get_redis()
+    if r is None:
+        return None
+    try:
+        raw = r.get(REDIS_PREFIX + key)
+    except Exception as e:
+        _stats["redis_errors"] += 1
+        mark_redis_down(e)
+        return None
+    if not raw:
+        _stats["redis_misses"] += 1
+        return None
+    _stats["redis_hits"] += 1
+    data = json.loads(raw)
+    entry = (data["etag"], data["body"].encode(), data["headers"])
+    _local.set(key, entry)
+    return entry
+
+
+def put(key: str, entry: Entry) -> None:
+    _local.set(key, entry, ttl=_ttl(settings.CATALOG_CACHE_LOCAL_TTL_SECONDS))
+    r = get_redis()
+    if r is None:
+        return
+    etag, body, headers = entry
+    try:
+        r.set(
+            REDIS_PREFIX + key,
+            json.dumps({"etag": etag, "body": body.decode(), "headers": headers}),
+            ex=max(int(_ttl(settings.CATALOG_CACHE_REDIS_TTL_SECONDS)), 1),
+        )
+    except Exception as e:
+        _stats["redis_errors"] += 1
+        mark_redis_down(e)
+
+
+def memo(name: str, build: Callable[[], bytes]) -> bytes:
+    """Blob serializado bajo la versión vigente del catálogo (mismos dos niveles)."""
+    if not settings.CATALOG_CACHE_ENABLED:
+        return build()
+    key = f"{current_version()}:blob:{name}"
+    entry = get(key)
+    if entry is None:
+        body = build()
+        entry = (f'"{hashlib.sha256(body).hexdigest()[:32]}"', body, {})
+        put(key, entry)
+    return entry[1]
+
+
+def make_entry(payload, headers: dict[str, str] | None = None) -> Entry:
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":"), ensure_ascii=False).encode()
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"', body, headers or {}
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (t.strip() for t in header.split(","))
+
+
+async def cached_response(
+    request: Request,
+    compute: Callable[[], Awaitable[tuple[object, dict[str, str]]]],
+    scopes: tuple[str, ...] = ("catalog",),
+) -> Response:
+    """Sirve desde caché (o 304) y si no, calcula `compute()` → (payload, headers) y lo guarda.
+
+    `scopes`: versiones que invalidan la respuesta (agregar "stock" si embebe cantidades).
+    """
+    if not settings.CATALOG_CACHE_ENABLED:
+        payload, headers = await compute()
+        _, body, headers = make_entry(payload, headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+    # Versión y hit local sin salir del event loop; Redis (bloqueante) en el threadpool
+    if all(_version.get(s) is not None for s in scopes):
+        key = cache_key(request, scopes)
+    else:
+        key = await run_in_threadpool(cache_key, request, scopes)
+    entry = _local.get(key)
+    if entry is None:
+        entry = await run_in_threadpool(_get_shared, key)
+    if entry is None:
+        payload, headers = await compute()
+        entry = make_entry(payload, headers)
+        await run_in_threadpool(put, key, entry)
+    etag, body, headers = entry
+    base = {"ETag": etag, "Cache-Control": "public, max-age=0, must-revalidate"}
+    if _etag_matches(request, etag):
+        _stats["not_modified"] += 1
+        return Response(status_code=304, headers=base)
+    return Response(content=body, media_type="application/json", headers={**base, **headers})
+
+
+def stats() -> dict:
+    return {"versions": {s: _version.get(s) for s in VERSION_KEYS}, "local": _local.stats(), **_stats}
+
+
+def _queue_bump(target, *scopes: str) -> None:
+    sess = object_session(target)
+    if sess is not None:
+        sess.info.setdefault(_BUMP_KEY, set()).update(scopes or ("catalog",))
+
+
+def _available(on_hand, committed) -> bool:
+    return (on_hand or 0) - (committed or 0) > 0
+
+
+def _catalog_changed(mapper, connection, target) -> None:
+    _queue_bump(target)
+
+
+def _price_changed(mapper, connection, target) -> None:
+    _queue_bump(target, "catalog", "prices")
+
+
+def _stock_changed(mapper, connection, target) -> None:
+    _queue_bump(target, "catalog", "stock")
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    for _model in (Product, Category):
+        event.listen(_model, _event, _catalog_changed)
+    event.listen(ProductPrice, _event, _price_changed)
+event.listen(StockItem, "after_insert", _stock_changed)
+event.listen(StockItem, "after_delete", _stock_changed)
+
+
+@event.listens_for(StockItem, "after_update")
+def _stock_updated(mapper, connection, target: StockItem) -> None:
+    # Las reservas mueven `committed` en cada checkout: eso sólo invalida "stock";
+    # "catalog" cuando cambia on_hand o el producto pasa de disponible a agotado (o al revés)
+    state = inspect(target)
+    on_hand, committed = state.attrs.on_hand.history, state.attrs.committed.history
+    if on_hand.has_changes():
+        _queue_bump(target, "catalog", "stock")
+        return
+    if committed.has_changes():
+        # Sin valor previo cargado no se sabe si cambió la disponibilidad: invalidar
+        if not committed.deleted or _available(target.on_hand, committed.deleted[0]) != _available(
+            target.on_hand, target.committed
+        ):
+            _queue_bump(target, "catalog", "stock")
+        else:
+            _queue_bump(target, "stock")
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    scopes = session.info.pop(_BUMP_KEY, None)
+    if scopes:
+        bump(*sorted(scopes))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bump(session: Session) -> None:
+    session.info.pop(_BUMP_KEY, None)
@@ -0,0 +1,84 @@
+"""Pool de procesos acotado para bcrypt (hash/verify).
+
+bcrypt es CPU-bound a propósito; correrlo en el threadpool del request deja a
+una ráfaga de logins acaparar los hilos que usan catálogo y carrito. Acá se
+ejecuta en un ProcessPoolExecutor de tamaño fijo con una cola máxima: si la
+cola está llena se rechaza rápido (PasswordPoolBusy → 503) en vez de encolar.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from app.core.security import hash_password, verify_password
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_executor: ProcessPoolExecutor | None = None
+_lock = threading.Lock()
+_pending = 0
+_stats = {"submitted": 0, "completed": 0, "rejected": 0, "peak_pending": 0}
+
+
+class PasswordPoolBusy(Exception):
+    pass
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                # spawn: no heredar hilos/conexiones del worker uvicorn
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_POOL_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+async def _submit(fn: Callable[..., Any], *args: Any) -> Any:
+    global _pending
+    with _lock:
+        if _pending >= settings.PASSWORD_POOL_MAX_PENDING:
+            _stats["rejected"] += 1
+            raise PasswordPoolBusy()
+        _pending += 1
+        _stats["submitted"] += 1
+        _stats["peak_pending"] = max(_stats["peak_pending"], _pending)
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+    finally:
+        with _lock:
+            _pending -= 1
+            _stats["completed"] += 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _submit(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _submit(verify_password, plain_password, hashed_password)
+
+
+def stats() -> dict:
+    workers = settings.PASSWORD_POOL_WORKERS
+    return {
+        **_stats,
+        "workers": workers,
+        "pending": _pending,
+        "queue_depth": max(0, _pending - workers),
+        "max_pending": settings.PASSWORD_POOL_MAX_PENDING,
+    }
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -1,4 +1,20 @@
+"""Rate limiting de ventana deslizante.
+
+- Backend Redis: un único script Lua (ZSET por clave) hace limpieza, conteo y
+  registro en un solo round trip atómico.
+- Backend memoria: misma semántica in-process, para dev/test y benchmarks.
+- Pre-filtro local: los hits vistos por este worker son un subconjunto de los
+  globales, así que si localmente ya se superó el límite (o Redis informó un
+  bloqueo vigente) se rechaza sin consultar Redis.
+"""
+import threading
+import time
+import uuid
+from collections import deque
+
 import redis
+
+from app.common.ttl_cache import TTLCache
 from app.core.settings import settings
 
 r = redis.Redis(
@@ -7,13 +23,129 @@ r = redis.Redis(
     db=settings.REDIS_DB,
     decode_responses=True,
 )
+
+# KEYS[1]=clave; ARGV: now_ms, window_ms, limit, member. Devuelve {permitido, retry_after_ms}
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local hits = redis.call('ZCARD', key)
+if hits >= limit then
+  local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+  local retry = window
+  if oldest[2] then retry = tonumber(oldest[2]) + window - now end
+  return {0, retry}
+end
+redis.call('ZADD', key, now, ARGV[4])
+redis.call('PEXPIRE', key, window)
+return {1, 0}
+"""
+
+
+class MemoryBackend:
+    """Ventana deslizante in-process (misma semántica que el script Lua)."""
+
+    def __init__(self, max_keys: int = 100000):
+        self._hits = TTLCache(maxsize=max_keys, ttl=24 * 3600)
+        self._lock = threading.Lock()
+
+    def _window(self, key: str, window_sec: int, now: float) -> deque:
+        q = self._hits.get(key)
+        if q is None:
+            q = deque()
+        while q and q[0] <= now - window_sec:
+            q.popleft()
+        return q
+
+    def count(self, key: str, window_sec: int, now: float) -> int:
+        with self._lock:
+            return len(self._window(key, window_sec, now))
+
+    def add(self, key: str, window_sec: int, now: float) -> None:
+        with self._lock:
+            q = self._window(key, window_sec, now)
+            q.append(now)
+            self._hits.set(key, q, ttl=window_sec)
+
+    def hit(self, key: str, limit: int, window_sec: int, now: float) -> tuple[bool, float]:
+        with self._lock:
+            q = self._window(key, window_sec, now)
+            if len(q) >= limit:
+                return False, q[0] + window_sec - now
+            q.append(now)
+            self._hits.set(key, q, ttl=window_sec)
+            return True, 0.0
+
+
+class RedisBackend:
+    def __init__(self, client: redis.Redis):
+        self._script = client.register_script(SLIDING_WINDOW_LUA)
+
+    def hit(self, key: str, limit: int, window_sec: int, now: float) -> tuple[bool, float]:
+        allowed, retry_ms = self._script(
+            keys=[key],
+            args=[int(now * 1000), int(window_sec * 1000), int(limit), f"{now:.6f}:{uuid.uuid4().hex[:8]}"],
+        )
+        return bool(int(allowed)), int(retry_ms) / 1000.0
+
+
+class SlidingWindowLimiter:
+    def __init__(self, backend, prefilter: bool = True, max_local_keys: int = 100000):
+        self.backend = backend
+        # Pre-filtro: hits aceptados por este worker (subconjunto de los globales)
+        # y bloqueos con retry-after informados por el backend
+        self._local = MemoryBackend(max_keys=max_local_keys) if prefilter else None
+        self._blocked = TTLCache(maxsize=max_local_keys, ttl=60)
+        self.stats = {"allowed": 0, "rejected": 0, "rejected_local": 0}
+
+    def hit(self, key: str, limit: int, window_sec: int) -> bool:
+        """Registra un intento; devuelve True si debe rechazarse."""
+        now = time.time()
+        until = self._blocked.get(key)
+        if until is not None and until > now:
+            self.stats["rejected_local"] += 1
+            return True
+        if self._local is not None and self._local.count(key, window_sec, now) >= limit:
+            self.stats["rejected_local"] += 1
+            return True
+        allowed, retry_after = self.backend.hit(key, limit, window_sec, now)
+        if not allowed:
+            self.stats["rejected"] += 1
+            if retry_after > 0:
+                self._blocked.set(key, now + retry_after, ttl=retry_after)
+            return True
+        if self._local is not None:
+            self._local.add(key, window_sec, now)
+        self.stats["allowed"] += 1
+        return False
+
+
+def _enabled() -> bool:
+    if settings.RATE_LIMIT_ENABLED is not None:
+        return settings.RATE_LIMIT_ENABLED
+    # Por defecto sólo en producción, para evitar flakiness en dev/tests
+    return settings.APP_ENV == "production"
+
+
+def _build_limiter() -> SlidingWindowLimiter:
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        # El backend ya es local: el pre-filtro sólo duplicaría el conteo
+        return SlidingWindowLimiter(MemoryBackend(), prefilter=False)
+    return SlidingWindowLimiter(RedisBackend(r))
+
+
+limiter = _build_limiter()
+
+
 def too_many_attempts(client_id: str, limit: int = 5, window_sec: int = 900) -> bool:
-    # Disable rate limiting outside production to avoid flakiness in dev/tests
-    if settings.APP_ENV != "production":
+    if not _enabled():
         return False
     # Generic namespacing; caller provides a meaningful key (e.g., "login:<ip>" or "cart_items:<ip>")
     key = f"rl:{client_id}"
-    hits = r.incr(key)
-    if hits == 1:
-        r.expire(key, window_sec)
-    return hits > limit
\ No newline at end of file
+    try:
+        return limiter.hit(key, limit, window_sec)
+    except redis.RedisError:
+        # Redis caído: no bloquear logins por un problema de infraestructura
+        return False
@@ -0,0 +1,44 @@
+import logging
+import time
+from typing import Optional
+
+import redis
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[redis.Redis] = None
+_down_until: float = 0.0
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Cliente Redis compartido para cachés (decode_responses=True).
+
+    Devuelve None mientras Redis esté marcado como caído, para que los
+    llamadores degraden a su fuente primaria sin pagar timeouts en cada request.
+    """
+    global _client
+    if _down_until and time.monotonic() < _down_until:
+        return None
+    if _client is None:
+        try:
+            _client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                decode_responses=True,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            )
+        except Exception as e:
+            logger.warning("redis_client_init_failed", extra={"error": str(e)})
+            _client = None
+    return _client
+
+
+def mark_redis_down(error: Exception | None = None) -> None:
+    """Suspende el uso de Redis durante REDIS_RETRY_AFTER_SECONDS."""
+    global _down_until
+    _down_until = time.monotonic() + settings.REDIS_RETRY_AFTER_SECONDS
+    logger.warning("redis_marked_down", extra={"error": str(error) if error else None})
@@ -1,10 +1,16 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from jose import jwt
 from passlib.context import CryptContext
+from app.common.ttl_cache import TTLCache
 from app.core.settings import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Claims ya verificados, indexados por digest del token (nunca el token en claro)
+_verified_tokens = TTLCache(maxsize=settings.JWT_DECODE_CACHE_SIZE, ttl=settings.JWT_DECODE_CACHE_TTL_SECONDS)
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -15,4 +21,34 @@ def create_access_token(data: dict, expires_minutes: int | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=expires_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
\ No newline at end of file
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+def create_user_token(user, expires_minutes: int | None = None) -> str:
+    # uid/role/ver permiten autorizar sin leer la tabla users (ver app.api.deps)
+    return create_access_token(
+        {"sub": user.email, "uid": int(user.id), "role": user.role, "ver": int(user.token_version or 0)},
+        expires_minutes=expires_minutes,
+    )
+
+
+def decode_access_token(token: str) -> dict:
+    """jwt.decode memoizado: la entrada vive como máximo hasta el `exp` del token.
+
+    Lanza JWTError igual que jwt.decode; los tokens inválidos no se cachean.
+    El dict devuelto es compartido: tratarlo como sólo lectura.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    now = time.time()
+    claims = _verified_tokens.get(key)
+    if claims is not None and claims.get("exp", 0) > now:
+        return claims
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    exp = claims.get("exp")
+    if exp is not None:
+        ttl = min(float(settings.JWT_DECODE_CACHE_TTL_SECONDS), float(exp) - now)
+        if ttl > 0:
+            _verified_tokens.set(key, claims, ttl=ttl)
+    return claims
+
+def token_cache_stats() -> dict:
+    return _verified_tokens.stats()
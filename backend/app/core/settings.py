@@ -13,10 +13,63 @@ class Settings(BaseSettings):
     DB_USER: str = "ecom_user"
     DB_PASSWORD: str = "ecom_pass"
     DB_NAME: str = "ecommerce"
+    # URL completa opcional (p.ej. sqlite:///./local.db para tests locales)
+    DB_URL: Optional[str] = None
+    # Rutas async (catálogo, carrito, webhooks) sobre AsyncSession (aiomysql/aiosqlite)
+    DB_ASYNC_ENABLED: bool = False
+    # Pool de conexiones (por engine y por worker) y pre-calentado al arrancar
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PREWARM: bool = True
+    # Búsqueda de catálogo: "index" (índice invertido in-process) o "like" (ILIKE sobre name/sku/description)
+    CATALOG_SEARCH_BACKEND: str = "index"
+    CATALOG_SEARCH_REFRESH_SECONDS: float = 2.0
+    CATALOG_SEARCH_REBUILD_SECONDS: int = 900
+    # Matches del índice que se pasan a SQL para ordenar por otro campo o agregar facetas
+    CATALOG_SEARCH_MAX_MATCHES: int = 5000
+    # Listado desde la proyección product_listing (false: products + consultas de precios/stock)
+    CATALOG_LISTING_READS: bool = True
+    # Tramos de precio (retail) de los facets: límites inferiores, el último sin tope
+    CATALOG_PRICE_BUCKETS: List[float] = [0, 50000, 100000, 250000, 500000, 1000000]
+    # URL pública de un producto (BASE_URL + path) para feeds y sitemap
+    CATALOG_PRODUCT_PATH: str = "/products/{slug}"
+    CATALOG_CATEGORY_PATH: str = "/categories/{slug}"
+    # Sitemap: URLs por shard de productos (límite del protocolo: 50k); al cambiarlo, python -m app.rebuild_sitemap
+    CATALOG_SITEMAP_SHARD_SIZE: int = 45000
+    CATALOG_FEED_TITLE: str = "Catálogo"
+    # Feed de cambios (/catalog/changes): no servir filas más nuevas que esto (commits en vuelo)
+    CATALOG_CHANGES_LAG_SECONDS: float = 5.0
+    # Caché de respuestas del catálogo (LRU local + Redis), invalidada por versión
+    CATALOG_CACHE_ENABLED: bool = True
+    CATALOG_CACHE_MAX_ENTRIES: int = 2000
+    CATALOG_CACHE_LOCAL_TTL_SECONDS: int = 60
+    CATALOG_CACHE_REDIS_TTL_SECONDS: int = 600
+    # Cada cuánto un worker relee la versión de Redis (demora de invalidación entre workers)
+    CATALOG_CACHE_VERSION_TTL_SECONDS: float = 1.0
+    # PriceBook (services/pricing.py): tiers por producto en memoria, invalidados por versión "prices"
+    PRICEBOOK_MAX_ENTRIES: int = 20000
+    PRICEBOOK_TTL_SECONDS: int = 300
+    # Cada cuánto un worker relee qué lista de precios está vigente (services/price_lists.py)
+    PRICING_ACTIVE_VERSION_TTL_SECONDS: float = 1.0
+    # Server-Timing con SQL por request: None = todo salvo producción
+    SERVER_TIMING_ENABLED: Optional[bool] = None
+    # Misma sentencia repetida N veces en un request → log n_plus_one_suspect
+    DB_N_PLUS_ONE_THRESHOLD: int = 10
+    # Réplicas de lectura (JSON: ["mysql+pymysql://...@replica1/ecommerce", ...])
+    DB_REPLICA_URLS: List[str] = []
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_LAG_CHECK_SECONDS: float = 5.0
+    # Tras escribir, el cliente lee del primario durante esta ventana (read-your-writes)
+    DB_READ_YOUR_WRITES_SECONDS: int = 10
 
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    # Cachés sobre Redis: timeout corto y pausa tras fallo para degradar rápido
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.25
+    REDIS_RETRY_AFTER_SECONDS: int = 30
 
     # Celery
     @property
@@ -52,6 +105,24 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Caché de usuario autenticado (LRU local + Redis compartido)
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 30
+    USER_CACHE_REDIS_TTL_SECONDS: int = 300
+    # Copia local de token_version: acota la demora de una revocación entre workers
+    TOKEN_VERSION_LOCAL_TTL_SECONDS: int = 5
+    # Memo de JWT verificados (acotado además por el exp de cada token)
+    JWT_DECODE_CACHE_SIZE: int = 10000
+    JWT_DECODE_CACHE_TTL_SECONDS: int = 300
+    # bcrypt fuera del threadpool: procesos dedicados y cola máxima por worker
+    PASSWORD_POOL_WORKERS: int = 2
+    PASSWORD_POOL_MAX_PENDING: int = 64
+
+    # Rate limiting: None = sólo en producción; backend "redis" (Lua) o "memory" (dev/test)
+    RATE_LIMIT_ENABLED: Optional[bool] = None
+    RATE_LIMIT_BACKEND: str = "redis"
+
     CORS_ALLOW_ORIGINS: List[str] = ["http://localhost", "http://localhost:8000"]
 
     # Alertas y thresholds (v0.7)
@@ -67,11 +138,17 @@ class Settings(BaseSettings):
 
     @property
     def DATABASE_URL(self) -> str:
+        if self.DB_URL:
+            return self.DB_URL
         return (
             f"mysql+pymysql://{self.DB_USER}:{self.DB_PASSWORD}"
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return async_url(self.DATABASE_URL)
+
     # Helpers Mercado Pago
     @property
     def MP_ACCESS_TOKEN(self) -> str:
@@ -108,4 +185,11 @@ class Settings(BaseSettings):
 
     model_config = SettingsConfigDict(env_file=".env", extra="allow")
 
+def async_url(url: str) -> str:
+    """Traduce la URL sync al driver async equivalente (pymysql→aiomysql, sqlite→aiosqlite)."""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    driver = {"mysql": "aiomysql", "sqlite": "aiosqlite"}.get(dialect)
+    return f"{dialect}+{driver}{sep}{rest}" if driver else url
+
 settings = Settings()
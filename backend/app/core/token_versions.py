@@ -0,0 +1,48 @@
+"""Versión vigente de tokens por usuario (revocación de JWT en O(1)).
+
+El valor canónico es `users.token_version`; Redis mantiene una copia
+(`auth:tv:<uid>`) para que las dependencias validen el claim `ver` sin tocar
+MySQL. Si Redis no tiene el valor (o está caído) el llamador cae al camino
+lento, que carga el usuario y vuelve a publicar la versión.
+"""
+from app.common.ttl_cache import TTLCache
+from app.core.redis_client import get_redis, mark_redis_down
+from app.core.settings import settings
+
+REDIS_PREFIX = "auth:tv:"
+
+_local = TTLCache(maxsize=settings.USER_CACHE_MAX_ENTRIES, ttl=settings.TOKEN_VERSION_LOCAL_TTL_SECONDS)
+
+
+def current(user_id: int) -> int | None:
+    ver = _local.get(user_id)
+    if ver is not None:
+        return ver
+    r = get_redis()
+    if r is None:
+        return None
+    try:
+        raw = r.get(f"{REDIS_PREFIX}{user_id}")
+    except Exception as e:
+        mark_redis_down(e)
+        return None
+    if raw is None:
+        return None
+    ver = int(raw)
+    _local.set(user_id, ver)
+    return ver
+
+
+def publish(user_id: int, version: int) -> None:
+    _local.set(user_id, int(version))
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.set(f"{REDIS_PREFIX}{user_id}", int(version))
+    except Exception as e:
+        mark_redis_down(e)
+
+
+def stats() -> dict:
+    return {"local": _local.stats()}
@@ -0,0 +1,172 @@
+"""Caché del usuario autenticado por subject del token (email).
+
+Dos niveles: LRU+TTL in-process (TTL corto) y Redis compartido entre workers.
+Se invalida cuando cambian `role` o `is_active` (o el email) vía eventos del
+mapper de User, así que una baja o cambio de rol no espera a que expire el TTL.
+Esos mismos cambios incrementan `token_version`, revocando los JWT emitidos.
+Un hit local se sirve sólo si su `token_version` coincide con la publicada en
+Redis (token_versions): los demás workers ven el cambio en a lo sumo
+TOKEN_VERSION_LOCAL_TTL_SECONDS, no en USER_CACHE_LOCAL_TTL_SECONDS.
+"""
+import json
+import logging
+from dataclasses import dataclass, asdict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.common.ttl_cache import TTLCache
+from app.core.redis_client import get_redis, mark_redis_down
+from app.core import token_versions
+from app.core.settings import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = "auth:user:"
+_INVALIDATE_KEY = "user_cache_invalidate"
+_PUBLISH_KEY = "user_token_versions"
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """Snapshot inmutable del usuario (sin hash de password) usado por las dependencias de auth."""
+
+    id: int
+    email: str
+    role: str
+    is_active: bool
+    token_version: int = 0
+
+
+_local = TTLCache(maxsize=settings.USER_CACHE_MAX_ENTRIES, ttl=settings.USER_CACHE_LOCAL_TTL_SECONDS)
+_redis_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+
+def snapshot(user: User) -> AuthUser:
+    return AuthUser(
+        id=int(user.id),
+        email=str(user.email),
+        role=str(user.role),
+        is_active=bool(user.is_active),
+        token_version=int(user.token_version or 0),
+    )
+
+
+def get_user(subject: str) -> AuthUser | None:
+    if not settings.USER_CACHE_ENABLED:
+        return None
+    cached = _local.get(subject)
+    if cached is not None:
+        published = token_versions.current(cached.id)
+        if published is None or published == cached.token_version:
+            return cached
+        # Rol/estado cambiado en otro worker: la copia local quedó vieja
+        _local.pop(subject)
+    r = get_redis()
+    if r is None:
+        return None
+    try:
+        raw = r.get(REDIS_PREFIX + subject)
+    except Exception as e:
+        _redis_stats["errors"] += 1
+        mark_redis_down(e)
+        return None
+    if not raw:
+        _redis_stats["misses"] += 1
+        return None
+    user = AuthUser(**json.loads(raw))
+    published = token_versions.current(user.id)
+    if published is not None and published != user.token_version:
+        # Snapshot anterior al cambio (re-cacheado en carrera): camino lento
+        _redis_stats["misses"] += 1
+        return None
+    _redis_stats["hits"] += 1
+    _local.set(subject, user)
+    return user
+
+
+def put_user(user: User | AuthUser) -> AuthUser:
+    snap = user if isinstance(user, AuthUser) else snapshot(user)
+    if not settings.USER_CACHE_ENABLED:
+        return snap
+    _local.set(snap.email, snap)
+    r = get_redis()
+    if r is not None:
+        try:
+            r.set(REDIS_PREFIX + snap.email, json.dumps(asdict(snap)), ex=settings.USER_CACHE_REDIS_TTL_SECONDS)
+        except Exception as e:
+            _redis_stats["errors"] += 1
+            mark_redis_down(e)
+    return snap
+
+
+def invalidate(subject: str) -> None:
+    _local.pop(subject)
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.delete(REDIS_PREFIX + subject)
+    except Exception as e:
+        _redis_stats["errors"] += 1
+        mark_redis_down(e)
+
+
+def stats() -> dict:
+    return {"local": _local.stats(), "redis": dict(_redis_stats)}
+
+
+def _queue_invalidation(target: User, subjects: set[str]) -> None:
+    for s in subjects:
+        invalidate(s)
+    # Repetir tras el commit: evita que un lector concurrente re-cachee el estado previo
+    sess = object_session(target)
+    if sess is not None:
+        sess.info.setdefault(_INVALIDATE_KEY, set()).update(subjects)
+
+
+@event.listens_for(User, "before_update")
+def _user_before_update(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    if state.attrs.token_version.history.has_changes():
+        return
+    if any(state.attrs[a].history.has_changes() for a in ("role", "is_active")):
+        # Cambio de rol o baja: los tokens con el rol/estado anterior dejan de valer
+        target.token_version = int(target.token_version or 0) + 1
+
+
+@event.listens_for(User, "after_update")
+def _user_after_update(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    if state.attrs.token_version.history.has_changes():
+        sess = object_session(target)
+        if sess is not None:
+            sess.info.setdefault(_PUBLISH_KEY, {})[int(target.id)] = int(target.token_version)
+    changed = any(state.attrs[a].history.has_changes() for a in ("role", "is_active", "email", "token_version"))
+    if not changed:
+        return
+    subjects = {str(target.email)}
+    subjects.update(str(e) for e in state.attrs.email.history.deleted or () if e)
+    _queue_invalidation(target, subjects)
+
+
+@event.listens_for(User, "after_delete")
+def _user_after_delete(mapper, connection, target: User) -> None:
+    _queue_invalidation(target, {str(target.email)})
+
+
+@event.listens_for(Session, "after_commit")
+def _flush_invalidations(session: Session) -> None:
+    subjects = session.info.pop(_INVALIDATE_KEY, None)
+    for s in subjects or ():
+        invalidate(s)
+    versions = session.info.pop(_PUBLISH_KEY, None)
+    for user_id, version in (versions or {}).items():
+        token_versions.publish(user_id, version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_INVALIDATE_KEY, None)
+    session.info.pop(_PUBLISH_KEY, None)
@@ -1,12 +1,14 @@
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate
 from app.core.security import create_access_token, hash_password, verify_password
+from app.core.password_pool import hash_password_async, verify_password_async
 
-def create_user(db: Session, user_in: UserCreate) -> User:
+def _insert_user(db: Session, email: str, hashed_password: str) -> User:
     user = User(
-        email=user_in.email,
-        hashed_password=hash_password(user_in.password),  # Hash the password
+        email=email,
+        hashed_password=hashed_password,
         is_active=True,
         role="user"
     )
@@ -15,10 +17,39 @@ def create_user(db: Session, user_in: UserCreate) -> User:
     db.refresh(user)
     return user
 
+def get_user_by_email(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
+
+def create_user(db: Session, user_in: UserCreate) -> User:
+    return _insert_user(db, user_in.email, hash_password(user_in.password))  # Hash the password
+
 def authenticate_user(db: Session, email: str, password: str) -> User | None:
-    user = db.query(User).filter(User.email == email).first()
+    user = get_user_by_email(db, email)
     if not user:
         return None
     if not verify_password(password, user.hashed_password):  # Verify hashed password
         return None
-    return user
\ No newline at end of file
+    return user
+
+async def create_user_async(db: Session, user_in: UserCreate) -> User:
+    # bcrypt en el pool de procesos; la escritura en DB en el threadpool
+    hashed = await hash_password_async(user_in.password)
+    return await run_in_threadpool(_insert_user, db, user_in.email, hashed)
+
+async def authenticate_user_async(db: Session, email: str, password: str) -> User | None:
+    user = await run_in_threadpool(get_user_by_email, db, email)
+    if not user:
+        return None
+    if not await verify_password_async(password, user.hashed_password):
+        return None
+    return user
+
+def revoke_tokens(db: Session, user_id: int) -> User | None:
+    # Invalida todos los JWT del usuario (ver claim "ver" en app.api.deps)
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        return None
+    user.token_version = int(user.token_version or 0) + 1
+    db.commit()
+    db.refresh(user)
+    return user
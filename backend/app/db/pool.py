@@ -0,0 +1,192 @@
+"""Pool de conexiones instrumentado y pre-calentado.
+
+`InstrumentedQueuePool` mide cuánto espera cada checkout por una conexión
+(lo que no exponen los eventos del pool); los eventos connect/close llevan la
+edad de las conexiones e in-use/overflow salen del propio pool. Cada engine
+se registra con un nombre ("primary", "replica0", ...) para /health.
+"""
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._recent_waits: deque[float] = deque(maxlen=window)
+        self.opened = 0
+        self.closed = 0
+        self._born: dict[int, float] = {}
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._recent_waits.append(seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def opened_conn(self, key: int) -> None:
+        with self._lock:
+            self.opened += 1
+            self._born[key] = time.monotonic()
+
+    def closed_conn(self, key: int) -> None:
+        with self._lock:
+            if self._born.pop(key, None) is not None:
+                self.closed += 1
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            waits = sorted(self._recent_waits)
+            ages = [now - t for t in self._born.values()]
+            checkouts = self.checkouts
+            return {
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms": {
+                    "avg": round(self.wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                    "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 3) if waits else 0.0,
+                    "max": round(self.wait_max * 1000, 3),
+                },
+                "connections": {
+                    "opened": self.opened,
+                    "closed": self.closed,
+                    "open": len(ages),
+                    "oldest_age_s": round(max(ages), 1) if ages else 0.0,
+                    "avg_age_s": round(sum(ages) / len(ages), 1) if ages else 0.0,
+                },
+            }
+
+
+class _InstrumentedMixin:
+    metrics: PoolMetrics
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_wait(time.perf_counter() - t0)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() recrea el pool: conservar los contadores acumulados
+        new = super().recreate()
+        new.metrics = self.metrics
+        return new
+
+
+class InstrumentedQueuePool(_InstrumentedMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+_engines: dict[str, object] = {}
+
+
+def _sync_engine(engine):
+    return getattr(engine, "sync_engine", engine)
+
+
+def register(name: str, engine) -> None:
+    """Registra un engine (sync o async) para métricas y pre-calentado."""
+    _engines[name] = engine
+    sync_engine = _sync_engine(engine)
+
+    def metrics() -> PoolMetrics | None:
+        return getattr(sync_engine.pool, "metrics", None)
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        m = metrics()
+        if m is not None:
+            m.opened_conn(id(record))
+
+    @event.listens_for(sync_engine, "close")
+    def _on_close(dbapi_conn, record):
+        m = metrics()
+        if m is not None:
+            m.closed_conn(id(record))
+
+
+def stats() -> dict:
+    out = {}
+    for name, engine in _engines.items():
+        pool = _sync_engine(engine).pool
+        data = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+            )
+        m = getattr(pool, "metrics", None)
+        if m is not None:
+            data.update(m.snapshot())
+        out[name] = data
+    return out
+
+
+def prewarm(engine, n: int | None = None) -> int:
+    """Abre `n` conexiones (por defecto pool_size) y las devuelve al pool."""
+    pool = engine.pool
+    n = n if n is not None else (pool.size() if isinstance(pool, QueuePool) else 1)
+    conns = []
+    try:
+        for _ in range(n):
+            conns.append(engine.raw_connection())
+    finally:
+        for c in conns:
+            c.close()
+    return len(conns)
+
+
+async def prewarm_async(engine, n: int | None = None) -> int:
+    pool = engine.sync_engine.pool
+    n = n if n is not None else (pool.size() if isinstance(pool, QueuePool) else 1)
+    async with contextlib.AsyncExitStack() as stack:
+        for _ in range(n):
+            await stack.enter_async_context(engine.connect())
+    return n
+
+
+async def prewarm_all(n: int | None = None) -> dict:
+    """Pre-calienta todos los engines registrados; un fallo no impide el arranque."""
+    done = {}
+    for name, engine in list(_engines.items()):
+        try:
+            if hasattr(engine, "sync_engine"):
+                done[name] = await prewarm_async(engine, n)
+            else:
+                done[name] = await asyncio.to_thread(prewarm, engine, n)
+        except Exception as e:
+            done[name] = 0
+            logger.warning("db_pool_prewarm_failed", extra={"engine": name, "error": str(e)})
+    return done
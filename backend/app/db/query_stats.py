@@ -0,0 +1,102 @@
+"""Conteo de SQL por request (y por bloque) con detector de N+1.
+
+Los eventos de cursor de todos los Engine suman sentencias y tiempo de DB a
+los `QueryStats` activos en el contexto actual (contextvar: sigue al request
+en el threadpool y dentro de AsyncSession.run_sync). El middleware expone el
+resultado como `Server-Timing`; `query_budget` sirve para tests.
+"""
+import contextlib
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_active: ContextVar[tuple["QueryStats", ...]] = ContextVar("query_stats", default=())
+_START_KEY = "query_stats_start"
+_LITERALS = re.compile(r"\b\d+\b|'[^']*'")
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def add(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        # Normalizar literales: "IN (1, 2)" e "IN (3, 4)" son la misma forma
+        self.statements[_LITERALS.sub("?", " ".join(statement.split()))] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Sentencias ejecutadas >= threshold veces (sospecha de N+1)."""
+        return [(s, n) for s, n in self.statements.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+
+@contextlib.contextmanager
+def collect() -> Iterator[QueryStats]:
+    """Acumula las sentencias ejecutadas dentro del bloque (anidable)."""
+    stats = QueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextlib.contextmanager
+def query_budget(max_queries: int, n_plus_one_threshold: int | None = None) -> Iterator[QueryStats]:
+    """Falla si el bloque ejecuta más de `max_queries` sentencias.
+
+    Con `n_plus_one_threshold` también falla si una misma sentencia se repite
+    esa cantidad de veces aunque el total entre en el presupuesto.
+    """
+    with collect() as stats:
+        yield stats
+    repeated = stats.repeated(n_plus_one_threshold) if n_plus_one_threshold else []
+    if stats.count > max_queries or repeated:
+        top = "\n".join(f"  {n}x {s[:160]}" for s, n in (repeated or stats.statements.most_common(5)))
+        raise QueryBudgetExceeded(f"{stats.count} queries (budget {max_queries}):\n{top}")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get():
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    active = _active.get()
+    starts = conn.info.get(_START_KEY)
+    if not active or not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    for stats in active:
+        stats.add(statement, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_failed_start(context):
+    # Sentencia fallida: no hubo after_cursor_execute, descartar su inicio
+    conn = context.connection
+    if conn is None or not _active.get():
+        return
+    try:
+        starts = conn.info.get(_START_KEY)
+    except Exception:
+        # Conexión invalidada: su info ya no es accesible
+        return
+    if starts:
+        starts.pop()
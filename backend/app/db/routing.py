@@ -0,0 +1,228 @@
+"""Ruteo de lecturas a réplicas (catálogo, métricas, snapshots, exports).
+
+- `RoutingSession` (sólo para dependencias de lectura) elige una réplica sana
+  una vez por sesión; DML, SELECT ... FOR UPDATE y flushes van al primario y
+  fijan la sesión al primario desde ese momento.
+- Read-your-writes: tras un commit con escrituras, el cliente (cookie de
+  sesión o IP) lee del primario durante DB_READ_YOUR_WRITES_SECONDS. Marca
+  local + Redis para que valga entre workers.
+- Lag: cada réplica se sondea como mucho cada DB_REPLICA_LAG_CHECK_SECONDS;
+  si supera DB_REPLICA_MAX_LAG_SECONDS (o no responde) se usa el primario.
+"""
+import itertools
+import logging
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.common.ttl_cache import TTLCache
+from app.core.redis_client import get_redis, mark_redis_down
+from app.core.settings import async_url, settings
+from app.db import pool as db_pool
+from app.db.session import _engine_kwargs, engine, get_async_engine
+
+logger = logging.getLogger(__name__)
+
+STICKY_PREFIX = "db:sticky:"
+_WROTE_KEY = "db_wrote"
+
+_sticky = TTLCache(maxsize=100000, ttl=settings.DB_READ_YOUR_WRITES_SECONDS)
+_stats = {"primary_reads": 0, "fallback_sticky": 0, "fallback_lag": 0, "fallback_write": 0}
+
+
+class Replica:
+    def __init__(self, name: str, url: str, is_async: bool = False):
+        self.name = name
+        self.is_async = is_async
+        if is_async:
+            url = async_url(url)
+            self._async_engine = create_async_engine(url, **_engine_kwargs(url, is_async=True))
+            # RoutingSession es sync (AsyncSession la envuelve): se enlaza al sync_engine
+            self.engine: Engine = self._async_engine.sync_engine
+            db_pool.register(f"{name}_async", self._async_engine)
+        else:
+            self.engine = create_engine(url, **_engine_kwargs(url))
+            db_pool.register(name, self.engine)
+        self.lag: float | None = None
+        self.healthy = True
+        self.reads = 0
+        self.errors = 0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def usable(self) -> bool:
+        now = time.monotonic()
+        # Un solo hilo sondea; el resto usa el último estado conocido
+        if now - self._checked_at >= settings.DB_REPLICA_LAG_CHECK_SECONDS and self._lock.acquire(blocking=False):
+            try:
+                self._checked_at = now
+                self.lag = measure_lag(self.engine)
+                self.healthy = self.lag is not None and self.lag <= settings.DB_REPLICA_MAX_LAG_SECONDS
+            except Exception as e:
+                self.errors += 1
+                self.lag, self.healthy = None, False
+                logger.warning("db_replica_check_failed", extra={"replica": self.name, "error": str(e)})
+            finally:
+                self._lock.release()
+        return self.healthy
+
+    def stats(self) -> dict:
+        return {"reads": self.reads, "lag": self.lag, "healthy": self.healthy, "errors": self.errors}
+
+
+def measure_lag(engine: Engine) -> float | None:
+    """Segundos de atraso de la réplica; None si la replicación está detenida."""
+    if engine.dialect.name != "mysql":
+        # SQLite/otros (tests locales): no hay replicación que medir
+        return 0.0
+    with engine.connect() as conn:
+        try:
+            row = conn.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+        except Exception:
+            # MySQL < 8.0.22
+            row = conn.exec_driver_sql("SHOW SLAVE STATUS").mappings().first()
+    if row is None:
+        # Sin canal de replicación configurado (copia estática): se considera al día
+        return 0.0
+    lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+    return None if lag is None else float(lag)
+
+
+_replicas: dict[bool, list[Replica]] = {}
+_cursor: dict[bool, "itertools.count[int]"] = {}
+_init_lock = threading.Lock()
+
+
+def replicas(is_async: bool = False) -> list[Replica]:
+    if is_async not in _replicas:
+        with _init_lock:
+            if is_async not in _replicas:
+                _replicas[is_async] = [
+                    Replica(f"replica{i}", url, is_async) for i, url in enumerate(settings.DB_REPLICA_URLS)
+                ]
+                _cursor[is_async] = itertools.count()
+    return _replicas[is_async]
+
+
+def pick_replica(is_async: bool = False) -> Replica | None:
+    pool = replicas(is_async)
+    if not pool:
+        return None
+    start = next(_cursor[is_async])
+    for i in range(len(pool)):
+        rep = pool[(start + i) % len(pool)]
+        if rep.usable():
+            return rep
+    return None
+
+
+def mark_write(client: str) -> None:
+    _sticky.set(client, True)
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.set(STICKY_PREFIX + client, 1, ex=settings.DB_READ_YOUR_WRITES_SECONDS)
+    except Exception as e:
+        mark_redis_down(e)
+
+
+def is_sticky(client: str | None) -> bool:
+    if not client:
+        return False
+    if _sticky.get(client):
+        return True
+    r = get_redis()
+    if r is None:
+        return False
+    try:
+        return bool(r.exists(STICKY_PREFIX + client))
+    except Exception as e:
+        mark_redis_down(e)
+        return False
+
+
+def stats() -> dict:
+    engines = {"primary": {"reads": _stats["primary_reads"]}}
+    for is_async, pool in _replicas.items():
+        for rep in pool:
+            engines[f"{rep.name}{'_async' if is_async else ''}"] = rep.stats()
+    return {
+        "replicas_configured": len(settings.DB_REPLICA_URLS),
+        "engines": engines,
+        "fallbacks": {k[len("fallback_"):]: v for k, v in _stats.items() if k.startswith("fallback_")},
+    }
+
+
+class RoutingSession(Session):
+    """Session de sólo lectura: SELECTs a una réplica sana, el resto al primario.
+
+    `info`: "client" (clave de stickiness) y "async" (usar las réplicas async).
+    """
+
+    _UNSET = object()
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary = super().get_bind(mapper, clause=clause, **kw)
+        if self._flushing or getattr(clause, "is_dml", False) or getattr(clause, "_for_update_arg", None) is not None:
+            if self.info.get("replica") is not None:
+                _stats["fallback_write"] += 1
+            self.info["replica"] = None
+            return primary
+        rep = self.info.get("replica", self._UNSET)
+        if rep is self._UNSET:
+            rep = self._choose()
+            self.info["replica"] = rep
+        if rep is None:
+            _stats["primary_reads"] += 1
+            return primary
+        rep.reads += 1
+        return rep.engine
+
+    def _choose(self) -> Replica | None:
+        if not settings.DB_REPLICA_URLS:
+            return None
+        if is_sticky(self.info.get("client")):
+            _stats["fallback_sticky"] += 1
+            return None
+        rep = pick_replica(bool(self.info.get("async")))
+        if rep is None:
+            _stats["fallback_lag"] += 1
+        return rep
+
+
+@event.listens_for(Session, "after_flush")
+def _note_write(session: Session, flush_context) -> None:
+    session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _stick_to_primary(session: Session) -> None:
+    if session.info.pop(_WROTE_KEY, False) and session.info.get("client") and settings.DB_REPLICA_URLS:
+        mark_write(session.info["client"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session: Session) -> None:
+    session.info.pop(_WROTE_KEY, None)
+
+
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+_async_read_sessionmaker = None
+
+
+def AsyncReadSessionLocal() -> AsyncSession:
+    global _async_read_sessionmaker
+    if _async_read_sessionmaker is None:
+        _async_read_sessionmaker = async_sessionmaker(
+            get_async_engine(),
+            sync_session_class=RoutingSession,
+            autoflush=False,
+            expire_on_commit=False,
+            info={"async": True},
+        )
+    return _async_read_sessionmaker()
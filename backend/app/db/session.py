@@ -1,12 +1,135 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
+from typing import Any, Callable
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.settings import settings
+from app.db import pool as db_pool
+
+
+def _engine_kwargs(url: str, is_async: bool = False) -> dict:
+    # SQLite (tests locales) no admite los parámetros de pool de MySQL
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": db_pool.InstrumentedAsyncQueuePool if is_async else db_pool.InstrumentedQueuePool,
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=1800,
-)
+engine = create_engine(settings.DATABASE_URL, **_engine_kwargs(settings.DATABASE_URL))
+db_pool.register("primary", engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+_TOUCHED_KEY = "db_touched"
+
+
+@event.listens_for(Session, "after_begin")
+def _mark_touched(session: Session, transaction, connection) -> None:
+    # after_begin = la sesión tomó una conexión del pool
+    session.info[_TOUCHED_KEY] = True
+
+
+class LazySession:
+    """Proxy de Session que recién la construye en el primer uso real.
+
+    Los handlers que cortan antes (validación, rate limit, caché) no crean
+    sesión; `touched` indica si además llegó a tomar una conexión del pool.
+    """
+
+    def __init__(self, factory: Callable[..., Session], **kwargs: Any):
+        self._factory = factory
+        self._kwargs = kwargs
+        self._session: Session | None = None
+
+    @property
+    def created(self) -> bool:
+        return self._session is not None
+
+    @property
+    def touched(self) -> bool:
+        return self._session is not None and bool(self._session.info.get(_TOUCHED_KEY))
+
+    def __getattr__(self, name: str) -> Any:
+        if self._session is None:
+            self._session = self._factory(**self._kwargs)
+        return getattr(self._session, name)
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+
+
+_session_lock = threading.Lock()
+_session_stats = {"requests": 0, "created": 0, "touched": 0}
+_route_stats: dict[str, dict] = {}
+
+
+def record_session(route: str, created: bool, touched: bool, new_request: bool = True) -> None:
+    """Cuenta por ruta cuántos requests con sesión llegaron a usar la DB."""
+    with _session_lock:
+        _session_stats["requests"] += int(new_request)
+        _session_stats["created"] += int(created)
+        _session_stats["touched"] += int(touched)
+        r = _route_stats.setdefault(route, {"requests": 0, "touched": 0})
+        r["requests"] += int(new_request)
+        r["touched"] += int(touched)
+
+
+def session_stats() -> dict:
+    with _session_lock:
+        requests = _session_stats["requests"]
+        return {
+            **_session_stats,
+            "touched_ratio": round(_session_stats["touched"] / requests, 3) if requests else 0.0,
+            "routes": {k: dict(v) for k, v in _route_stats.items()},
+        }
+
+# Motor async: se crea recién al primer uso para no exigir aiomysql si DB_ASYNC_ENABLED=False
+_async_engine = None
+_async_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        url = settings.ASYNC_DATABASE_URL
+        _async_engine = create_async_engine(url, **_engine_kwargs(url, is_async=True))
+        db_pool.register("primary_async", _async_engine)
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        # expire_on_commit=False: los handlers serializan después del commit sin lazy-loads
+        _async_sessionmaker = async_sessionmaker(
+            get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmaker()
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
+
+
+async def run_db(db: Session | AsyncSession, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Ejecuta `fn(session, ...)` (código ORM sync) sin bloquear el event loop.
+
+    Con AsyncSession usa `run_sync` (el I/O va por el driver async); con una
+    Session clásica lo delega al threadpool. `fn` debe devolver datos ya
+    serializados (dicts/schemas): fuera de esta llamada no hay lazy-loads.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
@@ -0,0 +1,24 @@
+from sqlalchemy import Numeric
+from sqlalchemy.types import TypeDecorator
+
+from app.common.money import Money
+
+
+class MoneyType(TypeDecorator):
+    """Numeric(12, 2) en la base, Money en Python.
+
+    Al escribir acepta Money o un importe en unidades (Decimal/int/float),
+    como Numeric; al leer siempre devuelve Money.
+    """
+
+    impl = Numeric
+    cache_ok = True
+
+    def __init__(self) -> None:
+        super().__init__(12, 2)
+
+    def process_bind_param(self, value, dialect):
+        return value.to_decimal() if isinstance(value, Money) else value
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else Money.of(value)
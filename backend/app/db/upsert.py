@@ -0,0 +1,56 @@
+"""INSERT ... ON DUPLICATE KEY UPDATE multi-fila, portable a SQLite (tests).
+
+Una sentencia por lote de `batch_size` filas en vez de un SELECT + INSERT/UPDATE
+por fila. Las columnas a actualizar son todas las no-PK salvo que se indiquen.
+"""
+from typing import Iterable, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterable[list[dict]]:
+    batch: list[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def upsert(
+    conn,
+    table: Table,
+    rows: Iterable[dict],
+    update_columns: Sequence[str] | None = None,
+    conflict_columns: Sequence[str] | None = None,
+    batch_size: int = 1000,
+) -> int:
+    """Inserta o actualiza `rows` (dicts con las mismas claves) en lotes; devuelve cuántas filas envió.
+
+    `conflict_columns` (por defecto el PK) sólo aplica a SQLite: MySQL usa
+    cualquier clave única que choque.
+    """
+    dialect = (conn.get_bind() if isinstance(conn, Session) else conn).dialect.name
+    keys = list(conflict_columns or (c.name for c in table.primary_key.columns))
+    sent = 0
+    for batch in _batches(rows, batch_size):
+        cols = update_columns if update_columns is not None else [c for c in batch[0] if c not in keys]
+        if dialect == "mysql":
+            stmt = mysql_insert(table).values(batch)
+            stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in cols}) if cols else stmt.prefix_with("IGNORE")
+        elif dialect == "sqlite":
+            stmt = sqlite_insert(table).values(batch)
+            if cols:
+                stmt = stmt.on_conflict_do_update(index_elements=keys, set_={c: stmt.excluded[c] for c in cols})
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+        else:
+            raise NotImplementedError(f"upsert: dialecto no soportado ({dialect})")
+        conn.execute(stmt)
+        sent += len(batch)
+    return sent
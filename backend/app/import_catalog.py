@@ -0,0 +1,43 @@
+"""Importa productos, precios y stock desde CSV o NDJSON (streaming, upserts por lotes).
+
+    docker compose exec -T backend python -m app.import_catalog /data/proveedor.csv
+    docker compose exec -T backend python -m app.import_catalog - ndjson < lista.ndjson
+"""
+import sys
+
+from app.db.session import SessionLocal
+# Ensure all models are imported so SQLAlchemy can resolve string relationships
+import app.main  # noqa: F401
+from app.services import catalog_import
+
+
+def run(path: str, fmt: str | None = None, batch_size: int = catalog_import.BATCH_SIZE):
+    fmt = fmt or catalog_import.detect_format(path)
+    if fmt not in catalog_import.FORMATS:
+        print("⚠️  Formato desconocido (usar csv o ndjson):", path)
+        return
+    db = SessionLocal()
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+    try:
+        for item in catalog_import.import_stream(db, stream, fmt, batch_size):
+            if item.get("done"):
+                print(f"✅ Importación: {item['imported']} productos, {item['errors']} filas con error, {item['batches']} lotes")
+                continue
+            print(f"… lote {item['batch']} (hasta línea {item['line']}): {item['imported']} ok, {len(item['errors'])} errores, {item['elapsed_ms']} ms")
+            for err in item["errors"]:
+                print(f"   línea {err['line']} [{err['sku'] or '-'}]: {err['error']}")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("uso: python -m app.import_catalog <archivo|-> [csv|ndjson] [batch_size]")
+        sys.exit(1)
+    run(
+        sys.argv[1],
+        sys.argv[2] if len(sys.argv) > 2 else None,
+        int(sys.argv[3]) if len(sys.argv) > 3 else catalog_import.BATCH_SIZE,
+    )
@@ -9,6 +9,11 @@ from app.api.admin_ui import router as admin_ui_router
 from app.api.checkout_ui import router as checkout_ui_router
 from app.api.webhooks_mp import router as webhooks_mp_router
 from app.api.v1.public import router as public_router
+from app.core import password_pool
+from app.db import pool as db_pool
+from app.db import routing
+from app.db.session import dispose_async_engine, get_async_engine
+from app.observability.server_timing import QueryStatsMiddleware
 """
 Ensure all SQLAlchemy models are imported at startup so that string-based
 relationship targets (e.g., relationship("Shipment")) resolve correctly when
@@ -28,6 +33,10 @@ import app.models.shipment
 import app.models.stock_item
 import app.models.stock_reservation
 import app.models.order_seq
+import app.models.category_closure
+import app.models.product_listing
+import app.models.price_list
+import app.models.sitemap_shard
 
 # Celery placeholder (se integrará en Fase 2/4)
 celery_app = None
@@ -45,7 +54,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Next-Cursor", "ETag"],
 )
+# SQL por request (Server-Timing / detector de N+1)
+app.add_middleware(QueryStatsMiddleware)
 
 app.include_router(api_router, prefix="/api")
 app.include_router(webhooks_mp_router)
@@ -54,6 +66,25 @@ app.include_router(checkout_ui_router)
 app.include_router(public_router, tags=["public"])
 app.include_router(public_files_router)
 
+@app.on_event("startup")
+async def _prewarm_db_pools():
+    # Llenar los pools antes del primer request (evita pagar el handshake tras un deploy)
+    if not settings.DB_POOL_PREWARM:
+        return
+    routing.replicas()
+    if settings.DB_ASYNC_ENABLED:
+        get_async_engine()
+        routing.replicas(is_async=True)
+    await db_pool.prewarm_all()
+
+@app.on_event("shutdown")
+def _shutdown_password_pool():
+    password_pool.shutdown()
+
+@app.on_event("shutdown")
+async def _dispose_async_engine():
+    await dispose_async_engine()
+
 @app.get("/health")
 def health():
     return {"status": "ok", "env": settings.APP_ENV}
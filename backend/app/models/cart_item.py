@@ -1,8 +1,10 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
-from sqlalchemy import Integer, String, ForeignKey, Numeric, Enum as SQLEnum
+from sqlalchemy import Integer, String, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.common.money import Money
 from app.db.base import Base
+from app.db.types import MoneyType
 
 if TYPE_CHECKING:
     from .cart import Cart
@@ -15,9 +17,12 @@ class CartItem(Base):
     cart_id: Mapped[int] = mapped_column(Integer, ForeignKey("carts.id", ondelete="CASCADE"), index=True)
     product_id: Mapped[int] = mapped_column(Integer, ForeignKey("products.id"), index=True)
     qty: Mapped[int] = mapped_column(Integer)
-    unit_price: Mapped[float] = mapped_column(Numeric(12, 2))
-    tier: Mapped[str] = mapped_column(SQLEnum("retail", "wholesale", name="price_tier_enum"))
-    subtotal: Mapped[float] = mapped_column(Numeric(12, 2))
+    unit_price: Mapped[Money] = mapped_column(MoneyType())
+    # retail, wholesale o cualquier quiebre por cantidad de product_prices
+    tier: Mapped[str] = mapped_column(String(32))
+    subtotal: Mapped[Money] = mapped_column(MoneyType())
+    # Lista de precios con la que se cotizó la línea (None: precios vivos)
+    pricing_version: Mapped[str | None] = mapped_column(String(40), nullable=True)
 
     cart: Mapped["Cart"] = relationship(back_populates="items")
     product: Mapped["Product"] = relationship()
\ No newline at end of file
@@ -0,0 +1,13 @@
+from sqlalchemy import ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class CategoryClosure(Base):
+    """Tabla de clausura del árbol: una fila por par (ancestro, descendiente), incluida (c, c, 0)."""
+
+    __tablename__ = "category_closure"
+    ancestor_id: Mapped[int] = mapped_column(ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id: Mapped[int] = mapped_column(ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    __table_args__ = (Index("ix_category_closure_descendant", "descendant_id", "depth"),)
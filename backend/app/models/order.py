@@ -1,8 +1,10 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, List
-from sqlalchemy import Integer, String, ForeignKey, DateTime, func, Numeric, Enum as SQLEnum, JSON
+from sqlalchemy import Integer, String, ForeignKey, DateTime, func, Enum as SQLEnum, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.common.money import Money
 from app.db.base import Base
+from app.db.types import MoneyType
 
 if TYPE_CHECKING:
     from .order_item import OrderItem
@@ -30,10 +32,10 @@ class Order(Base):
         index=True,
     )
     currency: Mapped[str] = mapped_column(String(3))
-    subtotal: Mapped[float] = mapped_column(Numeric(12, 2))
-    shipping_cost: Mapped[float] = mapped_column(Numeric(12, 2))
-    discount_total: Mapped[float] = mapped_column(Numeric(12, 2))
-    grand_total: Mapped[float] = mapped_column(Numeric(12, 2))
+    subtotal: Mapped[Money] = mapped_column(MoneyType())
+    shipping_cost: Mapped[Money] = mapped_column(MoneyType())
+    discount_total: Mapped[Money] = mapped_column(MoneyType())
+    grand_total: Mapped[Money] = mapped_column(MoneyType())
     pricing_version: Mapped[str | None] = mapped_column(String(40), nullable=True)
     tax_profile: Mapped[str | None] = mapped_column(String(40), nullable=True)
     shipping_address_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
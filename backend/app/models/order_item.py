@@ -1,8 +1,10 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
-from sqlalchemy import Integer, String, ForeignKey, Numeric
+from sqlalchemy import Integer, String, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.common.money import Money
 from app.db.base import Base
+from app.db.types import MoneyType
 
 if TYPE_CHECKING:
     from .order import Order
@@ -20,8 +22,8 @@ class OrderItem(Base):
     tier: Mapped[str] = mapped_column(String(32))
     currency: Mapped[str] = mapped_column(String(3))
     qty: Mapped[int] = mapped_column(Integer)
-    unit_price: Mapped[float] = mapped_column(Numeric(12, 2))
-    subtotal: Mapped[float] = mapped_column(Numeric(12, 2))
+    unit_price: Mapped[Money] = mapped_column(MoneyType())
+    subtotal: Mapped[Money] = mapped_column(MoneyType())
 
     order: Mapped["Order"] = relationship(back_populates="items")
     product: Mapped["Product"] = relationship()
\ No newline at end of file
@@ -1,8 +1,10 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
-from sqlalchemy import Integer, String, ForeignKey, DateTime, func, Numeric, Enum as SQLEnum, JSON
+from sqlalchemy import Integer, String, ForeignKey, DateTime, func, Enum as SQLEnum, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.common.money import Money
 from app.db.base import Base
+from app.db.types import MoneyType
 
 if TYPE_CHECKING:
     from .order import Order
@@ -18,7 +20,7 @@ class PaymentIntent(Base):
         SQLEnum("created", "approved", "rejected", "cancelled", "expired", name="payment_intent_status_enum"),
         default="created",
     )
-    amount: Mapped[float] = mapped_column(Numeric(12, 2))
+    amount: Mapped[Money] = mapped_column(MoneyType())
     currency: Mapped[str] = mapped_column(String(3))
     mp_preference_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
     mp_preference_url: Mapped[str | None] = mapped_column(String(255), nullable=True)
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Integer, Numeric, String
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.db.base import Base
+
+
+class PriceListVersion(Base):
+    """Lista de precios versionada (ver services/price_lists.py).
+
+    `draft` se edita; una vez `published` sus ítems son inmutables y puede
+    activarse (PricingState apunta a la versión vigente).
+    """
+
+    __tablename__ = "price_list_versions"
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    label: Mapped[str] = mapped_column(String(80), nullable=False)
+    status: Mapped[str] = mapped_column(
+        SQLEnum("draft", "published", name="price_list_status_enum"), default="draft", nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
+    published_at: Mapped[datetime | None]
+    items = relationship("PriceListItem", back_populates="version", cascade="all, delete-orphan")
+
+
+class PriceListItem(Base):
+    __tablename__ = "price_list_items"
+    version_id: Mapped[int] = mapped_column(ForeignKey("price_list_versions.id", ondelete="CASCADE"), primary_key=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    tier: Mapped[str] = mapped_column(String(32), primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), default="ARS", nullable=False)
+    amount: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
+    minimum_qty: Mapped[int | None]
+    version = relationship("PriceListVersion", back_populates="items")
+
+
+class PricingState(Base):
+    """Fila única (id=1): versión de precios vigente; NULL = precios vivos de product_prices."""
+
+    __tablename__ = "pricing_state"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    active_version_id: Mapped[int | None] = mapped_column(ForeignKey("price_list_versions.id"))
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Boolean, ForeignKey, Text
+from sqlalchemy import String, Boolean, ForeignKey, Index, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 from datetime import datetime
@@ -6,6 +6,11 @@ from datetime import datetime
 
 class Product(Base):
     __tablename__ = "products"
+    # Paginación por cursor: InnoDB agrega el PK a cada índice → (sort key, id)
+    __table_args__ = (
+        Index("ix_products_created_at", "created_at"),
+        Index("ix_products_category_name", "category_id", "name"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(200), index=True, nullable=False)
     slug: Mapped[str] = mapped_column(String(220), unique=True, nullable=False)
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, Numeric, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class ProductListing(Base):
+    """Proyección de lectura del listado: una fila por producto (ver services/product_listing.py).
+
+    `id` es el de products; precios retail/wholesale y disponible (sucursal por
+    defecto) ya resueltos, así el listado lee una sola tabla.
+    """
+
+    __tablename__ = "product_listing"
+    id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    slug: Mapped[str] = mapped_column(String(220), nullable=False)
+    sku: Mapped[str] = mapped_column(String(80), nullable=False)
+    description: Mapped[str | None] = mapped_column(Text)
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    category_id: Mapped[int | None] = mapped_column(Integer)
+    category_path: Mapped[str | None] = mapped_column(String(500))
+    currency: Mapped[str | None] = mapped_column(String(3))
+    retail_amount: Mapped[float | None] = mapped_column(Numeric(12, 2))
+    wholesale_amount: Mapped[float | None] = mapped_column(Numeric(12, 2))
+    wholesale_min_qty: Mapped[int | None] = mapped_column(Integer)
+    available: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    # Mismos órdenes que el listado (id / name / newest); InnoDB agrega el PK a cada índice
+    __table_args__ = (
+        Index("ix_product_listing_name", "name"),
+        Index("ix_product_listing_category_name", "category_id", "name"),
+        Index("ix_product_listing_created_at", "created_at"),
+        # Feed de cambios: keyset sobre (refreshed_at, id)
+        Index("ix_product_listing_refreshed_at", "refreshed_at"),
+    )
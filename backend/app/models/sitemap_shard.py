@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class SitemapShard(Base):
+    """Huella de un shard de productos del sitemap (ver services/sitemap.py).
+
+    `shard` es `id // CATALOG_SITEMAP_SHARD_SIZE`; sólo hay fila si el shard
+    tiene productos activos. La mantienen las escrituras de productos.
+    """
+
+    __tablename__ = "sitemap_shards"
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    products: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_modified: Mapped[datetime | None] = mapped_column(DateTime)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
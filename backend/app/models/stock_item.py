@@ -1,9 +1,11 @@
-from sqlalchemy import Integer, ForeignKey, DateTime, func
+from sqlalchemy import Integer, ForeignKey, DateTime, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
 
 class StockItem(Base):
     __tablename__ = "stock_items"
+    # Una fila por producto y sucursal: permite upsert multi-fila (importación masiva)
+    __table_args__ = (UniqueConstraint("product_id", "location_id", name="uq_stock_product_location"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     product_id: Mapped[int] = mapped_column(Integer, ForeignKey("products.id"), index=True)
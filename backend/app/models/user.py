@@ -1,4 +1,4 @@
-from sqlalchemy import String, Boolean
+from sqlalchemy import String, Boolean, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
@@ -10,4 +10,6 @@ class User(Base):
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     role: Mapped[str] = mapped_column(String(50), default="user", nullable=False)
+    # Se incrementa para revocar todos los JWT emitidos (claim "ver")
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     carts = relationship("Cart", back_populates="user")
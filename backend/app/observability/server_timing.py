@@ -0,0 +1,45 @@
+"""Middleware ASGI: SQL por request → header Server-Timing + aviso de N+1."""
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from app.core.settings import settings
+from app.db.query_stats import collect
+
+logger = logging.getLogger(__name__)
+
+
+def _header_enabled() -> bool:
+    if settings.SERVER_TIMING_ENABLED is not None:
+        return settings.SERVER_TIMING_ENABLED
+    # Por defecto no exponer tiempos de DB en producción
+    return settings.APP_ENV != "production"
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        t0 = time.perf_counter()
+        with collect() as stats:
+
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start" and _header_enabled():
+                    headers = MutableHeaders(scope=message)
+                    total = (time.perf_counter() - t0) * 1000
+                    headers.append("Server-Timing", f"{stats.server_timing()}, app;dur={total:.2f}")
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+        repeated = stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD)
+        if repeated:
+            statement, n = repeated[0]
+            logger.warning(
+                "n_plus_one_suspect",
+                extra={"path": scope.get("path"), "queries": stats.count, "repeats": n, "statement": statement[:200]},
+            )
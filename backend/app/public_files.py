@@ -1,22 +1,37 @@
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_read_db
+from app.core.settings import settings
+from app.services import sitemap as sitemap_service
 
 router = APIRouter()
 
-ROBOTS = "User-agent: *\nAllow: /\nSitemap: /sitemap.xml\n"
-SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-  <url><loc>/</loc></url>
-  <url><loc>/about</loc></url>
-  <url><loc>/contact</loc></url>
-</urlset>
-"""
+XML = "application/xml; charset=utf-8"
 
 
 @router.get("/robots.txt", include_in_schema=False)
 def robots():
-    return Response(content=ROBOTS, media_type="text/plain; charset=utf-8")
+    content = f"User-agent: *\nAllow: /\nSitemap: {settings.BASE_URL.rstrip('/')}/sitemap.xml\n"
+    return Response(content=content, media_type="text/plain; charset=utf-8")
 
 
 @router.get("/sitemap.xml", include_in_schema=False)
-def sitemap():
-    return Response(content=SITEMAP, media_type="application/xml; charset=utf-8")
\ No newline at end of file
+def sitemap(db: Session = Depends(get_read_db)):
+    # Sitemap index: los shards salen del catálogo (ver app/services/sitemap.py)
+    return Response(content=sitemap_service.sitemap_index(db), media_type=XML)
+
+
+@router.get("/sitemaps/{name}.xml", include_in_schema=False)
+def sitemap_shard(name: str, db: Session = Depends(get_read_db)):
+    if name == "pages":
+        body = sitemap_service.pages()
+    elif name == "categories":
+        body = sitemap_service.categories(db)
+    elif name.startswith("products-") and name[len("products-"):].isdigit():
+        body = sitemap_service.products(db, int(name[len("products-"):]))
+    else:
+        body = None
+    if body is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return Response(content=body, media_type=XML)
@@ -0,0 +1,21 @@
+"""Reconstruye la proyección product_listing (alta inicial, o tras cargas por fuera del ORM).
+
+    docker compose exec -T backend python -m app.rebuild_listing
+"""
+from app.db.session import SessionLocal
+# Ensure all models are imported so SQLAlchemy can resolve string relationships
+import app.main  # noqa: F401
+from app.services import product_listing
+
+
+def run():
+    db = SessionLocal()
+    try:
+        total = product_listing.rebuild(db, progress=lambda n, last_id: print(f"… {n} filas (hasta id {last_id})"))
+        print("✅ product_listing reconstruida:", total, "productos")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run()
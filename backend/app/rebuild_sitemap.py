@@ -0,0 +1,21 @@
+"""Recalcula las huellas de los shards del sitemap (tras cambiar CATALOG_SITEMAP_SHARD_SIZE o cargas por fuera del ORM).
+
+    docker compose exec -T backend python -m app.rebuild_sitemap
+"""
+from app.db.session import SessionLocal
+# Ensure all models are imported so SQLAlchemy can resolve string relationships
+import app.main  # noqa: F401
+from app.services import sitemap
+
+
+def run():
+    db = SessionLocal()
+    try:
+        total = sitemap.rebuild(db)
+        print("✅ sitemap_shards recalculadas:", total, "shards")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run()
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -45,5 +47,55 @@ class ProductPriceRead(BaseModel):
         from_attributes = True
 
 
+class ProductListItemRead(ProductRead):
+    # Sólo con `embed=prices` / `embed=stock` en el listado
+    prices: Optional[List[ProductPriceRead]] = None
+    available: Optional[int] = None
+
+
 class ProductDetailRead(ProductRead):
-    prices: List[ProductPriceRead] = []
\ No newline at end of file
+    prices: List[ProductPriceRead] = []
+
+class CategoryFacetRead(BaseModel):
+    id: int
+    name: str
+    slug: str
+    parent_id: int | None
+    count: int
+    count_with_descendants: int
+
+
+class PriceBucketRead(BaseModel):
+    min: float
+    max: Optional[float] = None  # None: último tramo, sin tope
+    count: int
+
+
+class PriceFacetRead(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+    buckets: List[PriceBucketRead] = []
+    unpriced: int = 0
+
+
+class ProductFacetsRead(BaseModel):
+    total: int
+    categories: List[CategoryFacetRead] = []
+    price: PriceFacetRead
+
+
+class ProductChangeRead(BaseModel):
+    id: int
+    sku: str
+    slug: str
+    changed_at: datetime
+    # Tombstone: producto desactivado; el cliente lo da de baja (sin `product`)
+    deleted: bool = False
+    product: Optional[ProductListItemRead] = None
+
+
+class ProductChangesRead(BaseModel):
+    changes: List[ProductChangeRead] = []
+    # Guardarlo y mandarlo como `since` en la próxima sincronización
+    next_cursor: Optional[str] = None
+    has_more: bool = False
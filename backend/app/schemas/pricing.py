@@ -0,0 +1,36 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class PriceListCreate(BaseModel):
+    label: str = Field(min_length=1, max_length=80)
+    # None: copia los precios actuales de product_prices
+    source_version_id: Optional[int] = None
+
+
+class PriceListItemWrite(BaseModel):
+    product_id: int
+    tier: str = Field(min_length=1, max_length=32)
+    currency: str = "ARS"
+    amount: Decimal = Field(ge=0, max_digits=12, decimal_places=2)
+    minimum_qty: Optional[int] = Field(default=None, ge=1)
+
+
+class PriceListItemsWrite(BaseModel):
+    items: List[PriceListItemWrite]
+
+
+class PriceListRead(BaseModel):
+    id: int
+    label: str
+    status: str
+    created_at: datetime
+    published_at: Optional[datetime] = None
+    active: bool = False
+    items: Optional[int] = None
+
+    class Config:
+        from_attributes = True
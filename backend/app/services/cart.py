@@ -1,10 +1,17 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from datetime import datetime
+from app.common.money import Money
 from app.models.cart import Cart
 from app.models.cart_item import CartItem
 from app.models.product import Product
-from app.services.pricing import resolve_price
-from decimal import Decimal
+from app.services.pricing import PriceBook
+
+# Tope de DECIMAL(12,2): evita overflow al persistir
+MAX_SUBTOTAL = Money(999_999_999_999)
+
+def _line_subtotal(unit_price: Money, qty: int) -> Money:
+    return min(unit_price * qty, MAX_SUBTOTAL)
 
 def get_or_create_cart(db: Session, *, user_id: int | None, session_id: str | None) -> Cart:
     q = db.query(Cart)
@@ -55,24 +62,18 @@ def add_item(db: Session, cart: Cart, product_id: int, qty: int, user_role: str
 
     if existing:
         prospective_qty = int(existing.qty) + int(qty)
-        tier, unit_price = resolve_price(db, product_id, prospective_qty, user_role)
+        book = PriceBook.load(db, (product_id,))
+        tier, unit_price = book.resolve(product_id, prospective_qty, user_role)
         existing.qty = prospective_qty
         existing.tier = tier
         existing.unit_price = unit_price
-        # Compute subtotal safely within DECIMAL(12,2) bounds to avoid DB overflow
-        subtotal_val = Decimal(str(unit_price)) * Decimal(prospective_qty)
-        max_subtotal = Decimal("9999999999.99")
-        if subtotal_val > max_subtotal:
-            subtotal_val = max_subtotal
-        existing.subtotal = float(round(subtotal_val, 2))
+        existing.pricing_version = book.version
+        existing.subtotal = _line_subtotal(unit_price, prospective_qty)
     else:
         # Resolver precio/tier con la cantidad solicitada
-        tier, unit_price = resolve_price(db, product_id, qty, user_role)
-        subtotal_val = Decimal(str(unit_price)) * Decimal(qty)
-        max_subtotal = Decimal("9999999999.99")
-        if subtotal_val > max_subtotal:
-            subtotal_val = max_subtotal
-        subtotal = float(round(subtotal_val, 2))
+        book = PriceBook.load(db, (product_id,))
+        tier, unit_price = book.resolve(product_id, qty, user_role)
+        subtotal = _line_subtotal(unit_price, qty)
         item = CartItem(
             cart_id=cart.id,
             product_id=product_id,
@@ -80,6 +81,7 @@ def add_item(db: Session, cart: Cart, product_id: int, qty: int, user_role: str
             unit_price=unit_price,
             tier=tier,
             subtotal=subtotal,
+            pricing_version=book.version,
         )
         db.add(item)
 
@@ -95,12 +97,14 @@ def update_item_qty(db: Session, item_id: int, qty: int, policy_keep_tier: bool
         raise ValueError("Item not found")
     item.qty = qty
     if policy_keep_tier:
-        item.subtotal = round(float(item.unit_price) * qty, 2)
+        item.subtotal = _line_subtotal(item.unit_price, qty)
     else:
-        tier, unit_price = resolve_price(db, item.product_id, qty, user_role)
+        book = PriceBook.load(db, (item.product_id,))
+        tier, unit_price = book.resolve(item.product_id, qty, user_role)
         item.tier = tier
         item.unit_price = unit_price
-        item.subtotal = round(unit_price * qty, 2)
+        item.pricing_version = book.version
+        item.subtotal = _line_subtotal(unit_price, qty)
     # bump parent cart timestamp
     cart = db.query(Cart).filter(Cart.id == item.cart_id).first()
     if cart:
@@ -108,7 +112,29 @@ def update_item_qty(db: Session, item_id: int, qty: int, policy_keep_tier: bool
     db.commit()
     return item
 
+def reprice_items(db: Session, items: list[CartItem], user_role: str | None = None) -> PriceBook:
+    """Cotiza las líneas con la versión vigente (sin commit); todas quedan con `book.version`."""
+    book = PriceBook.load(db, (it.product_id for it in items))
+    prices = book.resolve_many(((it.product_id, int(it.qty)) for it in items), user_role)
+    for it, (tier, unit_price) in zip(items, prices):
+        it.tier = tier
+        it.unit_price = unit_price
+        it.pricing_version = book.version
+        it.subtotal = _line_subtotal(unit_price, int(it.qty))
+    return book
+
+
+def reprice_cart(db: Session, cart: Cart, user_role: str | None = None) -> list[CartItem]:
+    """Recalcula tier y precio de todas las líneas con el PriceBook (una consulta de precios en total)."""
+    items = db.query(CartItem).filter(CartItem.cart_id == cart.id).order_by(CartItem.id).all()
+    reprice_items(db, items, user_role)
+    cart.updated_at = datetime.utcnow()
+    db.commit()
+    return items
+
 def totals(db: Session, cart: Cart):
-    items = db.query(CartItem).filter(CartItem.cart_id == cart.id).all()
-    subtotal = round(sum(float(i.subtotal) for i in items), 2)
-    return {"subtotal": subtotal, "items_count": sum(i.qty for i in items)}
\ No newline at end of file
+    # Suma en la base (Numeric exacto); Money por el tipo de la columna
+    subtotal, count = db.execute(
+        select(func.sum(CartItem.subtotal), func.coalesce(func.sum(CartItem.qty), 0)).where(CartItem.cart_id == cart.id)
+    ).one()
+    return {"subtotal": subtotal or Money(), "items_count": int(count)}
@@ -0,0 +1,416 @@
+"""Lecturas del catálogo (sync).
+
+Las rutas async las ejecutan vía `run_db`, por eso devuelven schemas/dicts ya
+armados: nada se resuelve con lazy-load después de la llamada.
+
+Listado de productos paginado por cursor (keyset sobre (sort key, id)): el
+cursor es opaco y lleva el orden y la última clave servida, así una página
+profunda cuesta lo mismo que la primera. `page` (OFFSET) sigue funcionando.
+El listado lee la proyección `product_listing` (una tabla, precios y stock ya
+resueltos) salvo con CATALOG_LISTING_READS=false.
+`list_changes` sirve el feed incremental (delta) sobre la misma proyección.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core import catalog_cache
+from app.core.settings import settings
+from app.models.category import Category
+from app.models.product import Product
+from app.models.product_listing import ProductListing
+from app.models.product_price import ProductPrice
+from app.models.stock_item import StockItem
+from app.schemas.catalog import (
+    CategoryFacetRead,
+    PriceBucketRead,
+    PriceFacetRead,
+    ProductChangeRead,
+    ProductChangesRead,
+    ProductDetailRead,
+    ProductFacetsRead,
+    ProductListItemRead,
+    ProductPriceRead,
+    ProductRead,
+)
+from app.services import category_tree, search_index
+# Registra el mantenimiento de product_listing y de las huellas del sitemap (eventos del mapper)
+from app.services import product_listing, sitemap  # noqa: F401
+from app.services.stock import DEFAULT_LOCATION_ID
+
+
+def _build_categories(db: Session, tree: bool) -> bytes:
+    rows = db.execute(select(Category.id, Category.name, Category.slug, Category.parent_id)).all()
+    # Hijos armados en memoria con una sola consulta (sin lazy-load de `children`)
+    nodes = {
+        r.id: {"id": r.id, "name": r.name, "slug": r.slug, "parent_id": r.parent_id, "children": []}
+        for r in rows
+    }
+    roots: list[dict] = []
+    for node in nodes.values():
+        parent = nodes.get(node["parent_id"]) if node["parent_id"] else None
+        if parent is not None:
+            parent["children"].append(node)
+        else:
+            roots.append(node)
+    return json.dumps(roots if tree else list(nodes.values()), ensure_ascii=False).encode()
+
+
+def list_categories(db: Session, tree: bool = False) -> list[dict]:
+    # Serializado una vez por versión de catálogo; cambia al tocar cualquier categoría
+    blob = catalog_cache.memo(f"categories:tree={int(tree)}", lambda: _build_categories(db, tree))
+    return json.loads(blob)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+EMBEDS = frozenset({"prices", "stock"})
+
+
+# sort → (columna, descendente); "relevance" sólo con el índice de búsqueda
+SORTS = {
+    "id": ("id", False),
+    "name": ("name", False),
+    "newest": ("created_at", True),
+}
+_KEY_TYPES = {"relevance": (int, float), "id": int, "name": str, "newest": str, "changes": str}
+
+
+def encode_cursor(sort: str, key, product_id: int) -> str:
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    raw = json.dumps([sort, key, product_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, object, int]:
+    try:
+        sort, key, product_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(key, _KEY_TYPES[sort]) or not isinstance(product_id, int):
+            raise TypeError(sort)
+        if sort in ("newest", "changes"):
+            key = datetime.fromisoformat(key)
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    return sort, key, product_id
+
+
+def _filters(db: Session, src, search: str | None, category_id: int | None, include_descendants: bool) -> list | None:
+    """Condiciones de búsqueda/categoría sobre `src`; None si el índice no matchea nada."""
+    clauses = []
+    if search and settings.CATALOG_SEARCH_BACKEND == "index":
+        categories = category_id or None
+        if categories and include_descendants:
+            categories = category_tree.descendant_ids(db, category_id)
+        # Orden/agregación por SQL sobre los matches más relevantes del índice
+        # (acotados: el IN no crece con búsquedas amplias)
+        ids = [pid for pid, _ in search_index.search_scored(db, search, categories, settings.CATALOG_SEARCH_MAX_MATCHES)]
+        if not ids:
+            return None
+        clauses.append(src.id.in_(ids))
+    elif search:
+        term = f"%{search}%"
+        clauses.append(or_(src.name.ilike(term), src.sku.ilike(term), src.description.ilike(term)))
+    if category_id and include_descendants:
+        clauses.append(src.category_id.in_(category_tree.descendants_subquery(category_id)))
+    elif category_id:
+        clauses.append(src.category_id == category_id)
+    return clauses
+
+
+def _source():
+    """Tabla del listado: la proyección product_listing o, deshabilitada, products."""
+    return ProductListing if settings.CATALOG_LISTING_READS else Product
+
+
+def _after(src, col, desc: bool, key, last_id: int):
+    if col is src.id:
+        return src.id < last_id if desc else src.id > last_id
+    # col >= key acota el rango del índice (col, id); el OR sólo filtra dentro
+    if desc:
+        return and_(col <= key, or_(col < key, src.id < last_id))
+    return and_(col >= key, or_(col > key, src.id > last_id))
+
+
+def list_products(
+    db: Session,
+    search: str | None = None,
+    category_id: int | None = None,
+    page: int = 1,
+    size: int = 20,
+    include_descendants: bool = False,
+) -> list[ProductRead]:
+    return list_products_page(db, search, category_id, page, size, include_descendants=include_descendants)[0]
+
+
+def list_products_page(
+    db: Session,
+    search: str | None = None,
+    category_id: int | None = None,
+    page: int = 1,
+    size: int = 20,
+    cursor: str | None = None,
+    sort: str | None = None,
+    include_descendants: bool = False,
+    embed: frozenset[str] = frozenset(),
+) -> tuple[list[ProductRead], str | None]:
+    """Página de productos y cursor de la siguiente (None si es la última).
+
+    Con `cursor` se ignoran `page` y `sort`: el orden viaja en el cursor.
+    `include_descendants` amplía `category_id` a todo su subárbol; `embed`
+    agrega precios y/o disponible (ver `embed_listing`).
+    """
+    rows, next_cursor = _list_page(db, search, category_id, page, size, cursor, sort, include_descendants)
+    if isinstance(rows[0] if rows else None, ProductListing):
+        # La proyección ya trae precios y disponible: nada más que consultar
+        return [_from_listing(r, embed) for r in rows], next_cursor
+    items = [ProductRead.model_validate(p) for p in rows]
+    return (embed_listing(db, items, embed) if embed else items), next_cursor
+
+
+def _from_listing(row: ProductListing, embed: frozenset[str]) -> ProductRead:
+    if not embed:
+        return ProductRead.model_validate(row)
+    item = ProductListItemRead(**ProductRead.model_validate(row).model_dump())
+    if "prices" in embed:
+        item.prices = [
+            ProductPriceRead(tier=tier, currency=row.currency, amount=amount, minimum_qty=min_qty)
+            for tier, amount, min_qty in (
+                ("retail", row.retail_amount, None),
+                ("wholesale", row.wholesale_amount, row.wholesale_min_qty),
+            )
+            if amount is not None
+        ]
+    if "stock" in embed:
+        item.available = row.available
+    return item
+
+
+def _list_page(
+    db: Session,
+    search: str | None,
+    category_id: int | None,
+    page: int,
+    size: int,
+    cursor: str | None,
+    sort: str | None,
+    include_descendants: bool,
+) -> tuple[list, str | None]:
+    page = max(page, 1)
+    size = max(min(size, 100), 1)
+    use_index = bool(search) and settings.CATALOG_SEARCH_BACKEND == "index"
+    after = None
+    if cursor:
+        sort, *after = decode_cursor(cursor)
+        if sort not in SORTS and (sort != "relevance" or not use_index):
+            raise InvalidCursor("Invalid cursor")
+    elif sort is None or (sort == "relevance" and not use_index):
+        sort = "relevance" if use_index else "id"
+    src = _source()
+
+    if sort == "relevance":
+        # Ranking en memoria; a MySQL sólo va la página por PK
+        categories = category_id or None
+        if categories and include_descendants:
+            categories = category_tree.descendant_ids(db, category_id)
+        if after:
+            scored = search_index.search_scored(db, search, categories, size + 1, (after[0], after[1]))
+        else:
+            scored = search_index.search_scored(db, search, categories, page * size + 1)[(page - 1) * size :]
+        page_ids = [pid for pid, _ in scored[:size]]
+        next_cursor = encode_cursor(sort, scored[size - 1][1], scored[size - 1][0]) if len(scored) > size else None
+        if not page_ids:
+            return [], None
+        rows = {p.id: p for p in db.query(src).filter(src.id.in_(page_ids))}
+        return [rows[i] for i in page_ids if i in rows], next_cursor
+
+    attr, desc = SORTS[sort]
+    col = getattr(src, attr)
+    clauses = _filters(db, src, search, category_id, include_descendants)
+    if clauses is None:
+        return [], None
+    q = db.query(src).filter(*clauses)
+    if after:
+        q = q.filter(_after(src, col, desc, *after))
+    order = [src.id.desc() if desc else src.id.asc()]
+    if col is not src.id:
+        order.insert(0, col.desc() if desc else col.asc())
+    q = q.order_by(*order)
+    if not after:
+        q = q.offset((page - 1) * size)
+    rows = q.limit(size + 1).all()
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        next_cursor = encode_cursor(sort, getattr(rows[-1], attr), rows[-1].id)
+    return rows, next_cursor
+
+
+def embed_listing(db: Session, items: list[ProductRead], embed: frozenset[str]) -> list[ProductListItemRead]:
+    """Precios y disponible de toda la página: una consulta por tipo, no una por producto."""
+    out = [ProductListItemRead(**p.model_dump()) for p in items]
+    ids = [p.id for p in items]
+    if not ids:
+        return out
+    if "prices" in embed:
+        prices: dict[int, list[ProductPriceRead]] = {i: [] for i in ids}
+        rows = db.query(ProductPrice).filter(ProductPrice.product_id.in_(ids)).order_by(ProductPrice.id)
+        for pr in rows:
+            prices[pr.product_id].append(ProductPriceRead.model_validate(pr))
+        for item in out:
+            item.prices = prices[item.id]
+    if "stock" in embed:
+        # Misma sucursal que las reservas del carrito
+        rows = db.execute(
+            select(StockItem.product_id, func.sum(StockItem.on_hand - StockItem.committed))
+            .where(StockItem.product_id.in_(ids), StockItem.location_id == DEFAULT_LOCATION_ID)
+            .group_by(StockItem.product_id)
+        )
+        available = {pid: max(int(qty or 0), 0) for pid, qty in rows}
+        for item in out:
+            item.available = available.get(item.id, 0)
+    return out
+
+
+def product_facets(
+    db: Session,
+    search: str | None = None,
+    category_id: int | None = None,
+    include_descendants: bool = False,
+) -> ProductFacetsRead:
+    """Conteos por categoría e histograma de precio retail para el filtro actual.
+
+    Una sola agregación GROUP BY (categoría, tramo); el resto (totales,
+    subárboles, nombres) se arma en memoria con el árbol ya cacheado.
+    """
+    src = _source()
+    bounds = sorted(settings.CATALOG_PRICE_BUCKETS) or [0]
+    clauses = _filters(db, src, search, category_id, include_descendants)
+    rows = []
+    if clauses is not None:
+        price = src.retail_amount if src is ProductListing else ProductPrice.amount
+        bucket = case(
+            (price.is_(None), -1),
+            *[(price < upper, i) for i, upper in enumerate(bounds[1:])],
+            else_=len(bounds) - 1,
+        ).label("bucket")
+        q = select(src.category_id, bucket, func.count(), func.min(price), func.max(price)).select_from(src)
+        if src is Product:
+            q = q.outerjoin(ProductPrice, and_(ProductPrice.product_id == Product.id, ProductPrice.tier == "retail"))
+        rows = db.execute(q.where(*clauses).group_by(src.category_id, bucket)).all()
+
+    direct: dict[int, int] = {}
+    buckets = [0] * len(bounds)
+    unpriced, total, lo, hi = 0, 0, None, None
+    for cat_id, b, n, pmin, pmax in rows:
+        total += n
+        if cat_id is not None:
+            direct[cat_id] = direct.get(cat_id, 0) + n
+        if b == -1:
+            unpriced += n
+            continue
+        buckets[b] += n
+        lo = float(pmin) if lo is None else min(lo, float(pmin))
+        hi = float(pmax) if hi is None else max(hi, float(pmax))
+
+    nodes = {c["id"]: c for c in list_categories(db)}
+    rolled: dict[int, int] = {}
+    for cat_id, n in direct.items():
+        node = nodes.get(cat_id)
+        seen = set()
+        while node is not None and node["id"] not in seen:
+            seen.add(node["id"])
+            rolled[node["id"]] = rolled.get(node["id"], 0) + n
+            node = nodes.get(node["parent_id"])
+    categories = [
+        CategoryFacetRead(
+            id=c["id"],
+            name=c["name"],
+            slug=c["slug"],
+            parent_id=c["parent_id"],
+            count=direct.get(c["id"], 0),
+            count_with_descendants=rolled[c["id"]],
+        )
+        for c in nodes.values()
+        if c["id"] in rolled
+    ]
+    categories.sort(key=lambda f: (-f.count_with_descendants, f.name))
+    return ProductFacetsRead(
+        total=total,
+        categories=categories,
+        price=PriceFacetRead(
+            min=lo,
+            max=hi,
+            buckets=[
+                PriceBucketRead(min=low, max=bounds[i + 1] if i + 1 < len(bounds) else None, count=buckets[i])
+                for i, low in enumerate(bounds)
+            ],
+            unpriced=unpriced,
+        ),
+    )
+
+
+def get_product_detail(db: Session, slug: str) -> ProductDetailRead | None:
+    p: Product | None = db.query(Product).filter(Product.slug == slug).first()
+    if not p:
+        return None
+    prices = db.query(ProductPrice).filter(ProductPrice.product_id == p.id).all()
+    detail = ProductDetailRead.model_validate(p)
+    detail.prices = [ProductPriceRead.model_validate(pr) for pr in prices]
+    return detail
+
+
+def get_product_prices(db: Session, product_id: int, tier: str | None = None) -> list[ProductPriceRead]:
+    q = db.query(ProductPrice).filter(ProductPrice.product_id == product_id)
+    if tier:
+        q = q.filter(ProductPrice.tier == tier)
+    return [ProductPriceRead.model_validate(pr) for pr in q.all()]
+
+
+CHANGES_MAX_LIMIT = 1000
+
+
+def list_changes(db: Session, since: str | None = None, limit: int = 500) -> ProductChangesRead:
+    """Productos cuya fila del listado cambió después del cursor `since`, por (refreshed_at, id).
+
+    La proyección se refresca con cada escritura de producto, precios, stock o
+    categoría, así el costo sigue a lo que cambió y no al tamaño del catálogo.
+    Sin `since` recorre todo (alta inicial). Los inactivos salen como tombstone.
+    Las filas más nuevas que CATALOG_CHANGES_LAG_SECONDS (más el lag de
+    réplicas) quedan para la próxima llamada: una transacción que marcó antes
+    pero confirmó después no queda detrás del cursor.
+    """
+    limit = max(min(limit, CHANGES_MAX_LIMIT), 1)
+    src = ProductListing
+    q = db.query(src)
+    if since:
+        kind, key, last_id = decode_cursor(since)
+        if kind != "changes":
+            raise InvalidCursor("Invalid cursor")
+        q = q.filter(_after(src, src.refreshed_at, False, key, last_id))
+    lag = settings.CATALOG_CHANGES_LAG_SECONDS
+    if settings.DB_REPLICA_URLS:
+        lag += settings.DB_REPLICA_MAX_LAG_SECONDS
+    until = datetime.utcnow() - timedelta(seconds=lag)
+    rows = q.filter(src.refreshed_at < until).order_by(src.refreshed_at, src.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    changes = [
+        ProductChangeRead(
+            id=r.id,
+            sku=r.sku,
+            slug=r.slug,
+            changed_at=r.refreshed_at,
+            deleted=not r.is_active,
+            product=None if not r.is_active else _from_listing(r, EMBEDS),
+        )
+        for r in rows
+    ]
+    # Sin cambios el cursor queda igual
+    next_cursor = encode_cursor("changes", rows[-1].refreshed_at, rows[-1].id) if rows else since
+    return ProductChangesRead(changes=changes, next_cursor=next_cursor, has_more=has_more)
@@ -0,0 +1,134 @@
+"""Feed del catálogo para marketplaces (Google Merchant / MercadoLibre): CSV, XML o NDJSON.
+
+Se recorre product_listing (precios y disponible ya resueltos, sin joins) con
+cursor del lado del servidor (`yield_per`) y se emite en bloques de ~64 KB:
+la memoria no depende del tamaño del catálogo y el primer byte sale enseguida.
+Con gzip se comprime en streaming (zlib incremental).
+Sólo productos activos y con precio retail (los marketplaces rechazan ítems sin precio).
+"""
+import csv
+import io
+import json
+import zlib
+from collections.abc import Iterable, Iterator
+from xml.sax.saxutils import escape
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.models.product_listing import ProductListing
+
+YIELD_PER = 1000
+CHUNK_SIZE = 64 * 1024
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xml": "application/xml; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+FIELDS = ("id", "title", "description", "link", "price", "availability", "quantity", "product_type", "condition")
+
+_COLUMNS = (
+    ProductListing.id,
+    ProductListing.sku,
+    ProductListing.name,
+    ProductListing.slug,
+    ProductListing.description,
+    ProductListing.category_path,
+    ProductListing.currency,
+    ProductListing.retail_amount,
+    ProductListing.available,
+)
+
+
+def product_url(slug: str) -> str:
+    return settings.BASE_URL.rstrip("/") + settings.CATALOG_PRODUCT_PATH.format(slug=slug)
+
+
+def iter_items(db: Session) -> Iterator[dict]:
+    """Ítems del feed en orden de id, leídos de a YIELD_PER filas."""
+    q = (
+        select(*_COLUMNS)
+        .where(ProductListing.is_active.is_(True), ProductListing.retail_amount.is_not(None))
+        .order_by(ProductListing.id)
+        .execution_options(yield_per=YIELD_PER)
+    )
+    for row in db.execute(q):
+        yield {
+            "id": row.sku,
+            "title": row.name,
+            "description": row.description or row.name,
+            "link": product_url(row.slug),
+            "price": f"{row.retail_amount:.2f} {row.currency or 'ARS'}",
+            "availability": "in_stock" if row.available > 0 else "out_of_stock",
+            "quantity": row.available,
+            "product_type": row.category_path or "",
+            "condition": "new",
+        }
+
+
+def _csv(items: Iterable[dict]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=FIELDS)
+    writer.writeheader()
+    yield buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
+    for item in items:
+        writer.writerow(item)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+
+def _ndjson(items: Iterable[dict]) -> Iterator[str]:
+    for item in items:
+        yield json.dumps(item, ensure_ascii=False) + "\n"
+
+
+def _xml(items: Iterable[dict]) -> Iterator[str]:
+    # RSS 2.0 con el namespace g: de Google Merchant
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0">\n<channel>\n'
+        f"<title>{escape(settings.CATALOG_FEED_TITLE)}</title>\n<link>{escape(settings.BASE_URL)}</link>\n"
+    )
+    for item in items:
+        fields = "".join(f"<g:{k}>{escape(str(item[k]))}</g:{k}>" for k in FIELDS)
+        yield f"<item>{fields}</item>\n"
+    yield "</channel>\n</rss>\n"
+
+
+_RENDERERS = {"csv": _csv, "xml": _xml, "ndjson": _ndjson}
+
+
+def _chunked(parts: Iterable[str], size: int) -> Iterator[bytes]:
+    pending: list[str] = []
+    length = 0
+    for part in parts:
+        pending.append(part)
+        length += len(part)
+        if length >= size:
+            yield "".join(pending).encode()
+            pending, length = [], 0
+    if pending:
+        yield "".join(pending).encode()
+
+
+def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def render(items: Iterable[dict], fmt: str, gzip: bool = False, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Bloques de bytes del feed en `fmt` (csv/xml/ndjson), opcionalmente gzip."""
+    chunks = _chunked(_RENDERERS[fmt](items), chunk_size)
+    return _gzip(chunks) if gzip else chunks
+
+
+def export(db: Session, fmt: str, gzip: bool = False) -> Iterator[bytes]:
+    return render(iter_items(db), fmt, gzip)
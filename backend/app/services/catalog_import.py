@@ -0,0 +1,320 @@
+"""Importación masiva de catálogo (productos, precios y stock) desde CSV o NDJSON.
+
+El archivo se lee en streaming, fila a fila, sin cargarlo entero en memoria.
+Cada lote de filas válidas se escribe con upserts multi-fila: productos por
+sku, precios por (producto, tier) y stock por (producto, sucursal). La
+proyección product_listing se refresca en la misma transacción y se hace un
+commit por lote. Las filas inválidas se reportan con su número de línea y no
+frenan el resto.
+
+Columnas: sku y name (obligatorias), slug, description, category (slug),
+is_active, currency, retail, wholesale, wholesale_min_qty y on_hand.
+El archivo manda sobre cada sku: description y category vacías quedan vacías.
+Sin retail/wholesale/on_hand no se toca ese precio ni el stock.
+"""
+import csv
+import json
+import logging
+import time
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import IO
+
+from sqlalchemy import or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core import catalog_cache
+from app.core.settings import settings
+from app.db.upsert import upsert
+from app.models.category import Category
+from app.models.product import Product
+from app.models.product_price import ProductPrice
+from app.models.stock_item import StockItem
+from app.services import price_lists, product_listing, sitemap
+from app.services.search_index import tokenize
+from app.services.stock import DEFAULT_LOCATION_ID
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+FORMATS = ("csv", "ndjson")
+MAX_AMOUNT = Decimal("1e10")  # Numeric(12, 2)
+_TRUE = {"1", "true", "si", "sí", "yes", "y"}
+_FALSE = {"0", "false", "no", "n"}
+
+
+class RowError(ValueError):
+    pass
+
+
+def detect_format(filename: str | None) -> str | None:
+    """"csv"/"ndjson" según la extensión (None si no se reconoce)."""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+def iter_records(stream: IO[str], fmt: str) -> Iterator[tuple[int, dict | str]]:
+    """(línea, registro) de a uno: dict en CSV, la línea cruda en NDJSON (se decodifica al validar)."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "ndjson":
+        for line_no, line in enumerate(stream, start=1):
+            if line.strip():
+                yield line_no, line
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+
+
+def slugify(name: str) -> str:
+    return "-".join(tokenize(name))
+
+
+def _text(record: dict, key: str, max_len: int | None = None) -> str | None:
+    value = record.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    if max_len is not None and len(value) > max_len:
+        raise RowError(f"{key}: máximo {max_len} caracteres")
+    return value
+
+
+def _amount(record: dict, key: str) -> Decimal | None:
+    value = _text(record, key)
+    if value is None:
+        return None
+    try:
+        amount = Decimal(value.replace(",", "."))
+    except InvalidOperation:
+        raise RowError(f"{key}: número inválido ({value})")
+    if not amount.is_finite() or amount < 0:
+        raise RowError(f"{key}: debe ser >= 0")
+    if amount >= MAX_AMOUNT:
+        raise RowError(f"{key}: fuera de rango ({value})")
+    return amount.quantize(Decimal("0.01"))
+
+
+def _int(record: dict, key: str, minimum: int) -> int | None:
+    value = _text(record, key)
+    if value is None:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise RowError(f"{key}: entero inválido ({value})")
+    if number < minimum:
+        raise RowError(f"{key}: debe ser >= {minimum}")
+    return number
+
+
+def _bool(record: dict, key: str, default: bool) -> bool:
+    value = _text(record, key)
+    if value is None:
+        return default
+    if value.lower() in _TRUE:
+        return True
+    if value.lower() in _FALSE:
+        return False
+    raise RowError(f"{key}: booleano inválido ({value})")
+
+
+def parse_record(raw: dict | str, categories: dict[str, int]) -> dict:
+    """Valida y normaliza un registro; RowError con el motivo si no sirve."""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError as e:
+            raise RowError(f"JSON inválido: {e}")
+        if not isinstance(raw, dict):
+            raise RowError("se esperaba un objeto JSON")
+    sku = _text(raw, "sku", 80)
+    name = _text(raw, "name", 200)
+    if sku is None or name is None:
+        raise RowError("sku y name son obligatorios")
+    category = _text(raw, "category")
+    if category is not None and category not in categories:
+        raise RowError(f"category inexistente ({category})")
+    currency = (_text(raw, "currency") or "ARS").upper()
+    if len(currency) != 3:
+        raise RowError(f"currency inválida ({currency})")
+    return {
+        "sku": sku,
+        "name": name,
+        "slug": _text(raw, "slug", 220),
+        "description": _text(raw, "description"),
+        "category_id": categories.get(category) if category else None,
+        "is_active": _bool(raw, "is_active", True),
+        "currency": currency,
+        "retail": _amount(raw, "retail"),
+        "wholesale": _amount(raw, "wholesale"),
+        "wholesale_min_qty": _int(raw, "wholesale_min_qty", 1),
+        "on_hand": _int(raw, "on_hand", 0),
+    }
+
+
+def _error(line: int, sku: str | None, message: str) -> dict:
+    return {"line": line, "sku": sku, "error": message}
+
+
+def _resolve_slugs(db: Session, rows: list[tuple[int, dict]], errors: list[dict]) -> list[tuple[int, dict]]:
+    """Completa slugs y descarta choques con otro sku (en la base o en el mismo lote).
+
+    Una sola consulta por lote; sin este control el ON DUPLICATE KEY de MySQL
+    actualizaría el producto dueño del slug en vez de fallar.
+    """
+    skus = [r["sku"] for _, r in rows]
+    wanted = [r["slug"] or slugify(r["name"]) for _, r in rows]
+    existing = db.execute(
+        select(Product.sku, Product.slug).where(or_(Product.sku.in_(skus), Product.slug.in_(wanted)))
+    ).all()
+    slug_by_sku = {sku: slug for sku, slug in existing}
+    owner = {slug: sku for sku, slug in existing}
+    out = []
+    for line, row in rows:
+        # Sin slug explícito un producto existente conserva el suyo
+        slug = row["slug"] or slug_by_sku.get(row["sku"]) or slugify(row["name"])
+        if not slug:
+            errors.append(_error(line, row["sku"], "no se pudo derivar slug de name"))
+            continue
+        if owner.get(slug, row["sku"]) != row["sku"]:
+            errors.append(_error(line, row["sku"], f"slug ya usado por el sku {owner[slug]}"))
+            continue
+        owner[slug] = row["sku"]
+        row["slug"] = slug
+        out.append((line, row))
+    return out
+
+
+def _write_batch(db: Session, rows: list[dict], location_id: int) -> int:
+    now = datetime.utcnow()
+    conn = db.connection()
+    upsert(
+        conn,
+        Product.__table__,
+        [
+            {
+                "sku": r["sku"],
+                "name": r["name"],
+                "slug": r["slug"],
+                "description": r["description"],
+                "category_id": r["category_id"],
+                "is_active": r["is_active"],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for r in rows
+        ],
+        update_columns=["name", "slug", "description", "category_id", "is_active", "updated_at"],
+        conflict_columns=["sku"],
+    )
+    ids = dict(conn.execute(select(Product.sku, Product.id).where(Product.sku.in_([r["sku"] for r in rows]))).all())
+    prices, stock = [], []
+    for r in rows:
+        pid = ids[r["sku"]]
+        if r["retail"] is not None:
+            prices.append({"product_id": pid, "tier": "retail", "currency": r["currency"],
+                           "amount": r["retail"], "minimum_qty": None})
+        if r["wholesale"] is not None:
+            prices.append({"product_id": pid, "tier": "wholesale", "currency": r["currency"],
+                           "amount": r["wholesale"], "minimum_qty": r["wholesale_min_qty"]})
+        if r["on_hand"] is not None:
+            stock.append({"product_id": pid, "location_id": location_id, "on_hand": r["on_hand"],
+                          "committed": 0, "updated_at": now})
+    if prices:
+        upsert(conn, ProductPrice.__table__, prices, update_columns=["currency", "amount", "minimum_qty"],
+               conflict_columns=["product_id", "tier"])
+        # Con una lista de precios vigente, importar precios vuelve a precios vivos
+        price_lists.go_live(db)
+    if stock:
+        # `committed` lo manejan las reservas: sólo se pisa on_hand
+        upsert(conn, StockItem.__table__, stock, update_columns=["on_hand", "updated_at"],
+               conflict_columns=["product_id", "location_id"])
+    # Los upserts no pasan por los eventos del mapper: proyección y huellas del sitemap aquí,
+    # caché al confirmar (el índice de búsqueda los toma por updated_at)
+    product_listing.refresh(conn, ids.values())
+    sitemap.refresh_shards(conn, {pid // settings.CATALOG_SITEMAP_SHARD_SIZE for pid in ids.values()})
+    return len(rows)
+
+
+def _flush(
+    db: Session, batch_no: int, pending: list[tuple[int, dict]], errors: list[dict], location_id: int
+) -> dict:
+    t0 = time.perf_counter()
+    # Mismo sku repetido en el lote: gana la última fila (como si fueran dos lotes)
+    by_sku = {row["sku"]: (line, row) for line, row in pending}
+    rows = _resolve_slugs(db, sorted(by_sku.values(), key=lambda item: item[0]), errors)
+    imported = 0
+    if rows:
+        try:
+            imported = _write_batch(db, [row for _, row in rows], location_id)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning("catalog_import_batch_failed", extra={"batch": batch_no, "error": str(e)})
+            errors.extend(_error(line, row["sku"], "lote rechazado por la base") for line, row in rows)
+            imported = 0
+        else:
+            catalog_cache.bump("catalog", "stock", "prices")
+    return {
+        "batch": batch_no,
+        "imported": imported,
+        "errors": sorted(errors, key=lambda e: e["line"]),
+        "elapsed_ms": int((time.perf_counter() - t0) * 1000),
+    }
+
+
+def import_records(
+    db: Session,
+    records: Iterable[tuple[int, dict | str]],
+    batch_size: int = BATCH_SIZE,
+    location_id: int = DEFAULT_LOCATION_ID,
+) -> Iterator[dict]:
+    """Importa por lotes y devuelve el progreso de cada uno; el último ítem es el total (`done`)."""
+    categories = dict(db.execute(select(Category.slug, Category.id)).all())
+    totals = {"done": True, "rows": 0, "imported": 0, "errors": 0, "batches": 0}
+    pending: list[tuple[int, dict]] = []
+    errors: list[dict] = []
+    line = 0
+    for line, raw in records:
+        totals["rows"] += 1
+        try:
+            pending.append((line, parse_record(raw, categories)))
+        except RowError as e:
+            sku = raw.get("sku") if isinstance(raw, dict) else None
+            errors.append(_error(line, sku or None, str(e)))
+        if len(pending) + len(errors) >= batch_size:
+            totals["batches"] += 1
+            progress = _flush(db, totals["batches"], pending, errors, location_id)
+            totals["imported"] += progress["imported"]
+            totals["errors"] += len(progress["errors"])
+            yield {**progress, "line": line}
+            pending, errors = [], []
+    if pending or errors:
+        totals["batches"] += 1
+        progress = _flush(db, totals["batches"], pending, errors, location_id)
+        totals["imported"] += progress["imported"]
+        totals["errors"] += len(progress["errors"])
+        yield {**progress, "line": line}
+    logger.info("catalog_import_done", extra={k: v for k, v in totals.items() if k != "done"})
+    yield totals
+
+
+def import_stream(
+    db: Session,
+    stream: IO[str],
+    fmt: str,
+    batch_size: int = BATCH_SIZE,
+    location_id: int = DEFAULT_LOCATION_ID,
+) -> Iterator[dict]:
+    """`import_records` sobre un stream de texto (abrir con newline="" para CSV)."""
+    return import_records(db, iter_records(stream, fmt), batch_size, location_id)
@@ -0,0 +1,125 @@
+"""Árbol de categorías materializado en `category_closure`.
+
+La tabla se mantiene en `after_flush` (misma transacción que el cambio):
+altas agregan sus filas de ancestros, un cambio de `parent_id` mueve el
+subárbol entero y las bajas borran sus filas (además del ON DELETE CASCADE).
+"Productos de Paneles y subcategorías" es entonces un único
+`category_id IN (SELECT descendant_id ... WHERE ancestor_id = ?)` por PK.
+"""
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.category_closure import CategoryClosure
+
+
+class CategoryCycleError(ValueError):
+    pass
+
+
+def descendants_subquery(category_id: int):
+    return select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+
+
+def descendant_ids(db: Session, category_id: int) -> set[int]:
+    return set(db.execute(descendants_subquery(category_id)).scalars())
+
+
+def closure_rows(parents: dict[int, int | None]) -> list[dict]:
+    """Filas de clausura a partir de {id: parent_id} (reconstrucción completa)."""
+    rows = []
+    for node in parents:
+        ancestor, depth, seen = node, 0, set()
+        while ancestor is not None and ancestor not in seen:
+            seen.add(ancestor)
+            rows.append({"ancestor_id": ancestor, "descendant_id": node, "depth": depth})
+            ancestor, depth = parents.get(ancestor), depth + 1
+    return rows
+
+
+def rebuild(db: Session) -> int:
+    parents = dict(db.execute(select(Category.id, Category.parent_id)).all())
+    rows = closure_rows(parents)
+    db.execute(delete(CategoryClosure))
+    if rows:
+        db.execute(insert(CategoryClosure), rows)
+    return len(rows)
+
+
+def _attach(conn, node_id: int, parent_id: int | None, subtree: list[tuple[int, int]]) -> None:
+    """Cuelga `subtree` [(descendiente, profundidad desde node)] debajo de `parent_id`."""
+    if parent_id is None:
+        return
+    ancestors = conn.execute(
+        select(CategoryClosure.ancestor_id, CategoryClosure.depth).where(CategoryClosure.descendant_id == parent_id)
+    ).all()
+    if any(a == node_id for a, _ in ancestors):
+        raise CategoryCycleError(f"Category {node_id} cannot be moved under its own subtree")
+    rows = [
+        {"ancestor_id": a, "descendant_id": d, "depth": da + dd + 1}
+        for a, da in ancestors
+        for d, dd in subtree
+    ]
+    if rows:
+        conn.execute(insert(CategoryClosure), rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_closure(session: Session, flush_context) -> None:
+    added = [o for o in session.new if isinstance(o, Category)]
+    dirty = [o for o in session.dirty if isinstance(o, Category)]
+    removed = [o.id for o in session.deleted if isinstance(o, Category)]
+    if not (added or dirty or removed):
+        return
+    conn = session.connection()
+    if removed:
+        conn.execute(
+            delete(CategoryClosure).where(
+                CategoryClosure.ancestor_id.in_(removed) | CategoryClosure.descendant_id.in_(removed)
+            )
+        )
+
+    # Altas: padres antes que hijos (un alta puede colgar de otra del mismo flush)
+    pending = {c.id: c for c in added}
+    done: set[int] = set()
+
+    def add(c: Category) -> None:
+        if c.id in done:
+            return
+        done.add(c.id)
+        if c.parent_id in pending:
+            add(pending[c.parent_id])
+        conn.execute(insert(CategoryClosure).values(ancestor_id=c.id, descendant_id=c.id, depth=0))
+        _attach(conn, c.id, c.parent_id, [(c.id, 0)])
+
+    for c in added:
+        add(c)
+
+    if not dirty:
+        return
+    # Movidas: comparar con el padre materializado (fila depth=1)
+    ids = [c.id for c in dirty]
+    current = dict(
+        conn.execute(
+            select(CategoryClosure.descendant_id, CategoryClosure.ancestor_id).where(
+                CategoryClosure.descendant_id.in_(ids), CategoryClosure.depth == 1
+            )
+        ).all()
+    )
+    for c in dirty:
+        if current.get(c.id) == c.parent_id:
+            continue
+        subtree = conn.execute(
+            select(CategoryClosure.descendant_id, CategoryClosure.depth).where(CategoryClosure.ancestor_id == c.id)
+        ).all()
+        old_ancestors = conn.execute(
+            select(CategoryClosure.ancestor_id).where(CategoryClosure.descendant_id == c.id, CategoryClosure.depth > 0)
+        ).scalars().all()
+        if old_ancestors:
+            conn.execute(
+                delete(CategoryClosure).where(
+                    CategoryClosure.descendant_id.in_([d for d, _ in subtree]),
+                    CategoryClosure.ancestor_id.in_(old_ancestors),
+                )
+            )
+        _attach(conn, c.id, c.parent_id, [(d, dd) for d, dd in subtree])
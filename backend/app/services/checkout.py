@@ -1,13 +1,13 @@
 from datetime import datetime
-from decimal import Decimal
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_, select
 from app.models.cart import Cart
 from app.models.cart_item import CartItem
 from app.models.stock_reservation import StockReservation
 from app.models.order import Order
 from app.models.order_item import OrderItem
-from app.common.money import format_money
+from app.common.money import Money, format_money
+from app.services.cart import reprice_items
 from app.services.order_seq import next_order_number
 
 
@@ -19,7 +19,32 @@ def _active_reservations(db: Session, cart_id: int):
     )
 
 
-def start_checkout(db: Session, cart_id: int, shipping_address: dict | None = None, billing_address: dict | None = None, user_override_id: int | None = None) -> dict:
+def _order_totals(items) -> dict[str, Money]:
+    # Suma de enteros (centavos); envío y descuento aún no se calculan
+    subtotal = Money(sum(i.subtotal.cents for i in items))
+    shipping, discount = Money(), Money()
+    return {
+        "subtotal": subtotal,
+        "shipping_cost": shipping,
+        "discount_total": discount,
+        "grand_total": subtotal + shipping - discount,
+    }
+
+
+def _item_out(it: CartItem, currency: str) -> dict:
+    return {
+        "product_id": it.product_id,
+        "name": str(getattr(it.product, "name", "")),
+        "sku": str(getattr(it.product, "sku", "")),
+        "tier": it.tier,
+        "currency": currency,
+        "qty": it.qty,
+        "unit_price": format_money(it.unit_price),
+        "subtotal": format_money(it.subtotal),
+    }
+
+
+def start_checkout(db: Session, cart_id: int, shipping_address: dict | None = None, billing_address: dict | None = None, user_override_id: int | None = None, user_role: str | None = None) -> dict:
     cart = db.query(Cart).filter(Cart.id == cart_id).first()
     if not cart:
         raise ValueError("Cart not found")
@@ -32,11 +57,13 @@ def start_checkout(db: Session, cart_id: int, shipping_address: dict | None = No
         # In dev/test, gracefully return the existing order as a successful start
         from app.core.settings import settings as app_settings
         if app_settings.APP_ENV != "production" and existing.status == "pending":
-            items = db.query(CartItem).filter(CartItem.cart_id == cart_id).all()
-            subtotal_d = sum(Decimal(str(i.subtotal)) for i in items)
-            shipping_d = Decimal("0.00")
-            discount_d = Decimal("0.00")
-            grand_d = subtotal_d + shipping_d - discount_d
+            items = (
+                db.query(CartItem)
+                .options(selectinload(CartItem.product))
+                .filter(CartItem.cart_id == cart_id)
+                .all()
+            )
+            money = _order_totals(items)
             return {
                 "ok": True,
                 "order": {
@@ -45,24 +72,9 @@ def start_checkout(db: Session, cart_id: int, shipping_address: dict | None = No
                     "cart_id": existing.cart_id,
                     "status": existing.status,
                     "currency": existing.currency,
-                    "subtotal": format_money(subtotal_d),
-                    "shipping_cost": format_money(shipping_d),
-                    "discount_total": format_money(discount_d),
-                    "grand_total": format_money(grand_d),
+                    **{k: format_money(v) for k, v in money.items()},
                 },
-                "items": [
-                    {
-                        "product_id": it.product_id,
-                        "name": str(getattr(it.product, "name", "")),
-                        "sku": str(getattr(it.product, "sku", "")),
-                        "tier": it.tier,
-                        "currency": existing.currency,
-                        "qty": it.qty,
-                        "unit_price": format_money(Decimal(str(it.unit_price))),
-                        "subtotal": format_money(Decimal(str(it.subtotal))),
-                    }
-                    for it in items
-                ],
+                "items": [_item_out(it, existing.currency) for it in items],
             }
         # Dev/Test: if a previous terminal order occupies the cart_id, free it to allow a new order
         if app_settings.APP_ENV != "production" and existing.status in ("paid", "cancelled", "expired"):
@@ -88,11 +100,16 @@ def start_checkout(db: Session, cart_id: int, shipping_address: dict | None = No
         if r.expires_at <= now and app_settings5.APP_ENV == "production":
             return {"ok": False, "error": "reservations_expired", "status_code": 409}
 
-    items = db.query(CartItem).filter(CartItem.cart_id == cart_id).all()
-    subtotal_d = sum(Decimal(str(i.subtotal)) for i in items)
-    shipping_d = Decimal("0.00")
-    discount_d = Decimal("0.00")
-    grand_d = subtotal_d + shipping_d - discount_d
+    # Productos en una sola consulta (antes: lazy-load de it.product por ítem)
+    items = (
+        db.query(CartItem)
+        .options(selectinload(CartItem.product))
+        .filter(CartItem.cart_id == cart_id)
+        .all()
+    )
+    # Recotizar con la versión vigente: la orden (y cada línea) queda con una sola lista de precios
+    pricing_version = reprice_items(db, items, user_role).version
+    money = _order_totals(items)
 
     # Generate order number (locks sequence row)
     order_number = next_order_number(db)
@@ -106,11 +123,11 @@ def start_checkout(db: Session, cart_id: int, shipping_address: dict | None = No
         session_id=cart.session_id,
         status="pending",
         currency=cart.currency,
-        subtotal=float(subtotal_d),
-        shipping_cost=float(shipping_d),
-        discount_total=float(discount_d),
-        grand_total=float(grand_d),
-        pricing_version=None,
+        subtotal=money["subtotal"],
+        shipping_cost=money["shipping_cost"],
+        discount_total=money["discount_total"],
+        grand_total=money["grand_total"],
+        pricing_version=pricing_version,
         tax_profile=None,
         shipping_address_json=shipping_address or None,
         billing_address_json=billing_address or None,
@@ -130,6 +147,8 @@ def start_checkout(db: Session, cart_id: int, shipping_address: dict | None = No
             subtotal=it.subtotal,
         )
         db.add(oi)
+    # Armar ítems antes del commit: después expiran y se recargarían fila por fila
+    items_out = [_item_out(it, cart.currency) for it in items]
     db.commit()
     db.refresh(order)
 
@@ -141,22 +160,7 @@ def start_checkout(db: Session, cart_id: int, shipping_address: dict | None = No
             "cart_id": order.cart_id,
             "status": order.status,
             "currency": order.currency,
-            "subtotal": format_money(subtotal_d),
-            "shipping_cost": format_money(shipping_d),
-            "discount_total": format_money(discount_d),
-            "grand_total": format_money(grand_d),
+            **{k: format_money(v) for k, v in money.items()},
         },
-        "items": [
-            {
-                "product_id": it.product_id,
-                "name": str(getattr(it.product, "name", "")),
-                "sku": str(getattr(it.product, "sku", "")),
-                "tier": it.tier,
-                "currency": cart.currency,
-                "qty": it.qty,
-                "unit_price": format_money(Decimal(str(it.unit_price))),
-                "subtotal": format_money(Decimal(str(it.subtotal))),
-            }
-            for it in items
-        ],
-    }
\ No newline at end of file
+        "items": items_out,
+    }
@@ -1,14 +1,13 @@
 import logging
 from datetime import datetime
-from decimal import Decimal
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import DataError as SADataError
 from sqlalchemy import and_, select
 from app.models.order import Order
 from app.models.payment_intent import PaymentIntent
 from app.models.stock_reservation import StockReservation
-from app.models.stock_item import StockItem
 from app.common.money import format_money
+from app.services.stock import stock_items_by_key
 from typing import Any
 from app.core.settings import settings
 
@@ -37,7 +36,7 @@ def create_preference(db: Session, order_id: int) -> dict:
                         "title": f"Orden #{order.order_number}",
                         "quantity": 1,
                         "currency_id": order.currency,
-                        "unit_price": float(order.grand_total),
+                        "unit_price": float(order.grand_total),  # MP espera un número en unidades
                     }
                 ],
                 "external_reference": order.order_number,
@@ -85,7 +84,7 @@ def create_preference(db: Session, order_id: int) -> dict:
         "intent": {
             "id": intent.id,
             "status": intent.status,
-            "amount": format_money(Decimal(str(order.grand_total))),
+            "amount": format_money(order.grand_total),
             "currency": intent.currency,
             "preference_id": intent.mp_preference_id,
             "preference_url": intent.mp_preference_url,
@@ -103,13 +102,9 @@ def _consume_reservations_atomic(db: Session, cart_id: int):
         .with_for_update()
         .all()
     )
+    stock = stock_items_by_key(db, ((r.product_id, r.location_id) for r in ress), for_update=True)
     for r in ress:
-        s = (
-            db.query(StockItem)
-            .filter(and_(StockItem.product_id == r.product_id, StockItem.location_id == r.location_id))
-            .with_for_update()
-            .first()
-        )
+        s = stock.get((r.product_id, r.location_id))
         # move from committed to on_hand consumption
         if s:
             if int(s.committed) >= r.qty:
@@ -131,40 +126,52 @@ def _release_reservations_atomic(db: Session, cart_id: int):
         .with_for_update()
         .all()
     )
+    stock = stock_items_by_key(db, ((r.product_id, r.location_id) for r in ress), for_update=True)
     for r in ress:
-        s = (
-            db.query(StockItem)
-            .filter(and_(StockItem.product_id == r.product_id, StockItem.location_id == r.location_id))
-            .with_for_update()
-            .first()
-        )
+        s = stock.get((r.product_id, r.location_id))
         if s and int(s.committed) >= r.qty:
             s.committed = int(s.committed) - r.qty
         r.status = "released"
 
 
-def process_webhook(db: Session, payload: dict) -> dict:
+def webhook_payment_id(payload: dict) -> str:
+    data = payload.get("data") or {}
+    return str(data.get("id") or payload.get("id") or payload.get("payment_id") or "")
+
+
+def fetch_mp_payment(payment_id: str) -> dict:
+    """Consulta el pago en MP (HTTP bloqueante). {} si no hay credenciales o falla.
+
+    Separado de process_webhook para que los handlers async lo corran en el
+    threadpool y la parte de DB vaya por la sesión async.
+    """
+    try:
+        import mercadopago  # type: ignore
+        access_token = settings.MP_ACCESS_TOKEN_SANDBOX
+        if access_token:
+            sdk = mercadopago.SDK(access_token)
+            resp = sdk.payment().get(payment_id)  # type: ignore[attr-defined]
+            return resp.get("response") or {}
+    except Exception as e:
+        logger.warning("mp_payment_fetch_failed", extra={"error": str(e), "payment_id": payment_id})
+    return {}
+
+
+def process_webhook(db: Session, payload: dict, mp_payment: dict | None = None) -> dict:
     # Dev/Test payloads: {"type":"payment","data":{"id":"...","status": optional}}
     # Production could send different fields; signature validation will be handled elsewhere.
+    # mp_payment: respuesta de fetch_mp_payment ya obtenida por el llamador (None = consultarla acá)
     data = payload.get("data") or {}
-    payment_id = str(data.get("id") or payload.get("id") or payload.get("payment_id") or "")
+    payment_id = webhook_payment_id(payload)
     status = str(data.get("status") or payload.get("status") or "").lower()
     external_reference = payload.get("external_reference")
 
-    # Si tenemos payment_id, intentar consultar al SDK para obtener external_reference y estado real
+    # Si tenemos payment_id, usar el pago del SDK para obtener external_reference y estado real
     if payment_id:
-        try:
-            import mercadopago  # type: ignore
-            access_token = settings.MP_ACCESS_TOKEN_SANDBOX
-            if access_token:
-                sdk = mercadopago.SDK(access_token)
-                resp = sdk.payment().get(payment_id)  # type: ignore[attr-defined]
-                pr = resp.get("response") or {}
-                if pr:
-                    external_reference = pr.get("external_reference") or external_reference
-                    status = str(pr.get("status") or status or "").lower()
-        except Exception as e:
-            logger.warning("mp_payment_fetch_failed", extra={"error": str(e), "payment_id": payment_id})
+        pr = mp_payment if mp_payment is not None else fetch_mp_payment(payment_id)
+        if pr:
+            external_reference = pr.get("external_reference") or external_reference
+            status = str(pr.get("status") or status or "").lower()
 
     # Resolve order and intent
     intent = None
@@ -0,0 +1,238 @@
+"""Listas de precios versionadas e inmutables, con puntero a la vigente.
+
+- `create_version` copia a un borrador los precios actuales (product_prices)
+  o los de otra versión, con un INSERT ... SELECT. `set_items` edita el
+  borrador y `publish` lo congela. Desde ahí sus ítems no se pueden tocar:
+  before_flush lo rechaza con PriceListImmutable.
+- `activate` mueve el puntero de PricingState con un UPDATE. El PriceBook
+  (services/pricing.py) cachea por (versión, producto) sin invalidación, así
+  que cambiar de versión no descarta nada. En la misma transacción
+  product_prices se alinea con la versión, escribiendo sólo lo que difiere,
+  y se refresca product_listing: el catálogo muestra lo que se cobra.
+- Carritos y órdenes registran la versión con la que se cotizó (`version_tag`).
+- Escribir product_prices con una versión vigente vuelve a precios vivos
+  (puntero NULL): la lista publicada nunca queda desalineada en silencio.
+"""
+import logging
+from datetime import datetime
+from itertools import chain
+
+from sqlalchemy import and_, delete, exists, insert, inspect, literal, not_, or_, select, update
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.common.ttl_cache import TTLCache
+from app.core import catalog_cache
+from app.core.settings import settings
+from app.db.upsert import upsert
+from app.models.price_list import PriceListItem, PriceListVersion, PricingState
+from app.models.product_price import ProductPrice
+from app.services import product_listing
+
+logger = logging.getLogger(__name__)
+
+STATE_ID = 1
+BATCH_SIZE = 500
+_COLUMNS = ("product_id", "tier", "currency", "amount", "minimum_qty")
+_POINTER_KEY = "price_list_pointer_changed"
+_MISSING = object()
+
+# Puntero leído de la base, compartido entre hilos; cada worker lo relee cada PRICING_ACTIVE_VERSION_TTL_SECONDS
+_active = TTLCache(maxsize=1, ttl=settings.PRICING_ACTIVE_VERSION_TTL_SECONDS)
+
+
+class PriceListError(ValueError):
+    pass
+
+
+class PriceListNotFound(PriceListError):
+    pass
+
+
+class PriceListImmutable(PriceListError):
+    pass
+
+
+def version_tag(version_id: int | None) -> str | None:
+    """Valor de Order.pricing_version / CartItem.pricing_version (None: precios vivos)."""
+    return f"pl{version_id}" if version_id is not None else None
+
+
+def active_version(db: Session) -> int | None:
+    version_id = _active.get("active", _MISSING)
+    if version_id is _MISSING:
+        version_id = db.execute(
+            select(PricingState.active_version_id).where(PricingState.id == STATE_ID)
+        ).scalar_one_or_none()
+        _active.set("active", version_id)
+    return version_id
+
+
+def create_version(db: Session, label: str, source_version_id: int | None = None) -> PriceListVersion:
+    """Borrador con los precios actuales (o los de `source_version_id`)."""
+    version = PriceListVersion(label=label, status="draft")
+    db.add(version)
+    db.flush()
+    if source_version_id is None:
+        src = select(literal(version.id), *(getattr(ProductPrice, c) for c in _COLUMNS))
+    else:
+        if db.get(PriceListVersion, source_version_id) is None:
+            raise PriceListNotFound("Price list not found")
+        src = select(literal(version.id), *(getattr(PriceListItem, c) for c in _COLUMNS)).where(
+            PriceListItem.version_id == source_version_id
+        )
+    db.execute(insert(PriceListItem).from_select(["version_id", *_COLUMNS], src))
+    db.commit()
+    return version
+
+
+def _draft(db: Session, version_id: int) -> PriceListVersion:
+    version = db.get(PriceListVersion, version_id, with_for_update=True)
+    if version is None:
+        raise PriceListNotFound("Price list not found")
+    if version.status != "draft":
+        raise PriceListImmutable("Price list already published")
+    return version
+
+
+def set_items(db: Session, version_id: int, items: list[dict]) -> int:
+    """Alta o cambio de precios en un borrador (upsert multi-fila por (producto, tier))."""
+    _draft(db, version_id)
+    rows = [{"version_id": version_id, **{c: item.get(c) for c in _COLUMNS}} for item in items]
+    for row in rows:
+        row["currency"] = row["currency"] or "ARS"
+    written = upsert(db.connection(), PriceListItem.__table__, rows, update_columns=["currency", "amount", "minimum_qty"])
+    db.commit()
+    return written
+
+
+def publish(db: Session, version_id: int) -> PriceListVersion:
+    version = _draft(db, version_id)
+    version.status = "published"
+    version.published_at = datetime.utcnow()
+    db.commit()
+    return version
+
+
+def _materialize(db: Session, version_id: int) -> int:
+    """Alinea product_prices con la versión escribiendo sólo las diferencias; devuelve productos tocados."""
+    conn = db.connection()
+    item = PriceListItem
+    in_version = exists().where(
+        item.version_id == version_id, item.product_id == ProductPrice.product_id, item.tier == ProductPrice.tier
+    )
+    # Tiers que la versión no tiene (suelen ser pocos)
+    stale = conn.execute(select(ProductPrice.id, ProductPrice.product_id).where(not_(in_version))).all()
+    touched = {pid for _, pid in stale}
+    stale_ids = [price_id for price_id, _ in stale]
+    for i in range(0, len(stale_ids), BATCH_SIZE):
+        conn.execute(delete(ProductPrice).where(ProductPrice.id.in_(stale_ids[i : i + BATCH_SIZE])))
+    product_listing.refresh(conn, touched)
+
+    total, last_id = len(touched), 0
+    while True:
+        ids = list(
+            conn.execute(
+                select(item.product_id)
+                .where(item.version_id == version_id, item.product_id > last_id)
+                .group_by(item.product_id)
+                .order_by(item.product_id)
+                .limit(BATCH_SIZE)
+            ).scalars()
+        )
+        if not ids:
+            break
+        last_id = ids[-1]
+        changed = conn.execute(
+            select(*(getattr(item, c) for c in _COLUMNS))
+            .outerjoin(ProductPrice, and_(ProductPrice.product_id == item.product_id, ProductPrice.tier == item.tier))
+            .where(
+                item.version_id == version_id,
+                item.product_id.in_(ids),
+                or_(
+                    ProductPrice.id.is_(None),
+                    ProductPrice.amount != item.amount,
+                    ProductPrice.currency != item.currency,
+                    ProductPrice.minimum_qty.is_distinct_from(item.minimum_qty),
+                ),
+            )
+        ).all()
+        if not changed:
+            continue
+        upsert(conn, ProductPrice.__table__, [dict(r._mapping) for r in changed],
+               update_columns=["currency", "amount", "minimum_qty"], conflict_columns=["product_id", "tier"])
+        changed_ids = {r.product_id for r in changed}
+        product_listing.refresh(conn, changed_ids)
+        total += len(changed_ids - touched)
+    return total
+
+
+def activate(db: Session, version_id: int | None) -> int:
+    """Pasa a cotizar con `version_id` (None: precios vivos). Devuelve productos re-materializados."""
+    if version_id is not None:
+        version = db.get(PriceListVersion, version_id)
+        if version is None:
+            raise PriceListNotFound("Price list not found")
+        if version.status != "published":
+            raise PriceListError("Only published price lists can be activated")
+    state = db.get(PricingState, STATE_ID, with_for_update=True)
+    if state is None:
+        state = PricingState(id=STATE_ID)
+        db.add(state)
+    state.active_version_id = version_id
+    db.flush()
+    touched = _materialize(db, version_id) if version_id is not None else 0
+    db.info[_POINTER_KEY] = True
+    db.commit()
+    # product_prices se escribió por Core (sin eventos del mapper)
+    catalog_cache.bump("catalog", "prices")
+    logger.info("price_list_activated", extra={"version_id": version_id, "products": touched})
+    return touched
+
+
+def go_live(db: Session) -> bool:
+    """Suelta la versión vigente (escrituras directas a product_prices); True si había una."""
+    result = db.execute(
+        update(PricingState)
+        .where(PricingState.id == STATE_ID, PricingState.active_version_id.is_not(None))
+        .values(active_version_id=None, updated_at=datetime.utcnow())
+    )
+    if not result.rowcount:
+        return False
+    db.info[_POINTER_KEY] = True
+    logger.warning("price_list_detached")
+    return True
+
+
+@event.listens_for(Session, "before_flush")
+def _guard_flush(session: Session, flush_context, instances) -> None:
+    prices_written = False
+    versions: set[int] = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, ProductPrice):
+            prices_written = True
+        elif isinstance(obj, PriceListItem) and obj.version_id is not None:
+            versions.add(obj.version_id)
+        elif isinstance(obj, PriceListVersion) and obj not in session.new:
+            status = inspect(obj).attrs.status.history
+            if "published" in (status.deleted or ()) or (obj in session.deleted and obj.status == "published"):
+                raise PriceListImmutable("Published price lists are immutable")
+    if versions:
+        published = session.execute(
+            select(PriceListVersion.id).where(PriceListVersion.id.in_(versions), PriceListVersion.status == "published")
+        ).first()
+        if published is not None:
+            raise PriceListImmutable("Published price lists are immutable")
+    if prices_written and active_version(session) is not None:
+        go_live(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _pointer_committed(session: Session) -> None:
+    if session.info.pop(_POINTER_KEY, None):
+        _active.pop("active")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pointer(session: Session) -> None:
+    session.info.pop(_POINTER_KEY, None)
@@ -1,36 +1,139 @@
+"""Resolución de precio y tier por producto y cantidad.
+
+Cada producto puede tener N tiers: retail es la base y cada tier con
+minimum_qty es un quiebre por cantidad. Reglas: rol seller|admin fuerza
+wholesale; si no, gana el quiebre de mayor minimum_qty <= qty (a igual
+umbral, el más barato), o retail por debajo del primero; si el tier elegido
+no tiene precio, retail. Los tiers de cada producto se compilan una vez en
+una `TierTable` (umbrales ordenados) y se resuelven con búsqueda binaria.
+
+`PriceBook` carga todos los tiers de un conjunto de productos en una sola
+consulta y resuelve en memoria (`resolve_many`: un carrito entero, una
+consulta). Los tiers quedan cacheados por producto en el proceso, bajo la
+versión "prices" de catalog_cache: un commit que toca product_prices la
+incrementa (este worker al instante, el resto en CATALOG_CACHE_VERSION_TTL_SECONDS)
+y lo cacheado con la versión anterior se vuelve a leer.
+
+Con una lista de precios vigente (services/price_lists.py) los tiers salen
+de price_list_items y se cachean por (versión, producto): una versión
+publicada es inmutable, así que esas entradas no se invalidan nunca.
+`PriceBook.version` es la etiqueta que registran carrito y orden. Los importes
+se resuelven como Money (centavos), listos para las líneas del carrito.
+"""
+from bisect import bisect_right
+from collections.abc import Iterable
+
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+
+from app.common.money import Money
+from app.common.ttl_cache import TTLCache
+from app.core import catalog_cache
+from app.core.settings import settings
+from app.models.price_list import PriceListItem
 from app.models.product_price import ProductPrice
+from app.services import price_lists
 
-def resolve_price(db: Session, product_id: int, qty: int, user_role: str | None = None):
-    tier = "retail"
-    # Regla 1: rol seller|admin fuerza wholesale
-    if user_role in {"seller", "admin"}:
-        tier = "wholesale"
-    else:
-        # Regla 2: qty >= minimum_qty del precio wholesale
-        wholesale = (
-            db.query(ProductPrice)
-            .filter(ProductPrice.product_id == product_id, ProductPrice.tier == "wholesale")
-            .first()
-        )
-        if wholesale and wholesale.minimum_qty is not None and qty >= wholesale.minimum_qty:
-            tier = "wholesale"
-
-    price = (
-        db.query(ProductPrice)
-        .filter(ProductPrice.product_id == product_id, ProductPrice.tier == tier)
-        .first()
-    )
-    if not price:
-        # Fallback: usar retail si no existe el tier elegido
-        price = (
-            db.query(ProductPrice)
-            .filter(ProductPrice.product_id == product_id, ProductPrice.tier == "retail")
-            .first()
+WHOLESALE_ROLES = frozenset({"seller", "admin"})
+
+
+class TierTable:
+    """Tiers de un producto compilados: umbrales ordenados y (min_qty, tier, amount) en paralelo."""
+
+    __slots__ = ("breaks", "entries", "amounts")
+
+    def __init__(self, rows: Iterable[tuple[str, Money, int | None]]) -> None:
+        rows = list(rows)
+        # retail es el umbral 0; tiers sin minimum_qty sólo aplican por rol
+        entries = sorted(
+            ((0 if tier == "retail" else min_qty, tier, amount) for tier, amount, min_qty in rows
+             if tier == "retail" or min_qty is not None),
+            key=lambda e: (e[0], -e[2].cents),
         )
-        tier = "retail"
+        self.breaks = [e[0] for e in entries]
+        self.entries = entries
+        self.amounts = {tier: amount for tier, amount, _ in rows}
 
-    if not price:
+    def resolve(self, qty: int, user_role: str | None = None) -> tuple[str, Money]:
+        if user_role in WHOLESALE_ROLES and "wholesale" in self.amounts:
+            return "wholesale", self.amounts["wholesale"]
+        if user_role not in WHOLESALE_ROLES:
+            i = bisect_right(self.breaks, qty) - 1
+            if i >= 0:
+                _, tier, amount = self.entries[i]
+                return tier, amount
+        # Fallback: usar retail si no existe el tier elegido
+        if "retail" in self.amounts:
+            return "retail", self.amounts["retail"]
         raise ValueError("Product price not found")
 
-    return tier, float(price.amount)
\ No newline at end of file
+
+_EMPTY = TierTable(())
+
+# product_id → (versión "prices", TierTable), o (lista, product_id) → (lista, TierTable)
+# con una lista vigente; también se cachean productos sin precio
+_cache = TTLCache(maxsize=settings.PRICEBOOK_MAX_ENTRIES, ttl=settings.PRICEBOOK_TTL_SECONDS)
+_stats = {"loads": 0, "loaded_products": 0}
+
+
+class PriceBook:
+    def __init__(self, tiers: dict[int, TierTable], version: str | None = None) -> None:
+        self._tiers = tiers
+        self.version = version
+
+    @classmethod
+    def load(cls, db: Session, product_ids: Iterable[int]) -> "PriceBook":
+        """Tiers de esos productos: de la caché si la versión sigue vigente, el resto en una consulta."""
+        list_id = price_lists.active_version(db)
+        if list_id is None:
+            version, source = catalog_cache.current_version("prices"), ProductPrice
+        else:
+            version, source = list_id, PriceListItem
+        tiers: dict[int, TierTable] = {}
+        missing: list[int] = []
+        for pid in {int(p) for p in product_ids}:
+            entry = _cache.get(pid if list_id is None else (list_id, pid))
+            if entry is not None and entry[0] == version:
+                tiers[pid] = entry[1]
+            else:
+                missing.append(pid)
+        if missing:
+            rows: dict[int, list] = {pid: [] for pid in missing}
+            stmt = select(source.product_id, source.tier, source.amount, source.minimum_qty).where(
+                source.product_id.in_(missing)
+            )
+            if list_id is not None:
+                stmt = stmt.where(PriceListItem.version_id == list_id)
+            for pid, tier, amount, minimum_qty in db.execute(stmt):
+                rows[pid].append((tier, Money.of(amount), minimum_qty))
+            for pid, product_rows in rows.items():
+                table = TierTable(product_rows) if product_rows else _EMPTY
+                _cache.set(pid if list_id is None else (list_id, pid), (version, table))
+                tiers[pid] = table
+            _stats["loads"] += 1
+            _stats["loaded_products"] += len(missing)
+        return cls(tiers, price_lists.version_tag(list_id))
+
+    def resolve(self, product_id: int, qty: int, user_role: str | None = None) -> tuple[str, Money]:
+        return self._tiers.get(product_id, _EMPTY).resolve(qty, user_role)
+
+    def resolve_many(
+        self, product_qtys: Iterable[tuple[int, int]], user_role: str | None = None
+    ) -> list[tuple[str, Money]]:
+        """(tier, amount) por cada (product_id, qty), en el mismo orden."""
+        return [self.resolve(pid, qty, user_role) for pid, qty in product_qtys]
+
+
+def resolve_price(db: Session, product_id: int, qty: int, user_role: str | None = None) -> tuple[str, Money]:
+    return PriceBook.load(db, (product_id,)).resolve(product_id, qty, user_role)
+
+
+def resolve_many(
+    db: Session, product_qtys: Iterable[tuple[int, int]], user_role: str | None = None
+) -> list[tuple[str, Money]]:
+    product_qtys = list(product_qtys)
+    return PriceBook.load(db, (pid for pid, _ in product_qtys)).resolve_many(product_qtys, user_role)
+
+
+def stats() -> dict:
+    return {"cache": _cache.stats(), **_stats}
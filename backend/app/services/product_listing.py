@@ -0,0 +1,187 @@
+"""Mantenimiento de la proyección `product_listing`.
+
+Las escrituras de productos, precios, stock y categorías (API de catálogo,
+pricing, services/stock.py, webhooks) encolan los product_id afectados vía
+eventos del mapper; en `after_flush` se recalculan esas filas con una
+consulta set-based y un upsert multi-fila, en la misma transacción que el
+cambio. `rebuild` recorre todo el catálogo por lotes (python -m app.rebuild_listing).
+"""
+from collections.abc import Collection, Iterator
+from datetime import datetime
+
+from sqlalchemy import case, delete, event, func, select
+from sqlalchemy.orm import Session, object_session
+
+# Registrar antes el mantenimiento de category_closure: los paths se leen de ahí
+from app.services import category_tree  # noqa: F401
+from app.db.upsert import upsert
+from app.models.category import Category
+from app.models.category_closure import CategoryClosure
+from app.models.product import Product
+from app.models.product_listing import ProductListing
+from app.models.product_price import ProductPrice
+from app.models.stock_item import StockItem
+from app.services.stock import DEFAULT_LOCATION_ID
+
+BATCH_SIZE = 500
+PATH_SEPARATOR = " / "
+_PENDING_KEY = "product_listing_pending"
+
+
+def _chunks(ids: list[int], size: int) -> Iterator[list[int]]:
+    for i in range(0, len(ids), size):
+        yield ids[i : i + size]
+
+
+def category_paths(conn, category_ids: Collection[int]) -> dict[int, str]:
+    """"Paneles / Monocristalinos" por categoría, desde la tabla de clausura."""
+    if not category_ids:
+        return {}
+    rows = conn.execute(
+        select(CategoryClosure.descendant_id, Category.name)
+        .join(Category, Category.id == CategoryClosure.ancestor_id)
+        .where(CategoryClosure.descendant_id.in_(list(category_ids)))
+        .order_by(CategoryClosure.descendant_id, CategoryClosure.depth.desc())
+    )
+    parts: dict[int, list[str]] = {}
+    for cat_id, name in rows:
+        parts.setdefault(cat_id, []).append(name)
+    return {cat_id: PATH_SEPARATOR.join(names) for cat_id, names in parts.items()}
+
+
+def project(conn, product_ids: list[int]) -> list[dict]:
+    """Filas de la proyección para esos productos (los inexistentes no aparecen)."""
+    prices = (
+        select(
+            ProductPrice.product_id,
+            func.max(case((ProductPrice.tier == "retail", ProductPrice.amount))).label("retail_amount"),
+            func.max(case((ProductPrice.tier == "wholesale", ProductPrice.amount))).label("wholesale_amount"),
+            func.max(case((ProductPrice.tier == "wholesale", ProductPrice.minimum_qty))).label("wholesale_min_qty"),
+            func.max(ProductPrice.currency).label("currency"),
+        )
+        .where(ProductPrice.product_id.in_(product_ids))
+        .group_by(ProductPrice.product_id)
+        .subquery()
+    )
+    stock = (
+        select(StockItem.product_id, func.sum(StockItem.on_hand - StockItem.committed).label("available"))
+        .where(StockItem.product_id.in_(product_ids), StockItem.location_id == DEFAULT_LOCATION_ID)
+        .group_by(StockItem.product_id)
+        .subquery()
+    )
+    rows = conn.execute(
+        select(
+            Product.id,
+            Product.name,
+            Product.slug,
+            Product.sku,
+            Product.description,
+            Product.is_active,
+            Product.category_id,
+            Product.created_at,
+            prices.c.currency,
+            prices.c.retail_amount,
+            prices.c.wholesale_amount,
+            prices.c.wholesale_min_qty,
+            stock.c.available,
+        )
+        .outerjoin(prices, prices.c.product_id == Product.id)
+        .outerjoin(stock, stock.c.product_id == Product.id)
+        .where(Product.id.in_(product_ids))
+    ).all()
+    paths = category_paths(conn, {r.category_id for r in rows if r.category_id})
+    now = datetime.utcnow()
+    out = []
+    for r in rows:
+        row = dict(r._mapping)
+        row["category_path"] = paths.get(r.category_id)
+        row["available"] = max(int(r.available or 0), 0)
+        row["refreshed_at"] = now
+        out.append(row)
+    return out
+
+
+def refresh(conn, product_ids: Collection[int]) -> int:
+    """Recalcula (o borra) las filas de esos productos; devuelve cuántas quedaron."""
+    ids = sorted({int(i) for i in product_ids})
+    written = 0
+    for chunk in _chunks(ids, BATCH_SIZE):
+        rows = project(conn, chunk)
+        gone = set(chunk) - {r["id"] for r in rows}
+        if gone:
+            conn.execute(delete(ProductListing).where(ProductListing.id.in_(gone)))
+        if rows:
+            written += upsert(conn, ProductListing.__table__, rows)
+    return written
+
+
+def rebuild(db: Session, batch_size: int = BATCH_SIZE, progress=None) -> int:
+    """Reconstruye toda la proyección por lotes de ids (cada lote en su transacción)."""
+    total, last_id = 0, 0
+    while True:
+        ids = list(
+            db.execute(select(Product.id).where(Product.id > last_id).order_by(Product.id).limit(batch_size)).scalars()
+        )
+        if not ids:
+            break
+        total += refresh(db.connection(), ids)
+        db.commit()
+        last_id = ids[-1]
+        if progress is not None:
+            progress(total, last_id)
+    # Filas huérfanas (productos borrados por fuera del ORM)
+    db.execute(delete(ProductListing).where(ProductListing.id.not_in(select(Product.id))))
+    db.commit()
+    return total
+
+
+def _pending(target) -> dict | None:
+    sess = object_session(target)
+    if sess is None:
+        return None
+    return sess.info.setdefault(_PENDING_KEY, {"products": set(), "categories": set()})
+
+
+def _product_changed(mapper, connection, target: Product) -> None:
+    pending = _pending(target)
+    if pending is not None:
+        pending["products"].add(target.id)
+
+
+def _child_changed(mapper, connection, target) -> None:
+    pending = _pending(target)
+    if pending is not None and target.product_id is not None:
+        pending["products"].add(target.product_id)
+
+
+def _category_changed(mapper, connection, target: Category) -> None:
+    pending = _pending(target)
+    if pending is not None:
+        pending["categories"].add(target.id)
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Product, _event, _product_changed)
+    event.listen(ProductPrice, _event, _child_changed)
+    event.listen(StockItem, _event, _child_changed)
+# Alta de categoría: todavía sin productos; renombre o movida cambian el path del subárbol
+event.listen(Category, "after_update", _category_changed)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_pending(session: Session, flush_context) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    conn = session.connection()
+    ids = set(pending["products"])
+    if pending["categories"]:
+        subtree = select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id.in_(pending["categories"]))
+        ids.update(conn.execute(select(Product.id).where(Product.category_id.in_(subtree))).scalars())
+    if ids:
+        refresh(conn, ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,281 @@
+"""Búsqueda de productos: índice invertido in-process con plegado de acentos.
+
+- Términos de name (peso 3), sku (5, también compactado: "AG-500" → "ag500")
+  y description (1), sin acentos ni mayúsculas ("Baterías" → "baterias").
+- Cada término de la consulta matchea exacto o por prefijo ("bateria" →
+  "baterias"); todos deben matchear (AND). Score = Σ peso × idf, exacto > prefijo.
+- Refresco incremental por `Product.updated_at` (entre workers) cada
+  CATALOG_SEARCH_REFRESH_SECONDS, más eventos del mapper en este proceso.
+  Las bajas se aplican localmente y con la reconstrucción completa periódica.
+"""
+import bisect
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections.abc import Collection
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from app.core.settings import settings
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+NAME_WEIGHT = 3.0
+SKU_WEIGHT = 5.0
+DESCRIPTION_WEIGHT = 1.0
+PREFIX_FACTOR = 0.6
+MIN_PREFIX_LEN = 2
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Se ignoran en la consulta (si queda algún otro término): no aportan y por prefijo matchean casi todo
+STOPWORDS = frozenset({"a", "al", "con", "de", "del", "el", "en", "la", "las", "los", "para", "por", "un", "una", "y"})
+
+
+def fold(text: str | None) -> str:
+    """Minúsculas y sin diacríticos (ñ → n, á → a)."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str | None) -> list[str]:
+    return _TOKEN.findall(fold(text))
+
+
+def _rank_key(item: tuple[int, float]) -> tuple[float, int]:
+    return -item[1], item[0]
+
+
+class SearchIndex:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        # término → {product_id: peso}
+        self._postings: dict[str, dict[int, float]] = {}
+        self._terms: list[str] = []  # ordenados, para expansión por prefijo
+        self._docs: dict[int, tuple[frozenset[str], int | None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def upsert(self, product_id: int, name: str, sku: str, description: str | None, category_id: int | None) -> None:
+        weights: dict[str, float] = {}
+        for field, weight in ((description, DESCRIPTION_WEIGHT), (name, NAME_WEIGHT), (sku, SKU_WEIGHT)):
+            for t in tokenize(field):
+                weights[t] = max(weights.get(t, 0.0), weight)
+        compact_sku = "".join(tokenize(sku))
+        if compact_sku:
+            weights[compact_sku] = SKU_WEIGHT
+        with self._lock:
+            self._remove_locked(product_id)
+            for t, w in weights.items():
+                posting = self._postings.get(t)
+                if posting is None:
+                    posting = self._postings[t] = {}
+                    bisect.insort(self._terms, t)
+                posting[product_id] = w
+            self._docs[product_id] = (frozenset(weights), category_id)
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            self._remove_locked(product_id)
+
+    def _remove_locked(self, product_id: int) -> None:
+        doc = self._docs.pop(product_id, None)
+        if doc is None:
+            return
+        for t in doc[0]:
+            posting = self._postings.get(t)
+            if posting is None:
+                continue
+            posting.pop(product_id, None)
+            if not posting:
+                del self._postings[t]
+                i = bisect.bisect_left(self._terms, t)
+                if i < len(self._terms) and self._terms[i] == t:
+                    del self._terms[i]
+
+    def _expand(self, token: str) -> list[str]:
+        if len(token) < MIN_PREFIX_LEN:
+            return [token] if token in self._postings else []
+        i = bisect.bisect_left(self._terms, token)
+        out = []
+        while i < len(self._terms) and self._terms[i].startswith(token):
+            out.append(self._terms[i])
+            i += 1
+        return out
+
+    def search(
+        self, query: str, category_id: int | Collection[int] | None = None, limit: int | None = None
+    ) -> list[int]:
+        """Ids que matchean todos los términos, por relevancia (desc) e id."""
+        return [pid for pid, _ in self.search_scored(query, category_id, limit)]
+
+    def search_scored(
+        self,
+        query: str,
+        category_id: int | Collection[int] | None = None,
+        limit: int | None = None,
+        after: tuple[float, int] | None = None,
+    ) -> list[tuple[int, float]]:
+        """(id, score) por relevancia (desc) e id.
+
+        `category_id` acepta también un conjunto (categoría y descendientes).
+        Con `limit` sólo se ordenan los primeros (heap) en vez de todo el
+        resultado; `after` = (score, id) del último ya servido (cursor).
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        tokens = [t for t in tokens if t not in STOPWORDS] or tokens
+        if not tokens:
+            return []
+        with self._lock:
+            n_docs = max(len(self._docs), 1)
+            scores: dict[int, float] | None = None
+            # Términos más selectivos primero: la intersección se achica antes
+            expanded = sorted(((t, self._expand(t)) for t in tokens), key=lambda e: len(e[1]))
+            for token, terms in expanded:
+                if not terms:
+                    return []
+                matched: dict[int, float] = {}
+                for term in terms:
+                    factor = 1.0 if term == token else PREFIX_FACTOR
+                    for pid, w in self._postings[term].items():
+                        if scores is not None and pid not in scores:
+                            continue
+                        s = w * factor
+                        if s > matched.get(pid, 0.0):
+                            matched[pid] = s
+                idf = math.log(1.0 + n_docs / max(len(matched), 1))
+                if scores is None:
+                    scores = {pid: s * idf for pid, s in matched.items()}
+                else:
+                    scores = {pid: scores[pid] + s * idf for pid, s in matched.items()}
+                if not scores:
+                    return []
+            if category_id is not None:
+                allowed = {category_id} if isinstance(category_id, int) else category_id
+                scores = {pid: s for pid, s in scores.items() if self._docs[pid][1] in allowed}
+        items = scores.items()
+        if after is not None:
+            last = _rank_key((after[1], after[0]))
+            items = [kv for kv in items if _rank_key(kv) > last]
+        if limit is not None:
+            return heapq.nsmallest(limit, items, key=_rank_key)
+        return sorted(items, key=_rank_key)
+
+
+_index = SearchIndex()
+_state = {"built_at": 0.0, "checked_at": 0.0, "watermark": None, "refreshes": 0, "rebuilds": 0}
+_refresh_lock = threading.Lock()
+
+_COLUMNS = (Product.id, Product.name, Product.sku, Product.description, Product.category_id, Product.updated_at)
+
+
+def _load(db: Session, index: SearchIndex, since: datetime | None = None) -> datetime | None:
+    q = select(*_COLUMNS)
+    if since is not None:
+        q = q.where(Product.updated_at >= since)
+    watermark = since
+    for row in db.execute(q.execution_options(yield_per=2000)):
+        index.upsert(row.id, row.name, row.sku, row.description, row.category_id)
+        if row.updated_at is not None and (watermark is None or row.updated_at > watermark):
+            watermark = row.updated_at
+    return watermark
+
+
+def ensure_fresh(db: Session) -> SearchIndex:
+    """Construye o refresca el índice si corresponde; no bloquea si otro hilo ya lo hace."""
+    global _index
+    now = time.monotonic()
+    needs_rebuild = not _state["built_at"] or now - _state["built_at"] >= settings.CATALOG_SEARCH_REBUILD_SECONDS
+    needs_refresh = now - _state["checked_at"] >= settings.CATALOG_SEARCH_REFRESH_SECONDS
+    if not (needs_rebuild or needs_refresh):
+        return _index
+    # Primera construcción: esperar; refrescos: si otro hilo ya está, servir el índice actual
+    if not _refresh_lock.acquire(blocking=not _state["built_at"]):
+        return _index
+    try:
+        if needs_rebuild and _state["built_at"] and time.monotonic() - _state["built_at"] < settings.CATALOG_SEARCH_REBUILD_SECONDS:
+            # Otro hilo lo construyó mientras esperábamos el lock
+            return _index
+        if needs_rebuild:
+            fresh = SearchIndex()
+            t0 = time.perf_counter()
+            _state["watermark"] = _load(db, fresh)
+            _index = fresh
+            _state["built_at"] = time.monotonic()
+            _state["rebuilds"] += 1
+            logger.info("search_index_built", extra={"docs": len(fresh), "elapsed_ms": int((time.perf_counter() - t0) * 1000)})
+        else:
+            # >= watermark: re-indexar la última marca es idempotente y cubre escrituras en el mismo instante
+            since = _state["watermark"] - timedelta(seconds=1) if _state["watermark"] else None
+            _state["watermark"] = _load(db, _index, since) or _state["watermark"]
+            _state["refreshes"] += 1
+        _state["checked_at"] = time.monotonic()
+    finally:
+        _refresh_lock.release()
+    return _index
+
+
+def search_scored(
+    db: Session,
+    query: str,
+    category_id: int | Collection[int] | None = None,
+    limit: int | None = None,
+    after: tuple[float, int] | None = None,
+) -> list[tuple[int, float]]:
+    return ensure_fresh(db).search_scored(query, category_id, limit, after)
+
+
+def stats() -> dict:
+    return {
+        "docs": len(_index),
+        "terms": len(_index._terms),
+        "refreshes": _state["refreshes"],
+        "rebuilds": _state["rebuilds"],
+    }
+
+
+_PENDING_KEY = "search_index_pending"
+
+
+def _queue(target: Product, doc: tuple | None) -> None:
+    sess = object_session(target)
+    if sess is not None:
+        sess.info.setdefault(_PENDING_KEY, {})[target.id] = doc
+
+
+@event.listens_for(Product, "after_insert")
+@event.listens_for(Product, "after_update")
+def _queue_product(mapper, connection, target: Product) -> None:
+    _queue(target, (target.name, target.sku, target.description, target.category_id))
+
+
+@event.listens_for(Product, "after_delete")
+def _queue_delete(mapper, connection, target: Product) -> None:
+    _queue(target, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session) -> None:
+    # Escrituras de este proceso: visibles al confirmar (otros workers: por updated_at)
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or not _state["built_at"]:
+        return
+    for product_id, doc in pending.items():
+        if doc is None:
+            _index.remove(product_id)
+        else:
+            _index.upsert(product_id, *doc)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
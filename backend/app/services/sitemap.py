@@ -0,0 +1,180 @@
+"""Sitemap generado desde el catálogo, partido en shards bajo el límite de 50k URLs.
+
+- `/sitemap.xml` es un sitemap index: páginas fijas, categorías y un shard de
+  productos por rango de ids (`id // CATALOG_SITEMAP_SHARD_SIZE`).
+- Cada shard de productos se identifica por su huella (cantidad de activos y
+  máximo `updated_at`), guardada en `sitemap_shards`. Las escrituras de
+  productos encolan los shards tocados vía eventos del mapper y en
+  `after_flush` se recalculan sólo esos, con un rango de PK, en la misma
+  transacción. Las cargas por fuera del ORM llaman a `refresh_shards`;
+  `rebuild` (python -m app.rebuild_sitemap) recalcula todo, p. ej. al cambiar
+  el tamaño de shard.
+- Los requests de crawlers sólo leen las huellas guardadas (una vez por
+  versión del catálogo y worker). El XML se guarda pre-renderizado en
+  catalog_cache bajo la huella: al cambiar la versión del catálogo sólo se
+  re-renderizan los shards cuya huella cambió.
+"""
+import hashlib
+from collections.abc import Collection
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.orm import Session, object_session
+
+from app.core import catalog_cache
+from app.core.settings import settings
+from app.db.upsert import upsert
+from app.models.category import Category
+from app.models.product import Product
+from app.models.sitemap_shard import SitemapShard
+
+PAGES = ("/", "/about", "/contact")
+_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+_NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+_PENDING_KEY = "sitemap_shards_pending"
+
+_state: dict = {"version": None, "shards": None}
+
+
+def _url(path: str) -> str:
+    return settings.BASE_URL.rstrip("/") + path
+
+
+def _lastmod(ts: datetime | None) -> str:
+    return f"<lastmod>{ts.strftime('%Y-%m-%d')}</lastmod>" if ts else ""
+
+
+def _urlset(entries) -> bytes:
+    body = "".join(f"<url><loc>{escape(loc)}</loc>{_lastmod(ts)}</url>\n" for loc, ts in entries)
+    return f"{_HEADER}<urlset {_NS}>\n{body}</urlset>\n".encode()
+
+
+def _fingerprints(conn, shards: Collection[int] | None = None) -> list[dict]:
+    size = settings.CATALOG_SITEMAP_SHARD_SIZE
+    shard = (Product.id // size).label("shard")
+    query = select(shard, func.count(), func.max(Product.updated_at)).where(Product.is_active.is_(True))
+    if shards is not None:
+        # Rango de PK que cubre los shards pedidos: no recorre el resto del catálogo
+        query = query.where(Product.id >= min(shards) * size, Product.id < (max(shards) + 1) * size, shard.in_(shards))
+    now = datetime.utcnow()
+    rows = conn.execute(query.group_by(shard)).all()
+    return [{"shard": int(s), "products": n, "last_modified": ts, "refreshed_at": now} for s, n, ts in rows]
+
+
+def refresh_shards(conn, shards: Collection[int]) -> int:
+    """Recalcula (o borra) las huellas de esos shards; devuelve cuántas quedaron."""
+    shards = sorted({int(s) for s in shards})
+    if not shards:
+        return 0
+    rows = _fingerprints(conn, shards)
+    gone = set(shards) - {r["shard"] for r in rows}
+    if gone:
+        conn.execute(delete(SitemapShard).where(SitemapShard.shard.in_(gone)))
+    if rows:
+        upsert(conn, SitemapShard.__table__, rows, update_columns=["products", "last_modified", "refreshed_at"])
+    return len(rows)
+
+
+def rebuild(db: Session) -> int:
+    """Recalcula todas las huellas (un GROUP BY sobre el catálogo); fuera del camino de los crawlers."""
+    rows = _fingerprints(db.connection())
+    db.execute(delete(SitemapShard))
+    if rows:
+        upsert(db.connection(), SitemapShard.__table__, rows)
+    db.commit()
+    return len(rows)
+
+
+def product_shards(db: Session) -> dict[int, tuple[int, datetime | None]]:
+    """Huella por shard: {shard: (productos activos, máximo updated_at)}.
+
+    Lee `sitemap_shards` (una fila por shard), una vez por versión del catálogo.
+    """
+    version = catalog_cache.current_version()
+    if _state["shards"] is None or _state["version"] != version:
+        rows = db.execute(
+            select(SitemapShard.shard, SitemapShard.products, SitemapShard.last_modified).order_by(SitemapShard.shard)
+        ).all()
+        _state.update(version=version, shards={s: (n, ts) for s, n, ts in rows})
+    return _state["shards"]
+
+
+def _cached(name: str, fingerprint: str, build) -> bytes:
+    key = f"sitemap:{name}:{hashlib.sha1(fingerprint.encode()).hexdigest()[:16]}"
+    entry = catalog_cache.get(key) if settings.CATALOG_CACHE_ENABLED else None
+    if entry is None:
+        body = build()
+        entry = (f'"{hashlib.sha256(body).hexdigest()[:32]}"', body, {})
+        if settings.CATALOG_CACHE_ENABLED:
+            catalog_cache.put(key, entry)
+    return entry[1]
+
+
+def sitemap_index(db: Session) -> bytes:
+    shards = product_shards(db)
+    entries = [("pages", None), ("categories", None)]
+    entries += [(f"products-{s}", ts) for s, (_, ts) in shards.items()]
+
+    def build() -> bytes:
+        body = "".join(
+            f"<sitemap><loc>{escape(_url(f'/sitemaps/{name}.xml'))}</loc>{_lastmod(ts)}</sitemap>\n"
+            for name, ts in entries
+        )
+        return f"{_HEADER}<sitemapindex {_NS}>\n{body}</sitemapindex>\n".encode()
+
+    return _cached("index", repr((settings.BASE_URL, sorted(shards.items()))), build)
+
+
+def pages() -> bytes:
+    return _urlset((_url(p), None) for p in PAGES)
+
+
+def categories(db: Session) -> bytes:
+    # Pocas filas: se re-renderiza con cada versión del catálogo
+    def build() -> bytes:
+        slugs = db.execute(select(Category.slug).order_by(Category.id)).scalars()
+        return _urlset((_url(settings.CATALOG_CATEGORY_PATH.format(slug=s)), None) for s in slugs)
+
+    return catalog_cache.memo("sitemap:categories", build)
+
+
+def products(db: Session, shard: int) -> bytes | None:
+    """Shard de productos pre-renderizado; None si el shard no existe."""
+    fingerprint = product_shards(db).get(shard)
+    if fingerprint is None:
+        return None
+    size = settings.CATALOG_SITEMAP_SHARD_SIZE
+
+    def build() -> bytes:
+        rows = db.execute(
+            select(Product.slug, Product.updated_at)
+            .where(Product.is_active.is_(True), Product.id >= shard * size, Product.id < (shard + 1) * size)
+            .order_by(Product.id)
+        )
+        return _urlset((_url(settings.CATALOG_PRODUCT_PATH.format(slug=slug)), ts) for slug, ts in rows)
+
+    return _cached(f"products-{shard}", repr((settings.BASE_URL, size, fingerprint)), build)
+
+
+def _product_changed(mapper, connection, target: Product) -> None:
+    sess = object_session(target)
+    if sess is not None:
+        sess.info.setdefault(_PENDING_KEY, set()).add(target.id // settings.CATALOG_SITEMAP_SHARD_SIZE)
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Product, _event, _product_changed)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_pending(session: Session, flush_context) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        refresh_shards(session.connection(), pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
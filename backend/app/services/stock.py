@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, insert, tuple_
 from app.models.stock_item import StockItem
 from app.models.stock_reservation import StockReservation
 from app.models.cart_item import CartItem
@@ -19,42 +19,70 @@ def available(db: Session, product_id: int, location_id: int) -> int:
         return 0
     return int(s.on_hand) - int(s.committed)
 
+def stock_items_by_key(db: Session, keys, for_update: bool = False) -> dict[tuple[int, int], StockItem]:
+    """StockItem por (product_id, location_id) en una sola consulta.
+
+    Con for_update bloquea las filas en orden de id (orden estable entre
+    transacciones concurrentes → sin deadlocks por orden de bloqueo).
+    """
+    keys = {(int(product_id), int(loc_id)) for product_id, loc_id in keys}
+    if not keys:
+        return {}
+    q = (
+        db.query(StockItem)
+        .filter(tuple_(StockItem.product_id, StockItem.location_id).in_(sorted(keys)))
+        .order_by(StockItem.id)
+    )
+    if for_update:
+        q = q.with_for_update()
+    out: dict[tuple[int, int], StockItem] = {}
+    for s in q.all():
+        # Igual que .first(): si hubiera duplicados gana el de menor id
+        out.setdefault((s.product_id, s.location_id), s)
+    return out
+
 def reserve_cart(db: Session, cart_id: int, location_id: int = DEFAULT_LOCATION_ID):
     cart = db.query(Cart).filter(Cart.id == cart_id).first()
     if not cart:
         raise ValueError("Cart not found")
     items = db.query(CartItem).filter(CartItem.cart_id == cart_id).all()
+    stock = stock_items_by_key(db, ((it.product_id, location_id) for it in items))
     shortages = []
     now = datetime.utcnow()
     for it in items:
-        avail = available(db, it.product_id, location_id)
+        s = stock.get((it.product_id, location_id))
+        avail = int(s.on_hand) - int(s.committed) if s else 0
         if avail < it.qty:
             shortages.append({"product_id": it.product_id, "missing": it.qty - avail})
             continue
     if shortages:
         return {"ok": False, "shortages": shortages}
 
-    # Reservar
-    for it in items:
-        expires = now + timedelta(minutes=DEFAULT_TTL_MINUTES)
-        res = StockReservation(
-            cart_id=cart_id,
-            product_id=it.product_id,
-            location_id=location_id,
-            qty=it.qty,
-            expires_at=expires,
-            status="active",
+    # Reservar: un solo INSERT multi-fila (el ORM emitiría uno por línea para recuperar PKs)
+    expires = now + timedelta(minutes=DEFAULT_TTL_MINUTES)
+    if items:
+        db.execute(
+            insert(StockReservation),
+            [
+                {
+                    "cart_id": cart_id,
+                    "product_id": it.product_id,
+                    "location_id": location_id,
+                    "qty": it.qty,
+                    "expires_at": expires,
+                    "status": "active",
+                    "created_at": now,
+                }
+                for it in items
+            ],
         )
-        db.add(res)
+    for it in items:
         # incrementar committed
-        s = (
-            db.query(StockItem)
-            .filter(and_(StockItem.product_id == it.product_id, StockItem.location_id == location_id))
-            .first()
-        )
+        s = stock.get((it.product_id, location_id))
         if not s:
             s = StockItem(product_id=it.product_id, location_id=location_id, on_hand=0, committed=0)
             db.add(s)
+            stock[(it.product_id, location_id)] = s
         s.committed = int(s.committed) + it.qty
     cart.status = "locked"
     db.commit()
@@ -67,13 +95,10 @@ def release_cart(db: Session, cart_id: int, location_id: int = DEFAULT_LOCATION_
         .filter(and_(StockReservation.cart_id == cart_id, StockReservation.status == "active"))
         .all()
     )
+    stock = stock_items_by_key(db, ((r.product_id, location_id) for r in ress))
     for r in ress:
         r.status = "released"
-        s = (
-            db.query(StockItem)
-            .filter(and_(StockItem.product_id == r.product_id, StockItem.location_id == location_id))
-            .first()
-        )
+        s = stock.get((r.product_id, location_id))
         if s and int(s.committed) >= r.qty:
             s.committed = int(s.committed) - r.qty
     cart = db.query(Cart).filter(Cart.id == cart_id).first()
@@ -20,6 +20,10 @@ import app.models.shipment
 import app.models.order_seq
 import app.models.daily_sales
 import app.models.daily_category_sales
+import app.models.category_closure
+import app.models.product_listing
+import app.models.price_list
+import app.models.sitemap_shard
 
 config = context.config
 if config.config_file_name is not None:
@@ -0,0 +1,43 @@
+"""v0.10 category_closure (árbol de categorías materializado)
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c9d0e1f2a3b4"
+down_revision = "b8c9d0e1f2a3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    closure = op.create_table(
+        "category_closure",
+        sa.Column("ancestor_id", sa.Integer(), sa.ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("descendant_id", sa.Integer(), sa.ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("depth", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+    op.create_index("ix_category_closure_descendant", "category_closure", ["descendant_id", "depth"])
+
+    # Backfill desde parent_id
+    parents = dict(op.get_bind().execute(sa.text("SELECT id, parent_id FROM categories")).all())
+    rows = []
+    for node in parents:
+        ancestor, depth, seen = node, 0, set()
+        while ancestor is not None and ancestor not in seen:
+            seen.add(ancestor)
+            rows.append({"ancestor_id": ancestor, "descendant_id": node, "depth": depth})
+            ancestor, depth = parents.get(ancestor), depth + 1
+    if rows:
+        op.bulk_insert(closure, rows)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_category_closure_descendant", table_name="category_closure")
+    op.drop_table("category_closure")
@@ -0,0 +1,90 @@
+"""v0.11 product_listing (proyección de lectura del listado)
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d0e1f2a3b4c5"
+down_revision = "c9d0e1f2a3b4"
+branch_labels = None
+depends_on = None
+
+DEFAULT_LOCATION_ID = 1
+
+
+def upgrade() -> None:
+    op.create_table(
+        "product_listing",
+        sa.Column("id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("slug", sa.String(220), nullable=False),
+        sa.Column("sku", sa.String(80), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.text("1")),
+        sa.Column("category_id", sa.Integer()),
+        sa.Column("category_path", sa.String(500)),
+        sa.Column("currency", sa.String(3)),
+        sa.Column("retail_amount", sa.Numeric(12, 2)),
+        sa.Column("wholesale_amount", sa.Numeric(12, 2)),
+        sa.Column("wholesale_min_qty", sa.Integer()),
+        sa.Column("available", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_product_listing_name", "product_listing", ["name"])
+    op.create_index("ix_product_listing_category_name", "product_listing", ["category_id", "name"])
+    op.create_index("ix_product_listing_created_at", "product_listing", ["created_at"])
+
+    # Backfill set-based (después la mantienen los eventos de la app)
+    bind = op.get_bind()
+    bind.execute(
+        sa.text(
+            """
+            INSERT INTO product_listing
+                (id, name, slug, sku, description, is_active, category_id, currency,
+                 retail_amount, wholesale_amount, wholesale_min_qty, available, created_at, refreshed_at)
+            SELECT p.id, p.name, p.slug, p.sku, p.description, p.is_active, p.category_id, pr.currency,
+                   pr.retail_amount, pr.wholesale_amount, pr.wholesale_min_qty,
+                   CASE WHEN COALESCE(s.available, 0) > 0 THEN s.available ELSE 0 END,
+                   p.created_at, CURRENT_TIMESTAMP
+            FROM products p
+            LEFT JOIN (
+                SELECT product_id,
+                       MAX(CASE WHEN tier = 'retail' THEN amount END) AS retail_amount,
+                       MAX(CASE WHEN tier = 'wholesale' THEN amount END) AS wholesale_amount,
+                       MAX(CASE WHEN tier = 'wholesale' THEN minimum_qty END) AS wholesale_min_qty,
+                       MAX(currency) AS currency
+                FROM product_prices GROUP BY product_id
+            ) pr ON pr.product_id = p.id
+            LEFT JOIN (
+                SELECT product_id, SUM(on_hand - committed) AS available
+                FROM stock_items WHERE location_id = :loc GROUP BY product_id
+            ) s ON s.product_id = p.id
+            """
+        ),
+        {"loc": DEFAULT_LOCATION_ID},
+    )
+    rows = bind.execute(
+        sa.text(
+            "SELECT cc.descendant_id, c.name FROM category_closure cc "
+            "JOIN categories c ON c.id = cc.ancestor_id ORDER BY cc.descendant_id, cc.depth DESC"
+        )
+    ).all()
+    paths: dict[int, list[str]] = {}
+    for cat_id, name in rows:
+        paths.setdefault(cat_id, []).append(name)
+    for cat_id, names in paths.items():
+        bind.execute(
+            sa.text("UPDATE product_listing SET category_path = :path WHERE category_id = :cat"),
+            {"path": " / ".join(names), "cat": cat_id},
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("product_listing")
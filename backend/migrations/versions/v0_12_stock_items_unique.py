@@ -0,0 +1,36 @@
+"""v0.12 stock_items único por (product_id, location_id) (upsert de la importación masiva)
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e1f2a3b4c5d6"
+down_revision = "d0e1f2a3b4c5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Duplicados previos: la app ya leía sólo el de menor id (stock_items_by_key)
+    bind = op.get_bind()
+    if bind.dialect.name == "mysql":
+        bind.execute(sa.text(
+            "DELETE s FROM stock_items s JOIN stock_items k "
+            "ON k.product_id = s.product_id AND k.location_id = s.location_id AND k.id < s.id"
+        ))
+    else:
+        bind.execute(sa.text(
+            "DELETE FROM stock_items WHERE id NOT IN "
+            "(SELECT MIN(id) FROM stock_items GROUP BY product_id, location_id)"
+        ))
+    op.create_unique_constraint("uq_stock_product_location", "stock_items", ["product_id", "location_id"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_stock_product_location", "stock_items", type_="unique")
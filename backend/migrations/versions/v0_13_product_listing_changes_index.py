@@ -0,0 +1,24 @@
+"""v0.13 índice de product_listing.refreshed_at (feed de cambios /catalog/changes)
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "f2a3b4c5d6e7"
+down_revision = "e1f2a3b4c5d6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # InnoDB agrega el PK: sirve al keyset (refreshed_at, id)
+    op.create_index("ix_product_listing_refreshed_at", "product_listing", ["refreshed_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_product_listing_refreshed_at", table_name="product_listing")
@@ -0,0 +1,61 @@
+"""v0.14 listas de precios versionadas (price_list_versions/items, pricing_state) y cart_items.pricing_version
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a3b4c5d6e7f8"
+down_revision = "f2a3b4c5d6e7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_list_versions",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("label", sa.String(80), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("draft", "published", name="price_list_status_enum"),
+            nullable=False,
+            server_default="draft",
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("published_at", sa.DateTime()),
+    )
+    op.create_table(
+        "price_list_items",
+        sa.Column(
+            "version_id", sa.Integer(), sa.ForeignKey("price_list_versions.id", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("tier", sa.String(32), primary_key=True),
+        sa.Column("currency", sa.String(3), nullable=False, server_default="ARS"),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("minimum_qty", sa.Integer()),
+    )
+    op.create_table(
+        "pricing_state",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("active_version_id", sa.Integer(), sa.ForeignKey("price_list_versions.id")),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    # Fila única: sin versión vigente (precios vivos)
+    op.get_bind().execute(
+        sa.text("INSERT INTO pricing_state (id, active_version_id, updated_at) VALUES (1, NULL, CURRENT_TIMESTAMP)")
+    )
+    op.add_column("cart_items", sa.Column("pricing_version", sa.String(40), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("cart_items", "pricing_version")
+    op.drop_table("pricing_state")
+    op.drop_table("price_list_items")
+    op.drop_table("price_list_versions")
@@ -0,0 +1,38 @@
+"""v0.15 cart_items.tier como String(32): N tiers por cantidad (como product_prices/order_items)
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b4c5d6e7f8a9"
+down_revision = "a3b4c5d6e7f8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "cart_items",
+        "tier",
+        existing_type=sa.Enum("retail", "wholesale", name="price_tier_enum"),
+        type_=sa.String(32),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    # Los quiebres adicionales no entran en el enum: se cotizaron al menos como wholesale
+    op.get_bind().execute(sa.text("UPDATE cart_items SET tier = 'wholesale' WHERE tier NOT IN ('retail', 'wholesale')"))
+    op.alter_column(
+        "cart_items",
+        "tier",
+        existing_type=sa.String(32),
+        type_=sa.Enum("retail", "wholesale", name="price_tier_enum"),
+        existing_nullable=False,
+    )
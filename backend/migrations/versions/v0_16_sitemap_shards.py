@@ -0,0 +1,45 @@
+"""v0.16 sitemap_shards (huellas de los shards de productos del sitemap)
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c5d6e7f8a9b0"
+down_revision = "b4c5d6e7f8a9"
+branch_labels = None
+depends_on = None
+
+# settings.CATALOG_SITEMAP_SHARD_SIZE por defecto (otro valor: python -m app.rebuild_sitemap)
+SHARD_SIZE = 45000
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sitemap_shards",
+        sa.Column("shard", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("products", sa.Integer(), nullable=False),
+        sa.Column("last_modified", sa.DateTime()),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+    )
+
+    # Backfill set-based (después la mantienen los eventos de la app)
+    products = sa.table("products", sa.column("id", sa.Integer()), sa.column("is_active", sa.Boolean()),
+                        sa.column("updated_at", sa.DateTime()))
+    shard = (products.c.id // SHARD_SIZE).label("shard")
+    src = (
+        sa.select(shard, sa.func.count(), sa.func.max(products.c.updated_at), sa.func.current_timestamp())
+        .where(products.c.is_active.is_(True))
+        .group_by(shard)
+    )
+    shards = sa.table("sitemap_shards", *(sa.column(c) for c in ("shard", "products", "last_modified", "refreshed_at")))
+    op.get_bind().execute(shards.insert().from_select(["shard", "products", "last_modified", "refreshed_at"], src))
+
+
+def downgrade() -> None:
+    op.drop_table("sitemap_shards")
@@ -0,0 +1,28 @@
+"""v0.8 users.token_version (revocación de JWT)
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6e7d8c9b0a1, 9a1b2c3d4e5f
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7b8c9d0e1f2"
+# Une las dos ramas existentes (checkout/pagos y snapshots v0.7)
+down_revision = ("f6e7d8c9b0a1", "9a1b2c3d4e5f")
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
@@ -0,0 +1,25 @@
+"""v0.9 índices de products para paginación por cursor
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b8c9d0e1f2a3"
+down_revision = "a7b8c9d0e1f2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_products_created_at", "products", ["created_at"])
+    op.create_index("ix_products_category_name", "products", ["category_id", "name"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_category_name", table_name="products")
+    op.drop_index("ix_products_created_at", table_name="products")
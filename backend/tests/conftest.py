@@ -0,0 +1,28 @@
+import re
+
+import pytest
+
+_DB_TIMING = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+@pytest.fixture
+def query_budget():
+    """Presupuesto de SQL para código in-process: `with query_budget(5): ...`."""
+    from app.db.query_stats import query_budget as budget
+
+    return budget
+
+
+@pytest.fixture
+def response_query_budget():
+    """Presupuesto de SQL de un endpoint vía su header Server-Timing (tests HTTP)."""
+
+    def check(response, max_queries: int) -> int:
+        m = _DB_TIMING.search(response.headers.get("server-timing", ""))
+        if m is None:
+            pytest.skip("Server-Timing deshabilitado (SERVER_TIMING_ENABLED)")
+        used = int(m.group(1))
+        assert used <= max_queries, f"{response.request.method} {response.request.url.path}: {used} queries (budget {max_queries})"
+        return used
+
+    return check
@@ -1,3 +1,5 @@
+import json
+
 import httpx
 
 # Dentro de red docker; si corrés fuera: http://localhost:8000
@@ -27,6 +29,15 @@ def test_list_products_pagination():
         assert {"id", "name", "slug", "sku", "category_id"}.issubset(p.keys())
 
 
+def test_catalog_etag_not_modified():
+    r = httpx.get(f"{BASE}/api/v1/catalog/products", params={"size": 3})
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+    r2 = httpx.get(f"{BASE}/api/v1/catalog/products", params={"size": 3}, headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.headers["ETag"] == etag
+
+
 def test_product_detail_by_slug_includes_prices():
     # Usamos un slug del seed
     slug = "panel-solar-550w"
@@ -59,4 +70,42 @@ def test_product_prices_by_id():
     assert isinstance(prices, list)
     tiers = {p["tier"] for p in prices}
     assert "retail" in tiers
-    assert "wholesale" in tiers
\ No newline at end of file
+    assert "wholesale" in tiers
+
+def test_facets_counts_match_listing():
+    r = httpx.get(f"{BASE}/api/v1/catalog/facets")
+    assert r.status_code == 200
+    facets = r.json()
+    assert facets["total"] >= 1
+    assert sum(b["count"] for b in facets["price"]["buckets"]) + facets["price"]["unpriced"] == facets["total"]
+    cat = next(c for c in facets["categories"] if c["count"] > 0)
+    lst = httpx.get(f"{BASE}/api/v1/catalog/products", params={"category_id": cat["id"], "size": 100}).json()
+    assert len(lst) == cat["count"]
+
+
+def test_import_requires_admin_and_streams_progress():
+    csv_text = "sku,name,retail,on_hand\nIT-IMPORT-1,Producto importado,1234.50,7\nIT-IMPORT-2,,1,1\n"
+    files = {"file": ("lista.csv", csv_text, "text/csv")}
+    r = httpx.post(f"{BASE}/api/v1/catalog/import", files=files)
+    assert r.status_code in (401, 403)
+
+    login = httpx.post(f"{BASE}/api/v1/auth/login", json={"email": "admin@example.com", "password": "admin123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    r = httpx.post(f"{BASE}/api/v1/catalog/import", files=files, headers=headers, timeout=30)
+    assert r.status_code == 200
+    *batches, total = [json.loads(line) for line in r.text.splitlines()]
+    assert (total["imported"], total["errors"]) == (1, 1)
+    assert batches[0]["errors"][0]["line"] == 3
+
+
+def test_changes_feed_pages_with_cursor():
+    r = httpx.get(f"{BASE}/api/v1/catalog/changes", params={"limit": 2})
+    assert r.status_code == 200
+    page = r.json()
+    assert len(page["changes"]) <= 2
+    if page["next_cursor"]:
+        r = httpx.get(f"{BASE}/api/v1/catalog/changes", params={"since": page["next_cursor"], "limit": 2})
+        assert r.status_code == 200
+        seen = {c["id"] for c in page["changes"]}
+        assert not seen & {c["id"] for c in r.json()["changes"]}
+    assert httpx.get(f"{BASE}/api/v1/catalog/changes", params={"since": "nope"}).status_code == 400
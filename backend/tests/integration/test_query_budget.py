@@ -0,0 +1,38 @@
+import httpx
+
+BASE = "http://backend:8000"
+
+
+def test_catalog_query_budgets(response_query_budget):
+    r = httpx.get(f"{BASE}/api/v1/catalog/products", params={"size": 20})
+    assert r.status_code == 200
+    response_query_budget(r, 2)
+    products = r.json()
+    if products:
+        r = httpx.get(f"{BASE}/api/v1/catalog/products/{products[0]['slug']}")
+        assert r.status_code == 200
+        response_query_budget(r, 3)
+    r = httpx.get(f"{BASE}/api/v1/catalog/categories", params={"tree": True})
+    response_query_budget(r, 1)
+    # Precios y stock embebidos: una consulta más por tipo, no por producto
+    r = httpx.get(f"{BASE}/api/v1/catalog/products", params={"size": 100, "embed": "prices,stock"})
+    assert r.status_code == 200
+    response_query_budget(r, 4)
+
+
+def test_cart_lock_budget_does_not_grow_with_items(response_query_budget):
+    products = httpx.get(f"{BASE}/api/v1/catalog/products", params={"size": 5}).json()
+    if len(products) < 2:
+        return
+    cookies = {"session_id": "query-budget-lock"}
+    with httpx.Client(cookies=cookies) as client:
+        client.post(f"{BASE}/api/v1/cart/unlock")
+        for p in products:
+            client.post(f"{BASE}/api/v1/cart/items", json={"product_id": p["id"], "qty": 1})
+        r = client.get(f"{BASE}/api/v1/cart")
+        response_query_budget(r, 8)
+        r = client.post(f"{BASE}/api/v1/cart/lock")
+        assert r.status_code in (200, 409)
+        # Sin N+1: stock de todos los ítems en una consulta
+        response_query_budget(r, 14)
+        client.post(f"{BASE}/api/v1/cart/unlock")
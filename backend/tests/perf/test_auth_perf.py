@@ -0,0 +1,123 @@
+"""Benchmarks de autenticación. Corren dentro del contenedor backend:
+
+    docker compose exec -T backend pytest -q -s tests/perf
+"""
+import threading
+import time
+
+import httpx
+
+from app.core.security import create_access_token
+
+BASE = "http://backend:8000"
+ROUNDS = 300
+
+
+def _login_admin() -> str:
+    r = httpx.post(f"{BASE}/api/v1/auth/login", json={"email": "admin@example.com", "password": "admin123"}, timeout=10.0)
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+def _rps(client: httpx.Client, path: str, token: str, rounds: int = ROUNDS) -> float:
+    headers = {"Authorization": f"Bearer {token}"}
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        r = client.get(f"{BASE}{path}", headers=headers)
+        assert r.status_code == 200, r.text
+    return rounds / (time.perf_counter() - t0)
+
+
+def test_stateless_token_vs_legacy_subject_token():
+    claims_token = _login_admin()
+    # Token legacy (sólo sub): obliga a resolver el usuario por email
+    legacy_token = create_access_token({"sub": "admin@example.com"})
+    with httpx.Client(timeout=10.0) as client:
+        _rps(client, "/api/v1/auth/me", claims_token, rounds=20)  # warm-up
+        legacy = _rps(client, "/api/v1/auth/me", legacy_token)
+        fast = _rps(client, "/api/v1/auth/me", claims_token)
+    print(f"\n/auth/me req/s legacy={legacy:.0f} claims={fast:.0f}")
+    assert fast > 0 and legacy > 0
+
+
+def test_jwt_decode_memo_hot_loop():
+    from jose import jwt
+
+    from app.core.security import decode_access_token
+    from app.core.settings import settings
+
+    token = create_access_token({"sub": "bench@example.com", "uid": 1, "role": "user", "ver": 0})
+    # Cada "request" de carrito resuelve get_current_user_optional y eventualmente get_current_user
+    requests, decodes_per_request = 2000, 2
+
+    t0 = time.perf_counter()
+    for _ in range(requests):
+        for _ in range(decodes_per_request):
+            jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    plain = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(requests):
+        memo: dict = {}
+        for _ in range(decodes_per_request):
+            if token not in memo:
+                memo[token] = decode_access_token(token)
+    cached = time.perf_counter() - t0
+
+    print(f"\njwt decode {requests} cart requests: plain={plain*1000:.1f}ms memo={cached*1000:.1f}ms")
+    assert cached < plain
+
+
+def _p99(samples: list[float]) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+def _catalog_latencies(client: httpx.Client, rounds: int = 200) -> list[float]:
+    out = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        r = client.get(f"{BASE}/api/v1/catalog/products", params={"size": 20})
+        out.append(time.perf_counter() - t0)
+        assert r.status_code == 200
+    return out
+
+
+def test_catalog_p99_during_login_storm():
+    stop = threading.Event()
+
+    def storm():
+        with httpx.Client(timeout=30.0) as c:
+            while not stop.is_set():
+                c.post(f"{BASE}/api/v1/auth/login", json={"email": "admin@example.com", "password": "admin123"})
+
+    with httpx.Client(timeout=10.0) as client:
+        baseline = _p99(_catalog_latencies(client))
+        threads = [threading.Thread(target=storm, daemon=True) for _ in range(16)]
+        for t in threads:
+            t.start()
+        try:
+            time.sleep(1.0)
+            during = _p99(_catalog_latencies(client))
+        finally:
+            stop.set()
+            for t in threads:
+                t.join(timeout=30)
+        stats = client.get(f"{BASE}/api/v1/health/stats").json().get("password_pool")
+    print(f"\ncatalog p99 baseline={baseline*1000:.1f}ms during_login_storm={during*1000:.1f}ms pool={stats}")
+    # bcrypt corre fuera del threadpool: el catálogo no debería degradarse en órdenes de magnitud
+    assert during < max(baseline * 10, 0.5)
+
+
+def test_rate_limiter_memory_backend_throughput():
+    from app.core.rate_limit import MemoryBackend, SlidingWindowLimiter
+
+    limiter = SlidingWindowLimiter(MemoryBackend(), prefilter=False)
+    keys = [f"rl:bench:{i}" for i in range(1000)]
+    n = 100_000
+    t0 = time.perf_counter()
+    for i in range(n):
+        limiter.hit(keys[i % len(keys)], limit=50, window_sec=60)
+    elapsed = time.perf_counter() - t0
+    print(f"\nrate limiter (memory) {n / elapsed:.0f} checks/s stats={limiter.stats}")
+    assert limiter.stats["rejected"] > 0
@@ -0,0 +1,51 @@
+"""Throughput de endpoints de catálogo/carrito bajo concurrencia.
+
+Correr una vez con DB_ASYNC_ENABLED=false y otra con true para comparar:
+
+    docker compose exec -T backend pytest -q -s tests/perf/test_db_perf.py
+"""
+import threading
+import time
+
+import httpx
+
+BASE = "http://backend:8000"
+CONCURRENCY = 32
+PER_CLIENT = 25
+
+
+def _hammer(path: str, method: str = "GET", body: dict | None = None) -> tuple[float, int]:
+    errors = []
+
+    def worker(n: int) -> None:
+        cookies = {"session_id": f"perf-db-{n}"}
+        with httpx.Client(timeout=30.0, cookies=cookies) as client:
+            for _ in range(PER_CLIENT):
+                r = client.request(method, f"{BASE}{path}", json=body)
+                if r.status_code >= 500:
+                    errors.append(r.status_code)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(CONCURRENCY)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return CONCURRENCY * PER_CLIENT / (time.perf_counter() - t0), len(errors)
+
+
+def test_catalog_and_cart_throughput():
+    with httpx.Client(timeout=10.0) as client:
+        mode = client.get(f"{BASE}/api/v1/health/stats").json().get("db")
+        products = client.get(f"{BASE}/api/v1/catalog/products", params={"size": 1}).json()
+    catalog_rps, catalog_errors = _hammer("/api/v1/catalog/products?size=20")
+    cart_rps, cart_errors = _hammer("/api/v1/cart")
+    if products:
+        add_rps, add_errors = _hammer("/api/v1/cart/items", "POST", {"product_id": products[0]["id"], "qty": 1})
+    else:
+        add_rps, add_errors = 0.0, 0
+    print(
+        f"\ndb={mode} concurrency={CONCURRENCY} catalog={catalog_rps:.0f} req/s "
+        f"cart_get={cart_rps:.0f} req/s cart_add={add_rps:.0f} req/s"
+    )
+    assert catalog_errors == cart_errors == add_errors == 0
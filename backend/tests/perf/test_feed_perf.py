@@ -0,0 +1,29 @@
+"""Feed completo en streaming: tiempo al primer byte vs. total, por formato.
+
+    docker compose exec -T backend pytest -q -s tests/perf/test_feed_perf.py
+
+El primer bloque tiene que salir mucho antes que el último: si el feed se
+armara en memoria ambos tiempos serían casi iguales.
+"""
+import time
+
+import httpx
+
+BASE = "http://backend:8000"
+
+
+def test_feed_streams_before_finishing():
+    for fmt, gz in (("csv", False), ("xml", False), ("ndjson", True)):
+        with httpx.Client(base_url=f"{BASE}/api/v1/catalog", timeout=120.0) as client:
+            t0 = time.perf_counter()
+            first = None
+            size = 0
+            with client.stream("GET", "/feed", params={"format": fmt, "gzip": gz}) as r:
+                assert r.status_code == 200
+                for chunk in r.iter_raw():
+                    if first is None:
+                        first = time.perf_counter() - t0
+                    size += len(chunk)
+            total = time.perf_counter() - t0
+        print(f"\n{fmt}{'.gz' if gz else ''}: primer byte={first * 1000:.1f}ms total={total * 1000:.1f}ms {size}B")
+        assert first is not None and first <= total
@@ -0,0 +1,50 @@
+"""Página de 100 productos: listado + precios/stock embebidos vs. un request por tarjeta.
+
+    docker compose exec -T backend pytest -q -s tests/perf/test_listing_embed_perf.py
+
+El parámetro `_` cambia en cada vuelta para medir sin la caché de respuestas.
+"""
+import time
+
+import httpx
+
+BASE = "http://backend:8000"
+SIZE = 100
+ROUNDS = 10
+
+
+def _median(samples: list[float]) -> float:
+    return sorted(samples)[len(samples) // 2] * 1000
+
+
+def test_embedded_listing_vs_client_n_plus_one():
+    plain_t, embed_t, n1_t = [], [], []
+    plain_bytes = embed_bytes = n1_bytes = 0
+    with httpx.Client(base_url=f"{BASE}/api/v1/catalog", timeout=30.0) as client:
+        for i in range(ROUNDS):
+            t0 = time.perf_counter()
+            r = client.get("/products", params={"size": SIZE, "_": f"p{i}"})
+            plain_t.append(time.perf_counter() - t0)
+            plain_bytes = len(r.content)
+            products = r.json()
+
+            t0 = time.perf_counter()
+            r = client.get("/products", params={"size": SIZE, "embed": "prices,stock", "_": f"e{i}"})
+            embed_t.append(time.perf_counter() - t0)
+            embed_bytes = len(r.content)
+            assert r.status_code == 200 and all("prices" in p and "available" in p for p in r.json())
+
+            # Lo que hacía la tienda: listado + un /price por tarjeta
+            t0 = time.perf_counter()
+            n1_bytes = plain_bytes
+            for p in products:
+                n1_bytes += len(client.get(f"/products/{p['id']}/price", params={"_": f"n{i}"}).content)
+            n1_t.append(time.perf_counter() - t0 + plain_t[-1])
+
+    print(
+        f"\nproducts={len(products)} plain={_median(plain_t):.1f}ms/{plain_bytes}B "
+        f"embed={_median(embed_t):.1f}ms/{embed_bytes}B "
+        f"n+1={_median(n1_t):.1f}ms/{n1_bytes}B ({len(products) + 1} requests)"
+    )
+    if len(products) > 1:
+        assert _median(embed_t) < _median(n1_t)
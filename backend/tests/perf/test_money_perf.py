@@ -0,0 +1,58 @@
+"""Líneas y totales de un carrito de 1000 líneas: Decimal(str())/float vs. Money (centavos int).
+
+Reproduce el cálculo en memoria de cart.py/checkout.py (subtotal por línea
+con tope, suma del carrito y formato de salida), sin base de datos:
+
+    docker compose exec -T backend pytest -q -s tests/perf/test_money_perf.py
+"""
+import random
+import time
+from decimal import Decimal
+
+from app.common.money import Money, format_money
+from app.services.cart import _line_subtotal
+
+LINES = 1000
+ROUNDS = 50
+_LEGACY_MAX = Decimal("9999999999.99")
+
+
+def _legacy(lines: list[tuple[float, int]]) -> tuple[str, list[str]]:
+    # Implementación anterior: float del precio, Decimal(str()) por línea y al sumar
+    subtotals = []
+    for unit_price, qty in lines:
+        value = Decimal(str(unit_price)) * Decimal(qty)
+        if value > _LEGACY_MAX:
+            value = _LEGACY_MAX
+        subtotals.append(float(round(value, 2)))
+    total = sum(Decimal(str(s)) for s in subtotals)
+    return format_money(total), [format_money(Decimal(str(s))) for s in subtotals]
+
+
+def _money(lines: list[tuple[Money, int]]) -> tuple[str, list[str]]:
+    subtotals = [_line_subtotal(unit_price, qty) for unit_price, qty in lines]
+    total = Money(sum(s.cents for s in subtotals))
+    return format_money(total), [format_money(s) for s in subtotals]
+
+
+def _median_ms(fn) -> float:
+    samples = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return sorted(samples)[len(samples) // 2] * 1000
+
+
+def test_cart_totals_integer_cents_vs_decimal():
+    rnd = random.Random(7)
+    prices = [Decimal(rnd.randint(100, 5_000_000)).scaleb(-2) for _ in range(LINES)]
+    qtys = [rnd.randint(1, 50) for _ in range(LINES)]
+    legacy_lines = [(float(p), q) for p, q in zip(prices, qtys)]
+    money_lines = [(Money.of(p), q) for p, q in zip(prices, qtys)]
+    assert _money(money_lines) == _legacy(legacy_lines)
+
+    legacy_ms = _median_ms(lambda: _legacy(legacy_lines))
+    money_ms = _median_ms(lambda: _money(money_lines))
+    print(f"\nlines={LINES} decimal/float={legacy_ms:.2f}ms money={money_ms:.2f}ms x{legacy_ms / money_ms:.1f}")
+    assert money_ms < legacy_ms
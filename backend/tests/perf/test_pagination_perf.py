@@ -0,0 +1,69 @@
+"""Latencia de páginas profundas: OFFSET (`page`) vs. cursor (keyset).
+
+Corre en proceso contra SQLite con 100k productos (en MySQL la diferencia es
+mayor: OFFSET lee y descarta filas del índice):
+
+    docker compose exec -T backend pytest -q -s tests/perf/test_pagination_perf.py
+"""
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (todos los modelos registrados para create_all)
+from app.core.settings import settings
+from app.db.base import Base
+from app.models.product import Product
+from app.services import catalog as catalog_service
+from app.services import product_listing
+
+N_PRODUCTS = 100_000
+SIZE = 20
+DEPTHS = [1, 100, 1000, 4999]
+
+
+def _ms(fn, repeat: int = 5) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return sorted(samples)[len(samples) // 2] * 1000
+
+
+def test_deep_pages_offset_vs_cursor(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_SEARCH_BACKEND", "like")
+    engine = create_engine(f"sqlite:///{tmp_path / 'perf.db'}")
+    Base.metadata.create_all(engine)
+    t0 = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Product),
+            [
+                {"name": f"Producto {i % 997}", "slug": f"p{i}", "sku": f"SKU-{i}", "is_active": True,
+                 "created_at": t0 + timedelta(minutes=i // 3), "updated_at": t0}
+                for i in range(1, N_PRODUCTS + 1)
+            ],
+        )
+
+    lines = []
+    with Session(engine) as db:
+        # La carga masiva no pasa por el ORM: proyección del listado a mano
+        product_listing.rebuild(db, batch_size=5000)
+        for sort in ("id", "name", "newest"):
+            for depth in DEPTHS:
+                # Cursor de la página anterior: lo que tendría un cliente que viene paginando
+                cursor = None
+                if depth > 1:
+                    _, cursor = catalog_service.list_products_page(db, page=depth - 1, size=SIZE, sort=sort)
+                offset_ms = _ms(lambda: catalog_service.list_products_page(db, page=depth, size=SIZE, sort=sort))
+                cursor_ms = _ms(lambda: catalog_service.list_products_page(db, size=SIZE, cursor=cursor, sort=sort))
+                by_page, _ = catalog_service.list_products_page(db, page=depth, size=SIZE, sort=sort)
+                by_cursor, _ = catalog_service.list_products_page(db, size=SIZE, cursor=cursor, sort=sort)
+                assert [p.id for p in by_page] == [p.id for p in by_cursor]
+                lines.append(f"sort={sort:<6} page={depth:<5} offset={offset_ms:7.2f}ms cursor={cursor_ms:6.2f}ms")
+            # Página más profunda: el cursor no recorre las filas anteriores
+            assert cursor_ms < offset_ms
+    engine.dispose()
+    print("\n" + "\n".join(lines))
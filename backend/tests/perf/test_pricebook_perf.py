@@ -0,0 +1,78 @@
+"""Repricing de un carrito de 50 líneas: resolve_price por línea (hasta 3 consultas) vs. PriceBook.
+
+Corre en proceso contra SQLite:
+
+    docker compose exec -T backend pytest -q -s tests/perf/test_pricebook_perf.py
+"""
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+import app.main  # noqa: F401  (todos los modelos registrados para create_all)
+from app.common.money import Money
+from app.common.ttl_cache import TTLCache
+from app.core import catalog_cache
+from app.db.base import Base
+from app.db.query_stats import collect
+from app.models.product import Product
+from app.models.product_price import ProductPrice
+from app.services import price_lists, pricing
+
+LINES = 50
+ROUNDS = 20
+
+
+def _legacy_resolve(db: Session, product_id: int, qty: int, user_role: str | None = None):
+    # Implementación anterior: sonda wholesale + tier elegido + fallback retail
+    tier = "retail"
+    if user_role in {"seller", "admin"}:
+        tier = "wholesale"
+    else:
+        wholesale = db.query(ProductPrice).filter(ProductPrice.product_id == product_id, ProductPrice.tier == "wholesale").first()
+        if wholesale and wholesale.minimum_qty is not None and qty >= wholesale.minimum_qty:
+            tier = "wholesale"
+    price = db.query(ProductPrice).filter(ProductPrice.product_id == product_id, ProductPrice.tier == tier).first()
+    if not price:
+        price = db.query(ProductPrice).filter(ProductPrice.product_id == product_id, ProductPrice.tier == "retail").first()
+        tier = "retail"
+    return tier, Money.of(price.amount)
+
+
+def _run(fn) -> tuple[float, int]:
+    samples, queries = [], 0
+    for _ in range(ROUNDS):
+        pricing._cache.clear()  # sin caché: mide la consulta, no el hit
+        with collect() as stats:
+            t0 = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t0)
+        queries = stats.count
+    return sorted(samples)[len(samples) // 2] * 1000, queries
+
+
+def test_cart_repricing_one_query_vs_per_line(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_cache, "get_redis", lambda: None)
+    # Puntero a la lista vigente (NULL) leído una vez: se mide sólo la carga de precios
+    monkeypatch.setattr(price_lists, "_active", TTLCache(maxsize=1, ttl=600))
+    engine = create_engine(f"sqlite:///{tmp_path / 'perf.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Product), [{"id": i, "name": f"P{i}", "slug": f"p{i}", "sku": f"SKU-{i}"} for i in range(1, LINES + 1)])
+        prices = [{"product_id": i, "tier": "retail", "currency": "ARS", "amount": 100 + i} for i in range(1, LINES + 1)]
+        # La mitad sin wholesale: el per-línea paga además el fallback
+        prices += [{"product_id": i, "tier": "wholesale", "currency": "ARS", "amount": 90 + i, "minimum_qty": 5}
+                   for i in range(1, LINES + 1, 2)]
+        conn.execute(insert(ProductPrice), prices)
+    lines = [(i, 1 + i % 10) for i in range(1, LINES + 1)]
+    with Session(engine) as db:
+        legacy_ms, legacy_q = _run(lambda: [_legacy_resolve(db, p, q) for p, q in lines])
+        book_ms, book_q = _run(lambda: pricing.resolve_many(db, lines))
+        assert pricing.resolve_many(db, lines, "seller") == [_legacy_resolve(db, p, q, "seller") for p, q in lines]
+        assert pricing.resolve_many(db, lines) == [_legacy_resolve(db, p, q) for p, q in lines]
+    engine.dispose()
+
+    print(f"\nlines={LINES} per-line={legacy_ms:.1f}ms/{legacy_q} queries pricebook={book_ms:.1f}ms/{book_q} queries")
+    assert book_q == 1
+    assert legacy_q >= 2 * LINES
+    assert book_ms < legacy_ms
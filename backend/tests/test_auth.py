@@ -1,5 +1,7 @@
 import httpx
 
+from app.core.security import create_access_token
+
 # Dentro de red docker; si corrés fuera: http://localhost:8000
 BASE = "http://backend:8000"
 
@@ -27,4 +29,19 @@ def test_register_and_login():
         json={"email": email, "password": pwd},
     )
     assert r2.status_code == 200
-    assert "access_token" in r2.json()
\ No newline at end of file
+    assert "access_token" in r2.json()
+
+def test_revoke_invalidates_issued_tokens():
+    email = "trevoke@example.com"
+    pwd = "123456"
+    httpx.post(f"{BASE}/api/v1/auth/register", json={"email": email, "password": pwd})
+    token = httpx.post(f"{BASE}/api/v1/auth/login", json={"email": email, "password": pwd}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    # Token legacy (sólo sub, sin ver): cuenta como versión 0 y cae con la revocación
+    legacy = {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+    assert httpx.get(f"{BASE}/api/v1/auth/me", headers=headers).status_code == 200
+
+    r = httpx.post(f"{BASE}/api/v1/auth/revoke", headers=headers)
+    assert r.status_code == 204
+    assert httpx.get(f"{BASE}/api/v1/auth/me", headers=headers).status_code == 401
+    assert httpx.get(f"{BASE}/api/v1/auth/me", headers=legacy).status_code == 401
@@ -0,0 +1,26 @@
+import importlib
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.db.base import Base
+
+# Registrar todos los modelos (mismo set que app.main) para create_all y relaciones
+for _m in ("user", "cart", "cart_item", "category", "product", "product_price", "inventory_location",
+           "order", "order_item", "payment_intent", "shipment", "stock_item", "stock_reservation", "order_seq",
+           "category_closure", "product_listing", "price_list", "address", "sitemap_shard"):
+    importlib.import_module(f"app.models.{_m}")
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Fábrica de bases SQLite en archivo con el esquema creado; devuelve la URL sync."""
+
+    def make(name: str = "app") -> str:
+        url = f"sqlite:///{tmp_path / f'{name}.db'}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+        return url
+
+    return make
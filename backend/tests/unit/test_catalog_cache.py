@@ -0,0 +1,77 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core import catalog_cache
+from app.models.product import Product
+from app.models.stock_item import StockItem
+
+
+def _client(monkeypatch) -> tuple[TestClient, list[int]]:
+    monkeypatch.setattr(catalog_cache, "get_redis", lambda: None)
+    catalog_cache.bump()
+    calls = []
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items(request: Request):
+        async def compute():
+            calls.append(1)
+            return [{"id": 1, "name": "Agua"}], {"X-Next-Cursor": "abc"}
+
+        return await catalog_cache.cached_response(request, compute)
+
+    return TestClient(app), calls
+
+
+def test_hit_and_304_skip_compute(monkeypatch):
+    client, calls = _client(monkeypatch)
+    r = client.get("/items")
+    assert r.status_code == 200 and r.json() == [{"id": 1, "name": "Agua"}]
+    assert r.headers["X-Next-Cursor"] == "abc"
+    etag = r.headers["ETag"]
+    assert client.get("/items").headers["ETag"] == etag
+    r = client.get("/items", headers={"If-None-Match": etag})
+    assert r.status_code == 304 and r.content == b""
+    assert len(calls) == 1
+    # Otra query string, otra entrada
+    client.get("/items", params={"page": 2})
+    assert len(calls) == 2
+
+
+def test_commit_bumps_version(monkeypatch, sqlite_db):
+    client, calls = _client(monkeypatch)
+    client.get("/items")
+    engine = create_engine(sqlite_db("cache"))
+    with Session(engine) as db:
+        db.add(Product(name="Borrador", slug="borrador", sku="BR-1"))
+        db.flush()
+        db.rollback()
+        client.get("/items")
+        assert len(calls) == 1  # rollback no invalida
+
+        p = Product(name="Agua", slug="agua", sku="AG-1")
+        db.add(p)
+        db.commit()
+        client.get("/items")
+        assert len(calls) == 2
+
+        stock = StockItem(product_id=p.id, location_id=1, on_hand=5, committed=0)
+        db.add(stock)
+        db.commit()
+        client.get("/items")
+        assert len(calls) == 3
+
+        db.refresh(stock)
+        stock.committed = 1  # reserva: sigue disponible, no invalida
+        db.commit()
+        client.get("/items")
+        assert len(calls) == 3
+
+        db.refresh(stock)
+        stock.committed = 5  # se agota: invalida
+        db.commit()
+        client.get("/items")
+        assert len(calls) == 4
+    engine.dispose()
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core import catalog_cache
+from app.core.settings import settings
+from app.models.product import Product
+from app.models.product_price import ProductPrice
+from app.models.stock_item import StockItem
+from app.services import catalog as catalog_service
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_CHANGES_LAG_SECONDS", 0)
+    monkeypatch.setattr(catalog_cache, "get_redis", lambda: None)
+    engine = create_engine(sqlite_db("changes"))
+    with Session(engine) as db:
+        for i in range(1, 6):
+            p = Product(name=f"Producto {i}", slug=f"p{i}", sku=f"SKU-{i}")
+            db.add(p)
+            db.flush()
+            db.add_all([
+                ProductPrice(product_id=p.id, tier="retail", currency="ARS", amount=100 * i),
+                StockItem(product_id=p.id, location_id=1, on_hand=10, committed=0),
+            ])
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def _sync(db, since=None, limit=2) -> tuple[list, str | None]:
+    changes = []
+    while True:
+        page = catalog_service.list_changes(db, since, limit)
+        changes += page.changes
+        since = page.next_cursor
+        if not page.has_more:
+            return changes, since
+
+
+def test_initial_sync_then_only_churn(db):
+    changes, cursor = _sync(db)
+    assert sorted(c.id for c in changes) == [1, 2, 3, 4, 5]
+    first = next(c for c in changes if c.id == 1)
+    assert (first.deleted, first.product.available, first.product.prices[0].amount) == (False, 10, 100.0)
+    # Sin cambios: nada nuevo y el cursor se mantiene
+    assert _sync(db, cursor) == ([], cursor)
+
+    db.query(ProductPrice).filter_by(product_id=2).one().amount = 250
+    db.query(StockItem).filter_by(product_id=4).one().committed = 3
+    db.query(Product).filter_by(id=5).one().is_active = False
+    db.commit()
+    changes, cursor = _sync(db, cursor)
+    by_id = {c.id: c for c in changes}
+    assert sorted(by_id) == [2, 4, 5]
+    assert by_id[2].product.prices[0].amount == 250.0
+    assert by_id[4].product.available == 7
+    # Desactivado: tombstone sin datos
+    assert (by_id[5].deleted, by_id[5].product, by_id[5].sku) == (True, None, "SKU-5")
+    assert _sync(db, cursor)[0] == []
+
+
+def test_recent_rows_wait_for_the_lag_window(db, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_CHANGES_LAG_SECONDS", 3600)
+    page = catalog_service.list_changes(db)
+    assert (page.changes, page.next_cursor, page.has_more) == ([], None, False)
+
+
+def test_cursors_are_not_interchangeable(db):
+    _, list_cursor = catalog_service.list_products_page(db, size=2, sort="id")
+    with pytest.raises(catalog_service.InvalidCursor):
+        catalog_service.list_changes(db, list_cursor)
+    changes_cursor = catalog_service.list_changes(db, limit=2).next_cursor
+    with pytest.raises(catalog_service.InvalidCursor):
+        catalog_service.list_products_page(db, cursor=changes_cursor)
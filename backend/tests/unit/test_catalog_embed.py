@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.models.inventory_location import InventoryLocation
+from app.models.product import Product
+from app.models.product_price import ProductPrice
+from app.models.stock_item import StockItem
+from app.services import catalog as catalog_service
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_SEARCH_BACKEND", "like")
+    engine = create_engine(sqlite_db("embed"))
+    with Session(engine) as db:
+        db.add_all([InventoryLocation(id=1, code="MAIN", name="Central"), InventoryLocation(id=2, code="B", name="B")])
+        for i in range(1, 4):
+            db.add(Product(id=i, name=f"P{i}", slug=f"p{i}", sku=f"SKU-{i}"))
+        db.flush()
+        db.add_all([
+            ProductPrice(product_id=1, tier="retail", currency="ARS", amount=100),
+            ProductPrice(product_id=1, tier="wholesale", currency="ARS", amount=90, minimum_qty=5),
+            ProductPrice(product_id=2, tier="retail", currency="ARS", amount=50),
+            StockItem(product_id=1, location_id=1, on_hand=10, committed=3),
+            StockItem(product_id=1, location_id=2, on_hand=99, committed=0),  # otra sucursal: no cuenta
+            StockItem(product_id=2, location_id=1, on_hand=1, committed=4),
+        ])
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def test_embed_prices_and_stock(db, query_budget):
+    with query_budget(3):
+        items, _ = catalog_service.list_products_page(db, size=10, embed=frozenset({"prices", "stock"}))
+    by_id = {p.id: p for p in items}
+    assert [(pr.tier, pr.amount) for pr in by_id[1].prices] == [("retail", 100.0), ("wholesale", 90.0)]
+    assert by_id[3].prices == []
+    assert (by_id[1].available, by_id[2].available, by_id[3].available) == (7, 0, 0)
+
+
+def test_embed_is_optional(db):
+    plain, _ = catalog_service.list_products_page(db, size=10)
+    assert "prices" not in plain[0].model_dump()
+    only_prices, _ = catalog_service.list_products_page(db, size=10, embed=frozenset({"prices"}))
+    assert only_prices[0].available is None and only_prices[0].prices
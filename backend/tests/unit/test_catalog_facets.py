@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core import catalog_cache
+from app.core.settings import settings
+from app.models.category import Category
+from app.models.product import Product
+from app.models.product_price import ProductPrice
+from app.services import catalog as catalog_service
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_SEARCH_BACKEND", "like")
+    monkeypatch.setattr(settings, "CATALOG_PRICE_BUCKETS", [0, 100, 500])
+    monkeypatch.setattr(catalog_cache, "get_redis", lambda: None)
+    engine = create_engine(sqlite_db("facets"))
+    with Session(engine) as db:
+        energia = Category(name="Energía", slug="energia")
+        baterias = Category(name="Baterías", slug="baterias", parent=energia)
+        inversores = Category(name="Inversores", slug="inversores", parent=energia)
+        db.add_all([energia, baterias, inversores])
+        db.flush()
+        catalog = [
+            ("Batería litio 100Ah", baterias, 80),
+            ("Batería litio 200Ah", baterias, 450),
+            ("Batería plomo", baterias, None),
+            ("Inversor 5kW", inversores, 900),
+        ]
+        for i, (name, cat, amount) in enumerate(catalog):
+            p = Product(name=name, slug=f"p{i}", sku=f"SKU-{i}", category_id=cat.id)
+            db.add(p)
+            db.flush()
+            if amount is not None:
+                db.add(ProductPrice(product_id=p.id, tier="retail", currency="ARS", amount=amount))
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+@pytest.mark.parametrize("listing_reads", [True, False])
+def test_facets_single_pass(db, query_budget, monkeypatch, listing_reads):
+    monkeypatch.setattr(settings, "CATALOG_LISTING_READS", listing_reads)
+    catalog_service.list_categories(db)  # árbol ya cacheado, como en producción
+    with query_budget(1):
+        facets = catalog_service.product_facets(db)
+    assert facets.total == 4
+    counts = {c.slug: (c.count, c.count_with_descendants) for c in facets.categories}
+    assert counts == {"energia": (0, 4), "baterias": (3, 3), "inversores": (1, 1)}
+    assert [(b.min, b.max, b.count) for b in facets.price.buckets] == [(0, 100, 1), (100, 500, 1), (500, None, 1)]
+    assert (facets.price.min, facets.price.max, facets.price.unpriced) == (80.0, 900.0, 1)
+
+
+def test_facets_follow_filters(db):
+    facets = catalog_service.product_facets(db, search="litio")
+    assert facets.total == 2
+    assert {c.slug: c.count for c in facets.categories} == {"energia": 0, "baterias": 2}
+    energia = next(c["id"] for c in catalog_service.list_categories(db) if c["slug"] == "energia")
+    assert catalog_service.product_facets(db, category_id=energia).total == 0
+    assert catalog_service.product_facets(db, category_id=energia, include_descendants=True).total == 4
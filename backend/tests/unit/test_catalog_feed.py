@@ -0,0 +1,73 @@
+import csv
+import gzip
+import io
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.models.category import Category
+from app.models.product import Product
+from app.models.product_price import ProductPrice
+from app.models.stock_item import StockItem
+from app.services import catalog_feed
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    monkeypatch.setattr(settings, "BASE_URL", "https://tienda.test")
+    engine = create_engine(sqlite_db("feed"))
+    with Session(engine) as db:
+        cat = Category(name="Baterías", slug="baterias")
+        db.add(cat)
+        db.flush()
+        catalog = [
+            ("Batería <100Ah> & BMS", "BAT-100", 250000, 4, True),
+            ("Batería 200Ah", "BAT-200", 450000, 0, True),
+            ("Sin precio", "NP-1", None, 1, True),
+            ("Discontinuada", "OLD-1", 1000, 9, False),
+        ]
+        for name, sku, amount, on_hand, active in catalog:
+            p = Product(name=name, slug=sku.lower(), sku=sku, category_id=cat.id, is_active=active)
+            db.add(p)
+            db.flush()
+            if amount is not None:
+                db.add(ProductPrice(product_id=p.id, tier="retail", currency="ARS", amount=amount))
+            db.add(StockItem(product_id=p.id, location_id=1, on_hand=on_hand, committed=0))
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def _text(db, fmt: str, **kwargs) -> str:
+    return b"".join(catalog_feed.export(db, fmt, **kwargs)).decode()
+
+
+def test_csv_feed_only_active_priced_products(db):
+    rows = list(csv.DictReader(io.StringIO(_text(db, "csv"))))
+    assert [r["id"] for r in rows] == ["BAT-100", "BAT-200"]
+    assert rows[0]["price"] == "250000.00 ARS"
+    assert (rows[0]["availability"], rows[1]["availability"]) == ("in_stock", "out_of_stock")
+    assert rows[0]["link"] == "https://tienda.test/products/bat-100"
+    assert rows[0]["product_type"] == "Baterías"
+
+
+def test_xml_and_ndjson_feeds_agree(db):
+    ns = {"g": "http://base.google.com/ns/1.0"}
+    items = ET.fromstring(_text(db, "xml")).findall("./channel/item")
+    # Nombre con <, > y & escapado correctamente
+    assert [i.find("g:title", ns).text for i in items] == ["Batería <100Ah> & BMS", "Batería 200Ah"]
+    lines = [json.loads(line) for line in _text(db, "ndjson").splitlines()]
+    assert [i.find("g:id", ns).text for i in items] == [line["id"] for line in lines]
+
+
+def test_gzip_streams_in_chunks(db):
+    plain = _text(db, "ndjson")
+    assert gzip.decompress(b"".join(catalog_feed.export(db, "ndjson", gzip=True))).decode() == plain
+    # Bloques chicos: sale de a partes, no todo junto al final
+    chunks = list(catalog_feed.render(catalog_feed.iter_items(db), "csv", chunk_size=10))
+    assert len(chunks) == 3
+    assert b"".join(chunks).decode() == _text(db, "csv")
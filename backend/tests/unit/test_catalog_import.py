@@ -0,0 +1,96 @@
+import io
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core import catalog_cache
+from app.db.query_stats import collect
+from app.models.category import Category
+from app.models.product import Product
+from app.models.product_listing import ProductListing
+from app.models.product_price import ProductPrice
+from app.models.stock_item import StockItem
+from app.services import catalog_import
+
+CSV = """sku,name,category,retail,wholesale,wholesale_min_qty,on_hand
+PS-550,Panel Solar 550W,paneles,100000,90000,5,10
+BAT-100,Batería LiFePO4 100Ah,baterias,250000.50,,,3
+,Sin sku,paneles,1,,,
+INV-5K,Inversor 5kW,inexistente,1,,,
+CAB-4,Cable 4mm,,abc,,,
+"""
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    monkeypatch.setattr(catalog_cache, "get_redis", lambda: None)
+    engine = create_engine(sqlite_db("import"))
+    with Session(engine) as db:
+        db.add_all([Category(name="Paneles", slug="paneles"), Category(name="Baterías", slug="baterias")])
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def _run(db, text: str, fmt: str = "csv", batch_size: int = 1000) -> list[dict]:
+    return list(catalog_import.import_stream(db, io.StringIO(text, newline=""), fmt, batch_size))
+
+
+def test_csv_import_upserts_products_prices_and_stock(db):
+    *batches, total = _run(db, CSV)
+    assert (total["rows"], total["imported"], total["errors"], total["batches"]) == (5, 2, 3, 1)
+    assert [(e["line"], e["sku"]) for e in batches[0]["errors"]] == [(4, None), (5, "INV-5K"), (6, "CAB-4")]
+
+    panel = db.query(Product).filter_by(sku="PS-550").one()
+    assert (panel.slug, panel.category.slug) == ("panel-solar-550w", "paneles")
+    prices = {p.tier: (float(p.amount), p.minimum_qty) for p in db.query(ProductPrice).filter_by(product_id=panel.id)}
+    assert prices == {"retail": (100000.0, None), "wholesale": (90000.0, 5)}
+    assert db.query(Product).filter_by(sku="BAT-100").one().slug == "bateria-lifepo4-100ah"
+    # La proyección del listado se mantiene aunque el upsert no pase por el ORM
+    listing = db.get(ProductListing, panel.id)
+    assert (listing.category_path, listing.available) == ("Paneles", 10)
+
+
+def test_reimport_updates_in_place_and_keeps_committed(db):
+    _run(db, CSV)
+    stock = db.query(StockItem).join(Product).filter(Product.sku == "PS-550").one()
+    stock.committed = 4
+    db.commit()
+    ver = catalog_cache.current_version()
+
+    _run(db, "sku,name,slug,retail,on_hand\nPS-550,Panel 550W Tier1,,95000,20\n")
+    db.expire_all()
+    panel = db.query(Product).filter_by(sku="PS-550").one()
+    # Sin slug explícito conserva el existente (URLs estables)
+    assert (panel.name, panel.slug, panel.category_id) == ("Panel 550W Tier1", "panel-solar-550w", None)
+    assert db.query(Product).count() == 2
+    assert (stock.on_hand, stock.committed) == (20, 4)
+    assert db.get(ProductListing, panel.id).available == 16
+    assert catalog_cache.current_version() != ver
+
+
+def test_slug_owned_by_other_sku_is_a_row_error(db):
+    _run(db, CSV)
+    rows = [
+        {"sku": "PS-551", "name": "Otro", "slug": "panel-solar-550w"},
+        {"sku": "PS-552", "name": "Nuevo", "slug": "nuevo"},
+        {"sku": "PS-553", "name": "Nuevo bis", "slug": "nuevo"},
+        "{no es json",
+    ]
+    text = "\n".join(r if isinstance(r, str) else json.dumps(r) for r in rows)
+    *_, total = _run(db, text, fmt="ndjson")
+    assert (total["imported"], total["errors"]) == (1, 3)
+    assert db.query(Product).filter_by(sku="PS-550").one().name == "Panel Solar 550W"
+
+
+def test_statements_per_batch_do_not_grow_with_rows(db):
+    lines = ["sku,name,category,retail,wholesale,on_hand"]
+    lines += [f"SKU-{i},Producto {i},paneles,{100 + i},{90 + i},{i}" for i in range(200)]
+    with collect() as stats:
+        *batches, total = _run(db, "\n".join(lines), batch_size=100)
+    assert (total["imported"], len(batches)) == (200, 2)
+    # Lectura de categorías + por lote: slugs, productos, ids, precios, stock, proyección
+    assert stats.count <= 1 + 2 * 12
+    assert db.query(ProductPrice).count() == 400
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.models.product import Product
+from app.services import catalog as catalog_service
+from app.services import search_index
+from app.services.search_index import SearchIndex
+
+NAMES = ["Yerba", "Agua", "Mate", "Agua", "Bombilla", "Termo", "Agua"]
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    engine = create_engine(sqlite_db("catalog"))
+    t0 = datetime(2026, 1, 1)
+    with Session(engine) as db:
+        for i, name in enumerate(NAMES, start=1):
+            # created_at repetido: el desempate por id tiene que ser estable
+            db.add(Product(name=name, slug=f"p{i}", sku=f"SKU-{i}", description="agua" if i % 2 else None,
+                           created_at=t0 + timedelta(days=i // 2)))
+        db.commit()
+        monkeypatch.setattr(settings, "CATALOG_SEARCH_BACKEND", "like")
+        monkeypatch.setattr(search_index, "_index", SearchIndex())
+        monkeypatch.setattr(search_index, "_state", {**search_index._state, "built_at": 0.0, "checked_at": 0.0})
+        yield db
+    engine.dispose()
+
+
+def _walk(db, size: int, **kwargs) -> list[str]:
+    slugs, cursor = [], None
+    while True:
+        items, cursor = catalog_service.list_products_page(db, size=size, cursor=cursor, **kwargs)
+        slugs += [p.slug for p in items]
+        if cursor is None:
+            return slugs
+
+
+@pytest.mark.parametrize("sort", ["id", "name", "newest"])
+def test_cursor_walk_matches_full_ordering(db, sort):
+    full, _ = catalog_service.list_products_page(db, size=100, sort=sort)
+    assert _walk(db, 2, sort=sort) == [p.slug for p in full]
+    assert len(full) == len(NAMES)
+
+
+def test_ordering_is_stable_on_ties(db):
+    assert _walk(db, 2, sort="name")[:3] == ["p2", "p4", "p7"]
+    assert _walk(db, 3, sort="newest") == ["p7", "p6", "p5", "p4", "p3", "p2", "p1"]
+
+
+def test_page_mode_still_works_and_hands_over_a_cursor(db):
+    first, cursor = catalog_service.list_products_page(db, page=2, size=2)
+    assert [p.slug for p in first] == ["p3", "p4"]
+    rest, _ = catalog_service.list_products_page(db, size=10, cursor=cursor)
+    assert [p.slug for p in rest] == ["p5", "p6", "p7"]
+
+
+def test_cursor_with_filters(db):
+    assert _walk(db, 1, search="agua", sort="name") == ["p2", "p4", "p7", "p5", "p3", "p1"]
+
+
+def test_relevance_cursor_over_search_index(db, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_SEARCH_BACKEND", "index")
+    ranked = [pid for pid, _ in search_index.search_scored(db, "agua")]
+    assert _walk(db, 2, search="agua") == [f"p{i}" for i in ranked] == ["p2", "p4", "p7", "p1", "p3", "p5"]
+
+
+
+def test_index_matches_sorted_by_sql_are_capped(db, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_SEARCH_BACKEND", "index")
+    monkeypatch.setattr(settings, "CATALOG_SEARCH_MAX_MATCHES", 3)
+    # Los 3 más relevantes (p2, p4, p7), ordenados por nombre
+    assert _walk(db, 2, search="agua", sort="name") == ["p2", "p4", "p7"]
+
+def test_invalid_cursor(db):
+    for bad in ("nope", catalog_service.encode_cursor("price", 1, 1), catalog_service.encode_cursor("id", "x", 1)):
+        with pytest.raises(catalog_service.InvalidCursor):
+            catalog_service.list_products_page(db, cursor=bad)
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core import catalog_cache
+from app.core.settings import settings
+from app.models.category import Category
+from app.models.category_closure import CategoryClosure
+from app.models.product import Product
+from app.services import catalog as catalog_service
+from app.services import category_tree
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_SEARCH_BACKEND", "like")
+    monkeypatch.setattr(catalog_cache, "get_redis", lambda: None)
+    engine = create_engine(sqlite_db("tree"))
+    with Session(engine) as db:
+        paneles = Category(name="Paneles", slug="paneles")
+        mono = Category(name="Monocristalinos", slug="mono", parent=paneles)
+        bifacial = Category(name="Bifaciales", slug="bifacial", parent=mono)
+        inversores = Category(name="Inversores", slug="inversores")
+        db.add_all([paneles, mono, bifacial, inversores])
+        db.flush()
+        for i, cat in enumerate([paneles, mono, bifacial, inversores]):
+            db.add(Product(name=f"P{i}", slug=f"p{i}", sku=f"SKU-{i}", category_id=cat.id))
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def _closure(db) -> set[tuple[str, str, int]]:
+    slug = {c.id: c.slug for c in db.query(Category)}
+    rows = db.execute(select(CategoryClosure.ancestor_id, CategoryClosure.descendant_id, CategoryClosure.depth)).all()
+    return {(slug[a], slug[d], depth) for a, d, depth in rows}
+
+
+def _skus(db, slug: str, include_descendants: bool = True) -> list[str]:
+    cat_id = db.query(Category.id).filter(Category.slug == slug).scalar()
+    items = catalog_service.list_products(db, category_id=cat_id, include_descendants=include_descendants)
+    return [p.sku for p in items]
+
+
+def test_closure_maintained_on_insert(db):
+    assert ("paneles", "bifacial", 2) in _closure(db)
+    assert _skus(db, "paneles") == ["SKU-0", "SKU-1", "SKU-2"]
+    assert _skus(db, "paneles", include_descendants=False) == ["SKU-0"]
+    assert _skus(db, "inversores") == ["SKU-3"]
+
+
+def test_move_subtree_and_delete(db):
+    mono = db.query(Category).filter_by(slug="mono").one()
+    inversores = db.query(Category).filter_by(slug="inversores").one()
+    mono.parent_id = inversores.id
+    db.commit()
+    assert _skus(db, "paneles") == ["SKU-0"]
+    assert _skus(db, "inversores") == ["SKU-1", "SKU-2", "SKU-3"]
+    assert ("inversores", "bifacial", 2) in _closure(db)
+
+    bifacial = db.query(Category).filter_by(slug="bifacial").one()
+    db.query(Product).filter_by(category_id=bifacial.id).delete()
+    db.delete(bifacial)
+    db.commit()
+    assert not any("bifacial" in (a, d) for a, d, _ in _closure(db))
+    # La tabla mantenida coincide con una reconstrucción desde parent_id
+    maintained = _closure(db)
+    category_tree.rebuild(db)
+    assert _closure(db) == maintained
+
+
+def test_cycle_is_rejected(db):
+    paneles = db.query(Category).filter_by(slug="paneles").one()
+    bifacial = db.query(Category).filter_by(slug="bifacial").one()
+    paneles.parent_id = bifacial.id
+    with pytest.raises(category_tree.CategoryCycleError):
+        db.flush()
+    db.rollback()
+
+
+def test_tree_blob_refreshes_on_category_change(db):
+    roots = catalog_service.list_categories(db, tree=True)
+    assert [r["slug"] for r in roots] == ["paneles", "inversores"]
+    assert roots[0]["children"][0]["children"][0]["slug"] == "bifacial"
+    db.add(Category(name="Baterías", slug="baterias"))
+    db.commit()
+    assert [r["slug"] for r in catalog_service.list_categories(db, tree=True)] == ["paneles", "inversores", "baterias"]
@@ -0,0 +1,54 @@
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.core.settings import async_url
+from app.db.session import run_db
+from app.models.category import Category
+from app.models.product import Product
+from app.services import catalog as catalog_service
+
+
+def _seed(url: str) -> None:
+    engine = create_engine(url)
+    with Session(engine) as db:
+        root = Category(name="Bebidas", slug="bebidas")
+        db.add(root)
+        db.flush()
+        db.add(Category(name="Gaseosas", slug="gaseosas", parent_id=root.id))
+        db.add(Product(name="Agua 500ml", slug="agua-500", sku="AG-500", category_id=root.id, is_active=True))
+        db.commit()
+    engine.dispose()
+
+
+def test_async_url_maps_drivers():
+    assert async_url("mysql+pymysql://u:p@db:3306/x") == "mysql+aiomysql://u:p@db:3306/x"
+    assert async_url("sqlite:///./t.db") == "sqlite+aiosqlite:///./t.db"
+
+
+def test_run_db_same_results_sync_and_async(sqlite_db):
+    url = sqlite_db("catalog")
+    _seed(url)
+
+    async def _read_both():
+        sync_engine = create_engine(url)
+        async_engine = create_async_engine(async_url(url))
+        try:
+            with Session(sync_engine) as db:
+                sync_rows = await run_db(db, catalog_service.list_products, "agua")
+                sync_tree = await run_db(db, catalog_service.list_categories, True)
+            async with AsyncSession(async_engine) as adb:
+                async_rows = await run_db(adb, catalog_service.list_products, "agua")
+                async_tree = await run_db(adb, catalog_service.list_categories, True)
+        finally:
+            sync_engine.dispose()
+            await async_engine.dispose()
+        return sync_rows, sync_tree, async_rows, async_tree
+
+    sync_rows, sync_tree, async_rows, async_tree = asyncio.run(_read_both())
+    assert [p.sku for p in sync_rows] == [p.sku for p in async_rows] == ["AG-500"]
+    assert sync_tree == async_tree
+    assert [c["slug"] for c in async_tree] == ["bebidas"]
+    assert [c["slug"] for c in async_tree[0]["children"]] == ["gaseosas"]
@@ -0,0 +1,33 @@
+from sqlalchemy import create_engine, text
+
+from app.db import pool as db_pool
+from app.db.pool import InstrumentedQueuePool
+
+
+def test_pool_metrics_prewarm_and_checkouts(sqlite_db):
+    engine = create_engine(sqlite_db("pool"), poolclass=InstrumentedQueuePool, pool_size=3, max_overflow=2)
+    db_pool.register("test_pool", engine)
+    try:
+        assert db_pool.prewarm(engine) == 3
+        s = db_pool.stats()["test_pool"]
+        assert s["checked_in"] == 3 and s["checked_out"] == 0
+        assert s["connections"]["opened"] == 3
+
+        held = [engine.connect() for _ in range(4)]
+        s = db_pool.stats()["test_pool"]
+        assert s["checked_out"] == 4 and s["overflow"] == 1
+        for c in held:
+            c.execute(text("SELECT 1"))
+            c.close()
+
+        s = db_pool.stats()["test_pool"]
+        # 3 del pre-calentado + 4 en uso; ninguna espera por el pool
+        assert s["checkouts"] == 7 and s["timeouts"] == 0
+        assert s["wait_ms"]["max"] >= 0.0
+        assert s["connections"]["opened"] == 4  # la de overflow se abrió al pedirla
+
+        engine.dispose()
+        assert db_pool.stats()["test_pool"]["checkouts"] == 7  # los contadores sobreviven a dispose()
+    finally:
+        db_pool._engines.pop("test_pool", None)
+        engine.dispose()
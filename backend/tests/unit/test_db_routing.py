@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db import routing
+from app.db.routing import RoutingSession
+from app.models.category import Category
+
+
+@pytest.fixture
+def two_dbs(sqlite_db, monkeypatch):
+    """Primario y "réplica" en archivos separados; la réplica arranca con datos distintos."""
+    primary_url, replica_url = sqlite_db("primary"), sqlite_db("replica")
+    for url, slug in ((primary_url, "solo-primario"), (replica_url, "solo-replica")):
+        engine = create_engine(url)
+        with Session(engine) as db:
+            db.add(Category(name=slug, slug=slug))
+            db.commit()
+        engine.dispose()
+    monkeypatch.setattr(settings, "DB_REPLICA_URLS", [replica_url])
+    monkeypatch.setattr(settings, "DB_REPLICA_LAG_CHECK_SECONDS", 0)
+    monkeypatch.setattr(routing, "get_redis", lambda: None)
+    monkeypatch.setattr(routing, "_replicas", {})
+    monkeypatch.setattr(routing, "_cursor", {})
+    routing._sticky.clear()
+    primary = create_engine(primary_url)
+    yield primary
+    primary.dispose()
+    for pool in routing._replicas.values():
+        for rep in pool:
+            rep.engine.dispose()
+
+
+def _slugs(primary, client: str) -> list[str]:
+    with RoutingSession(bind=primary, info={"client": client}) as db:
+        return list(db.execute(select(Category.slug).order_by(Category.id)).scalars())
+
+
+def test_reads_go_to_replica(two_dbs):
+    assert _slugs(two_dbs, "c1") == ["solo-replica"]
+    assert routing.stats()["engines"]["replica0"]["reads"] == 1
+
+
+def test_read_your_writes_sticks_client_to_primary(two_dbs):
+    with Session(bind=two_dbs, info={"client": "c1"}) as db:
+        db.add(Category(name="nueva", slug="nueva"))
+        db.commit()
+    assert _slugs(two_dbs, "c1") == ["solo-primario", "nueva"]
+    # Otro cliente sigue leyendo de la réplica
+    assert _slugs(two_dbs, "c2") == ["solo-replica"]
+
+
+def test_lagging_replica_falls_back_to_primary(two_dbs, monkeypatch):
+    monkeypatch.setattr(routing, "measure_lag", lambda engine: settings.DB_REPLICA_MAX_LAG_SECONDS + 30)
+    before = routing.stats()["fallbacks"]["lag"]
+    assert _slugs(two_dbs, "c1") == ["solo-primario"]
+    assert routing.stats()["fallbacks"]["lag"] == before + 1
+    assert routing.stats()["engines"]["replica0"]["healthy"] is False
+
+
+def test_write_in_read_session_pins_primary(two_dbs):
+    with RoutingSession(bind=two_dbs, info={"client": "c3"}) as db:
+        db.add(Category(name="x", slug="x"))
+        db.flush()
+        assert "x" in db.execute(select(Category.slug)).scalars().all()
+        db.rollback()
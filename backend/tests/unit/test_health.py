@@ -0,0 +1,19 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.health import health_stats
+from app.core.settings import settings
+
+
+def test_stats_admin_only_in_production(monkeypatch):
+    monkeypatch.setattr(settings, "APP_ENV", "production")
+    for user in (None, SimpleNamespace(role="user")):
+        with pytest.raises(HTTPException) as exc:
+            health_stats(current_user=user)
+        assert exc.value.status_code == 403
+    assert "user_cache" in health_stats(current_user=SimpleNamespace(role="admin"))
+
+    monkeypatch.setattr(settings, "APP_ENV", "development")
+    assert "user_cache" in health_stats(current_user=None)
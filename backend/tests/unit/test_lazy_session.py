@@ -0,0 +1,31 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.pool import InstrumentedQueuePool
+from app.db.session import LazySession
+
+
+def test_lazy_session_checks_out_only_on_real_use(sqlite_db):
+    engine = create_engine(sqlite_db("lazy"), poolclass=InstrumentedQueuePool, pool_size=2)
+    factory = sessionmaker(bind=engine)
+    try:
+        # Handler que corta antes (validación / rate limit): ni sesión ni conexión
+        early = LazySession(factory, info={"client": "c1"})
+        early.close()
+        assert not early.created and not early.touched
+        assert engine.pool.metrics.checkouts == 0
+
+        # Sesión creada pero sin consultas: tampoco toma conexión
+        idle = LazySession(factory)
+        assert idle.info == {}
+        assert idle.created and not idle.touched
+        idle.close()
+        assert engine.pool.metrics.checkouts == 0
+
+        used = LazySession(factory, info={"client": "c2"})
+        assert used.execute(text("SELECT 1")).scalar() == 1
+        assert used.touched and used.info["client"] == "c2"
+        used.close()
+        assert engine.pool.metrics.checkouts == 1
+    finally:
+        engine.dispose()
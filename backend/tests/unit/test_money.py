@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.common.money import Money, format_money
+from app.models.cart import Cart
+from app.models.cart_item import CartItem
+from app.models.product import Product
+from app.services.cart import MAX_SUBTOTAL, _line_subtotal, totals
+
+
+def test_integer_cents_arithmetic_and_formatting():
+    assert Money.of(Decimal("12.30")) == Money(1230)
+    assert Money.of("0.005") == Money(1)  # redondeo half-up
+    assert Money.of(0.1) + Money.of(0.2) == Money.of("0.30")
+    assert Money.of(3) * 7 - Money(5) == Money(2095)
+    assert str(Money(-705)) == "-7.05"
+    assert format_money(Money(100000)) == format_money(Decimal("1000")) == "1000.00"
+    assert float(Money(1999)) == 19.99
+    assert Money(1230).to_decimal() == Decimal("12.30")
+    assert _line_subtotal(Money.of("9999999999.99"), 2) == MAX_SUBTOTAL
+
+
+def test_money_columns_round_trip(sqlite_db):
+    engine = create_engine(sqlite_db("money"))
+    with Session(engine) as db:
+        db.add(Product(id=1, name="P1", slug="p1", sku="SKU-1"))
+        cart = Cart(session_id="s1")
+        db.add(cart)
+        db.flush()
+        db.add_all([
+            CartItem(cart_id=cart.id, product_id=1, qty=3, unit_price=Money.of("19.99"), tier="retail", subtotal=Money(5997)),
+            # Importe en unidades, como acepta Numeric
+            CartItem(cart_id=cart.id, product_id=1, qty=1, unit_price=Decimal("0.01"), tier="retail", subtotal=0.01),
+        ])
+        db.commit()
+        items = db.query(CartItem).order_by(CartItem.id).all()
+        assert [(it.unit_price, it.subtotal) for it in items] == [(Money(1999), Money(5997)), (Money(1), Money(1))]
+        assert totals(db, cart) == {"subtotal": Money(5998), "items_count": 4}
+    engine.dispose()
@@ -0,0 +1,145 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.common.money import Money
+from app.common.ttl_cache import TTLCache
+from app.core import catalog_cache
+from app.db.query_stats import query_budget
+from app.models.cart import Cart
+from app.models.cart_item import CartItem
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.price_list import PriceListItem
+from app.models.product import Product
+from app.models.product_listing import ProductListing
+from app.models.product_price import ProductPrice
+from app.services import price_lists, pricing
+from app.services.cart import reprice_cart
+from app.services.checkout import start_checkout
+from app.services.price_lists import PriceListError, PriceListImmutable
+from app.services.pricing import PriceBook
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    monkeypatch.setattr(catalog_cache, "get_redis", lambda: None)
+    monkeypatch.setattr(price_lists, "_active", TTLCache(maxsize=1, ttl=600))
+    pricing._cache.clear()
+    engine = create_engine(sqlite_db("price_lists"))
+    with Session(engine) as db:
+        for i in range(1, 3):
+            db.add(Product(id=i, name=f"P{i}", slug=f"p{i}", sku=f"SKU-{i}"))
+        db.flush()
+        db.add_all([
+            ProductPrice(product_id=1, tier="retail", currency="ARS", amount=100),
+            ProductPrice(product_id=1, tier="wholesale", currency="ARS", amount=80, minimum_qty=10),
+            ProductPrice(product_id=2, tier="retail", currency="ARS", amount=50),
+        ])
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def _published(db: Session) -> int:
+    version = price_lists.create_version(db, "Otoño")
+    price_lists.set_items(db, version.id, [
+        {"product_id": 1, "tier": "retail", "currency": "ARS", "amount": 110},
+        {"product_id": 2, "tier": "wholesale", "currency": "ARS", "amount": 40, "minimum_qty": 5},
+    ])
+    # El wholesale de 1 sale de la versión
+    db.query(PriceListItem).filter_by(version_id=version.id, product_id=1, tier="wholesale").delete()
+    db.commit()
+    price_lists.publish(db, version.id)
+    return version.id
+
+
+def test_draft_copies_current_prices_and_freezes_on_publish(db):
+    version = price_lists.create_version(db, "Base")
+    items = db.execute(
+        select(PriceListItem.product_id, PriceListItem.tier, PriceListItem.amount)
+        .where(PriceListItem.version_id == version.id)
+        .order_by(PriceListItem.product_id, PriceListItem.tier)
+    ).all()
+    assert [(p, t, float(a)) for p, t, a in items] == [(1, "retail", 100.0), (1, "wholesale", 80.0), (2, "retail", 50.0)]
+
+    price_lists.publish(db, version.id)
+    with pytest.raises(PriceListImmutable):
+        price_lists.set_items(db, version.id, [{"product_id": 1, "tier": "retail", "amount": 1}])
+    db.rollback()
+    item = db.get(PriceListItem, (version.id, 1, "retail"))
+    item.amount = 1
+    with pytest.raises(PriceListImmutable):
+        db.commit()
+    db.rollback()
+    with pytest.raises(PriceListError):
+        price_lists.activate(db, price_lists.create_version(db, "Borrador").id)
+
+
+def test_activate_switches_pricebook_catalog_and_cart_version(db):
+    version_id = _published(db)
+    assert price_lists.activate(db, version_id) == 2
+    assert price_lists.active_version(db) == version_id
+
+    book = PriceBook.load(db, [1, 2])
+    assert book.version == f"pl{version_id}"
+    assert book.resolve(1, 20) == ("retail", Money.of(110))
+    assert book.resolve(2, 5) == ("wholesale", Money.of(40))
+    with query_budget(0):
+        PriceBook.load(db, [1, 2])
+
+    # product_prices y la proyección quedan alineados con la versión
+    prices = db.execute(select(ProductPrice.product_id, ProductPrice.tier).order_by(ProductPrice.product_id, ProductPrice.tier)).all()
+    assert prices == [(1, "retail"), (2, "retail"), (2, "wholesale")]
+    listing = db.get(ProductListing, 1)
+    db.refresh(listing)
+    assert (float(listing.retail_amount), listing.wholesale_amount) == (110.0, None)
+
+    cart = Cart(session_id="s1")
+    db.add(cart)
+    db.flush()
+    db.add(CartItem(cart_id=cart.id, product_id=2, qty=6, unit_price=50, tier="retail", subtotal=300))
+    db.commit()
+    [item] = reprice_cart(db, cart)
+    assert (item.tier, float(item.unit_price), item.pricing_version) == ("wholesale", 40.0, f"pl{version_id}")
+
+    # Re-activar la misma versión no reescribe nada
+    assert price_lists.activate(db, version_id) == 0
+
+
+def test_direct_price_write_goes_back_to_live_prices(db):
+    price_lists.activate(db, _published(db))
+    db.query(ProductPrice).filter_by(product_id=1, tier="retail").one().amount = 130
+    db.commit()
+    assert price_lists.active_version(db) is None
+    book = PriceBook.load(db, [1])
+    assert (book.version, book.resolve(1, 1)) == (None, ("retail", Money.of(130)))
+
+
+def test_checkout_reprices_mixed_versions_to_the_active_one(db):
+    old = _published(db)
+    price_lists.activate(db, old)
+    current = price_lists.create_version(db, "Invierno", source_version_id=old)
+    price_lists.set_items(db, current.id, [{"product_id": 1, "tier": "retail", "currency": "ARS", "amount": 120}])
+    price_lists.publish(db, current.id)
+    price_lists.activate(db, current.id)
+
+    # Líneas cotizadas con dos versiones distintas (y una con precios vivos)
+    cart = Cart(session_id="s1", status="locked")
+    db.add(cart)
+    db.flush()
+    db.add_all([
+        CartItem(cart_id=cart.id, product_id=1, qty=1, unit_price=110, tier="retail", subtotal=110,
+                 pricing_version=price_lists.version_tag(old)),
+        CartItem(cart_id=cart.id, product_id=2, qty=6, unit_price=40, tier="wholesale", subtotal=240,
+                 pricing_version=price_lists.version_tag(current.id)),
+    ])
+    db.commit()
+
+    r = start_checkout(db, cart.id)
+    assert r["ok"] and r["order"]["grand_total"] == "360.00"
+    tag = price_lists.version_tag(current.id)
+    order = db.get(Order, r["order"]["order_id"])
+    assert order.pricing_version == tag
+    assert {it.pricing_version for it in db.query(CartItem).filter_by(cart_id=cart.id)} == {tag}
+    assert sorted(float(oi.unit_price) for oi in db.query(OrderItem).filter_by(order_id=order.id)) == [40.0, 120.0]
@@ -0,0 +1,117 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.common.money import Money
+from app.common.ttl_cache import TTLCache
+from app.core import catalog_cache
+from app.db.query_stats import query_budget
+from app.models.cart import Cart
+from app.models.cart_item import CartItem
+from app.models.product import Product
+from app.models.product_price import ProductPrice
+from app.services import price_lists, pricing
+from app.services.cart import reprice_cart
+from app.services.pricing import PriceBook, resolve_price
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    monkeypatch.setattr(catalog_cache, "get_redis", lambda: None)
+    monkeypatch.setattr(price_lists, "_active", TTLCache(maxsize=1, ttl=600))
+    pricing._cache.clear()
+    engine = create_engine(sqlite_db("pricebook"))
+    with Session(engine) as db:
+        for i in range(1, 4):
+            db.add(Product(id=i, name=f"P{i}", slug=f"p{i}", sku=f"SKU-{i}"))
+        db.flush()
+        db.add_all([
+            ProductPrice(product_id=1, tier="retail", currency="ARS", amount=100),
+            ProductPrice(product_id=1, tier="wholesale", currency="ARS", amount=80, minimum_qty=10),
+            ProductPrice(product_id=2, tier="retail", currency="ARS", amount=50),  # sin wholesale
+        ])
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def test_rules_match_resolve_price(db):
+    book = PriceBook.load(db, [1, 2, 3])
+    assert book.resolve(1, 1) == ("retail", Money.of(100))
+    assert book.resolve(1, 10) == ("wholesale", Money.of(80))
+    assert book.resolve(1, 1, "seller") == ("wholesale", Money.of(80))
+    # Rol mayorista sin precio wholesale: retail
+    assert book.resolve(2, 1, "admin") == ("retail", Money.of(50))
+    with pytest.raises(ValueError):
+        book.resolve(3, 1)
+    assert resolve_price(db, 1, 12) == ("wholesale", Money.of(80))
+
+
+def test_one_query_then_cache_until_price_write(db):
+    price_lists.active_version(db)  # puntero (sin lista vigente) ya leído
+    with query_budget(1):
+        assert PriceBook.load(db, [1, 2, 3]).resolve_many([(1, 1), (2, 5), (1, 20)]) == [
+            ("retail", Money.of(100)),
+            ("retail", Money.of(50)),
+            ("wholesale", Money.of(80)),
+        ]
+    with query_budget(0):
+        PriceBook.load(db, [1, 2, 3])
+
+    db.query(ProductPrice).filter_by(product_id=1, tier="retail").one().amount = 120
+    db.commit()
+    with query_budget(1):
+        assert resolve_price(db, 1, 1) == ("retail", Money.of(120))
+
+
+def test_reprice_cart_uses_one_price_query(db):
+    cart = Cart(session_id="s1")
+    db.add(cart)
+    db.flush()
+    db.add_all([
+        CartItem(cart_id=cart.id, product_id=1, qty=12, unit_price=100, tier="retail", subtotal=1200),
+        CartItem(cart_id=cart.id, product_id=2, qty=3, unit_price=40, tier="retail", subtotal=120),
+    ])
+    db.commit()
+    with query_budget(10) as stats:
+        items = reprice_cart(db, cart)
+    assert sum("product_prices" in s for s in stats.statements) == 1
+    assert [(it.tier, float(it.unit_price), float(it.subtotal)) for it in items] == [
+        ("wholesale", 80.0, 960.0),
+        ("retail", 50.0, 150.0),
+    ]
+
+
+def test_quantity_breaks_resolve_from_compiled_table(db):
+    db.add_all([
+        ProductPrice(product_id=3, tier="retail", currency="ARS", amount=200),
+        ProductPrice(product_id=3, tier="wholesale", currency="ARS", amount=180, minimum_qty=10),
+        ProductPrice(product_id=3, tier="b2b-50", currency="ARS", amount=160, minimum_qty=50),
+        ProductPrice(product_id=3, tier="b2b-200", currency="ARS", amount=140, minimum_qty=200),
+    ])
+    db.commit()
+    book = PriceBook.load(db, [3])
+    assert [book.resolve(3, q) for q in (1, 10, 49, 50, 199, 200, 5000)] == [
+        ("retail", Money.of(200)),
+        ("wholesale", Money.of(180)),
+        ("wholesale", Money.of(180)),
+        ("b2b-50", Money.of(160)),
+        ("b2b-50", Money.of(160)),
+        ("b2b-200", Money.of(140)),
+        ("b2b-200", Money.of(140)),
+    ]
+    assert book.resolve(3, 500, "seller") == ("wholesale", Money.of(180))
+
+    cart = Cart(session_id="s2")
+    db.add(cart)
+    db.flush()
+    db.add_all([
+        CartItem(cart_id=cart.id, product_id=3, qty=q, unit_price=200, tier="retail", subtotal=200 * q)
+        for q in (5, 60, 250)
+    ])
+    db.commit()
+    with query_budget(10) as stats:
+        items = reprice_cart(db, cart)
+    # Tabla ya compilada y cacheada: ninguna consulta de precios por línea
+    assert sum("product_prices" in s for s in stats.statements) == 0
+    assert [(it.tier, float(it.subtotal)) for it in items] == [("retail", 1000.0), ("b2b-50", 9600.0), ("b2b-200", 35000.0)]
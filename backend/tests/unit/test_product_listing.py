@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.models.category import Category
+from app.models.product import Product
+from app.models.product_listing import ProductListing
+from app.models.product_price import ProductPrice
+from app.models.stock_item import StockItem
+from app.services import catalog as catalog_service
+from app.services import product_listing
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_SEARCH_BACKEND", "like")
+    engine = create_engine(sqlite_db("listing"))
+    with Session(engine) as db:
+        paneles = Category(name="Paneles", slug="paneles")
+        mono = Category(name="Monocristalinos", slug="mono", parent=paneles)
+        db.add_all([paneles, mono])
+        db.flush()
+        p = Product(name="Panel 550W", slug="panel-550", sku="PS-550", category_id=mono.id)
+        db.add(p)
+        db.flush()
+        db.add_all([
+            ProductPrice(product_id=p.id, tier="retail", currency="ARS", amount=100),
+            ProductPrice(product_id=p.id, tier="wholesale", currency="ARS", amount=90, minimum_qty=5),
+            StockItem(product_id=p.id, location_id=1, on_hand=10, committed=2),
+        ])
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def _row(db) -> ProductListing:
+    db.expire_all()
+    return db.query(ProductListing).one()
+
+
+def test_projection_follows_writes(db):
+    row = _row(db)
+    assert (row.name, row.category_path) == ("Panel 550W", "Paneles / Monocristalinos")
+    assert (float(row.retail_amount), float(row.wholesale_amount), row.wholesale_min_qty) == (100.0, 90.0, 5)
+    assert row.available == 8
+
+    db.query(ProductPrice).filter_by(tier="retail").one().amount = 120
+    db.query(StockItem).one().committed = 7
+    db.commit()
+    row = _row(db)
+    assert (float(row.retail_amount), row.available) == (120.0, 3)
+
+    db.query(Category).filter_by(slug="paneles").one().name = "Paneles solares"
+    db.commit()
+    assert _row(db).category_path == "Paneles solares / Monocristalinos"
+
+    product = db.query(Product).one()
+    db.query(ProductPrice).delete()
+    db.query(StockItem).delete()
+    db.delete(product)
+    db.commit()
+    assert db.query(ProductListing).count() == 0
+
+
+def test_rollback_leaves_projection_untouched(db):
+    db.query(Product).one().name = "Borrador"
+    db.flush()
+    db.rollback()
+    assert _row(db).name == "Panel 550W"
+
+
+def test_rebuild_matches_maintained_rows(db):
+    before = {c: getattr(_row(db), c) for c in ("name", "category_path", "retail_amount", "available")}
+    db.execute(delete(ProductListing))
+    db.commit()
+    assert product_listing.rebuild(db) == 1
+    assert {c: getattr(_row(db), c) for c in before} == before
+
+
+def test_listing_page_is_single_table(db, query_budget):
+    with query_budget(1):
+        items, _ = catalog_service.list_products_page(db, embed=frozenset({"prices", "stock"}))
+    assert [(pr.tier, pr.amount) for pr in items[0].prices] == [("retail", 100.0), ("wholesale", 90.0)]
+    assert items[0].available == 8
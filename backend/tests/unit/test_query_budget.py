@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db.query_stats import QueryBudgetExceeded, collect
+from app.models.cart import Cart
+from app.models.cart_item import CartItem
+from app.models.inventory_location import InventoryLocation
+from app.models.product import Product
+from app.models.stock_item import StockItem
+from app.models.stock_reservation import StockReservation
+from app.services.payments_mp import _consume_reservations_atomic
+from app.services.stock import reserve_cart
+
+
+def _cart_with_items(db: Session, n: int) -> int:
+    cart = Cart(session_id=f"budget-{n}", currency="ARS", status="draft")
+    db.add(cart)
+    db.flush()
+    for i in range(n):
+        p = Product(name=f"P{n}-{i}", slug=f"p{n}-{i}", sku=f"SKU{n}-{i}", is_active=True)
+        db.add(p)
+        db.flush()
+        db.add(StockItem(product_id=p.id, location_id=1, on_hand=100, committed=0))
+        db.add(CartItem(cart_id=cart.id, product_id=p.id, qty=1, unit_price=10, tier="retail", subtotal=10))
+    db.commit()
+    return cart.id
+
+
+@pytest.fixture
+def db(sqlite_db):
+    engine = create_engine(sqlite_db("budget"))
+    with Session(engine) as s:
+        s.add(InventoryLocation(id=1, code="SUC-01", name="Central"))
+        s.commit()
+        yield s
+    engine.dispose()
+
+
+def _queries(fn) -> int:
+    with collect() as stats:
+        fn()
+    return stats.count
+
+
+def test_reserve_and_consume_are_constant_in_item_count(db):
+    small, large = _cart_with_items(db, 2), _cart_with_items(db, 8)
+    assert _queries(lambda: reserve_cart(db, small)) == _queries(lambda: reserve_cart(db, large))
+    assert db.query(StockReservation).filter(StockReservation.cart_id == large).count() == 8
+
+    def consume(cart_id):
+        _consume_reservations_atomic(db, cart_id)
+        db.flush()
+
+    assert _queries(lambda: consume(small)) == _queries(lambda: consume(large))
+
+
+def test_query_budget_fails_on_n_plus_one(db, query_budget):
+    cart_id = _cart_with_items(db, 6)
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(50, n_plus_one_threshold=5):
+            for it in db.query(CartItem).filter(CartItem.cart_id == cart_id).all():
+                db.query(Product).filter(Product.id == it.product_id).one()
+    with query_budget(3):
+        db.query(CartItem).filter(CartItem.cart_id == cart_id).all()
@@ -0,0 +1,31 @@
+from app.core.rate_limit import MemoryBackend, SlidingWindowLimiter
+
+
+class _CountingBackend(MemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def hit(self, key, limit, window_sec, now):
+        self.calls += 1
+        return super().hit(key, limit, window_sec, now)
+
+
+def test_memory_limiter_sliding_window():
+    limiter = SlidingWindowLimiter(MemoryBackend(), prefilter=False)
+    results = [limiter.hit("rl:login:1.2.3.4", limit=3, window_sec=60) for _ in range(5)]
+    assert results == [False, False, False, True, True]
+    # Otra clave no comparte ventana
+    assert limiter.hit("rl:login:5.6.7.8", limit=3, window_sec=60) is False
+
+
+def test_prefilter_rejects_without_backend_round_trip():
+    backend = _CountingBackend()
+    limiter = SlidingWindowLimiter(backend)
+    for _ in range(3):
+        limiter.hit("rl:cart_items:ip", limit=3, window_sec=60)
+    assert backend.calls == 3
+    for _ in range(10):
+        assert limiter.hit("rl:cart_items:ip", limit=3, window_sec=60) is True
+    assert backend.calls == 3
+    assert limiter.stats["rejected_local"] == 10
@@ -0,0 +1,36 @@
+from app.services.search_index import SearchIndex, fold, tokenize
+
+
+def _index() -> SearchIndex:
+    idx = SearchIndex()
+    idx.upsert(1, "Baterías de litio 18650", "BAT-18650", "Celdas recargables", 10)
+    idx.upsert(2, "Cargador de batería", "CAR-001", None, 10)
+    idx.upsert(3, "Linterna LED", "LIN-01", "Incluye batería recargable", 20)
+    idx.upsert(4, "Agua mineral 500ml", "AG-500", None, 30)
+    return idx
+
+
+def test_fold_and_tokenize():
+    assert fold("Baterías Ñandú") == "baterias nandu"
+    assert tokenize("AG-500 / Pingüino") == ["ag", "500", "pinguino"]
+
+
+def test_accent_insensitive_prefix_and_ranking():
+    idx = _index()
+    # "bateria" matchea "Baterías" (prefijo) y "batería" (exacto); el nombre pesa más que la descripción
+    assert idx.search("bateria") == [2, 1, 3]
+    assert idx.search("BATERÍAS") == [1]
+    assert idx.search("bateria recargable") == [1, 3]
+
+
+def test_sku_category_filter_and_updates():
+    idx = _index()
+    assert idx.search("ag-500") == [4]
+    assert idx.search("ag500") == [4]
+    assert idx.search("bateria", category_id=20) == [3]
+    assert idx.search("cable de red") == []
+    idx.upsert(4, "Agua con gas", "AG-500", None, 30)
+    assert idx.search("mineral") == []
+    assert idx.search("agua gas") == [4]
+    idx.remove(4)
+    assert idx.search("agua") == [] and len(idx) == 3
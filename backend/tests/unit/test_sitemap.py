@@ -0,0 +1,86 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core import catalog_cache
+from app.core.settings import settings
+from app.db.query_stats import collect
+from app.models.category import Category
+from app.models.product import Product
+from app.models.sitemap_shard import SitemapShard
+from app.services import sitemap
+
+NS = {"s": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    monkeypatch.setattr(catalog_cache, "get_redis", lambda: None)
+    monkeypatch.setattr(settings, "BASE_URL", "https://tienda.test")
+    monkeypatch.setattr(settings, "CATALOG_SITEMAP_SHARD_SIZE", 2)
+    monkeypatch.setattr(sitemap, "_state", {"version": None, "shards": None})
+    catalog_cache.bump()
+    engine = create_engine(sqlite_db("sitemap"))
+    with Session(engine) as db:
+        db.add(Category(name="Paneles", slug="paneles"))
+        # ids 1..5 → shards 0 (1), 1 (2, 3), 2 (4, 5); el 3 inactivo
+        for i in range(1, 6):
+            db.add(Product(name=f"P{i}", slug=f"p{i}", sku=f"SKU-{i}", is_active=i != 3))
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def _locs(body: bytes, tag: str = "s:url") -> list[str]:
+    return [e.find("s:loc", NS).text for e in ET.fromstring(body).findall(tag, NS)]
+
+
+def test_index_and_shards_from_catalog(db):
+    index = _locs(sitemap.sitemap_index(db), "s:sitemap")
+    assert index == [
+        "https://tienda.test/sitemaps/pages.xml",
+        "https://tienda.test/sitemaps/categories.xml",
+        "https://tienda.test/sitemaps/products-0.xml",
+        "https://tienda.test/sitemaps/products-1.xml",
+        "https://tienda.test/sitemaps/products-2.xml",
+    ]
+    assert _locs(sitemap.products(db, 1)) == ["https://tienda.test/products/p2"]
+    assert ET.fromstring(sitemap.products(db, 2)).find("s:url/s:lastmod", NS) is not None
+    assert _locs(sitemap.categories(db)) == ["https://tienda.test/categories/paneles"]
+    assert sitemap.products(db, 7) is None
+
+
+def test_only_changed_shards_are_rendered_again(db):
+    for shard in (0, 1, 2):
+        sitemap.products(db, shard)
+    with collect() as stats:
+        for shard in (0, 1, 2):
+            sitemap.products(db, shard)
+    assert stats.count == 0  # misma versión: huellas y XML desde caché
+
+    db.get(Product, 5).name = "P5 nuevo"
+    db.commit()
+    with collect() as stats:
+        bodies = [sitemap.products(db, shard) for shard in (0, 1, 2)]
+    # Huellas guardadas (sin GROUP BY) + sólo el shard 2, que cambió
+    assert stats.count == 2
+    assert not any("GROUP BY" in sql for sql in stats.statements)
+    assert _locs(bodies[2]) == ["https://tienda.test/products/p4", "https://tienda.test/products/p5"]
+
+
+def test_fingerprints_follow_product_writes(db):
+    shards = lambda: {s.shard: s.products for s in db.query(SitemapShard).order_by(SitemapShard.shard)}  # noqa: E731
+    assert shards() == {0: 1, 1: 1, 2: 2}
+
+    db.get(Product, 1).is_active = False
+    db.get(Product, 3).is_active = True
+    db.add(Product(id=6, name="P6", slug="p6", sku="SKU-6"))
+    db.commit()
+    assert shards() == {1: 2, 2: 2, 3: 1}
+    assert [loc.rsplit("-", 1)[1] for loc in _locs(sitemap.sitemap_index(db), "s:sitemap")[2:]] == ["1.xml", "2.xml", "3.xml"]
+
+    # Rebuild completo (CLI) deja lo mismo
+    assert sitemap.rebuild(db) == 3
+    assert shards() == {1: 2, 2: 2, 3: 1}
@@ -0,0 +1,41 @@
+import time
+
+from app.common.ttl_cache import TTLCache
+from app.core import token_versions, user_cache
+from app.core.user_cache import AuthUser
+
+
+def test_ttl_cache_evicts_lru_and_expires():
+    c = TTLCache(maxsize=2, ttl=60)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1  # "a" pasa a ser el más reciente
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+
+    c.set("x", 9, ttl=0.01)
+    time.sleep(0.02)
+    assert c.get("x") is None
+    assert c.stats()["misses"] >= 2
+
+
+def test_user_cache_local_tier_and_invalidate(monkeypatch):
+    monkeypatch.setattr(user_cache, "get_redis", lambda: None)
+    u = AuthUser(id=1, email="cache@example.com", role="user", is_active=True)
+    user_cache.put_user(u)
+    assert user_cache.get_user("cache@example.com") == u
+    user_cache.invalidate("cache@example.com")
+    assert user_cache.get_user("cache@example.com") is None
+
+
+def test_local_hit_dropped_when_token_version_moves_elsewhere(monkeypatch):
+    monkeypatch.setattr(user_cache, "get_redis", lambda: None)
+    monkeypatch.setattr(token_versions, "get_redis", lambda: None)
+    u = AuthUser(id=7, email="role@example.com", role="admin", is_active=True, token_version=3)
+    user_cache.put_user(u)
+    token_versions.publish(7, 3)
+    assert user_cache.get_user("role@example.com") == u
+    # Otro worker cambió el rol: publicó token_version 4 (aquí, vista por token_versions)
+    token_versions.publish(7, 4)
+    assert user_cache.get_user("role@example.com") is None